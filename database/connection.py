@@ -1,5 +1,59 @@
+import threading
+import time
 import oracledb
 from contextlib import contextmanager
+from dataclasses import fields
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Union, get_args, get_origin, get_type_hints
+
+
+@lru_cache(maxsize=None)
+def _tipos_columnas(clase) -> dict:
+    """Tipo de cada campo del dataclass, por nombre de columna (en mayúsculas,
+    como las entrega Oracle). Optional[X] cuenta como X."""
+    tipos = {}
+    for nombre, tipo in get_type_hints(clase).items():
+        if get_origin(tipo) is Union:
+            tipo = next(t for t in get_args(tipo) if t is not type(None))
+        tipos[nombre.upper()] = tipo
+    return tipos
+
+
+def manejador_tipos(clase):
+    """
+    outputtypehandler para llenar `clase` (un dataclass) directo desde el driver:
+    las columnas NUMBER de campos Decimal llegan como Decimal y las DATE de
+    campos date llegan como date, sin convertir fila por fila en Python.
+    Los demás campos quedan como los entrega oracledb (int, float, datetime, str).
+    """
+    tipos = _tipos_columnas(clase)
+
+    def manejador(cursor, metadata):
+        tipo = tipos.get(metadata.name)
+        if tipo is Decimal and metadata.type_code is oracledb.DB_TYPE_NUMBER:
+            return cursor.var(Decimal, arraysize=cursor.arraysize)
+        if tipo is date and metadata.type_code is oracledb.DB_TYPE_DATE:
+            return cursor.var(oracledb.DB_TYPE_DATE, arraysize=cursor.arraysize,
+                              outconverter=datetime.date)
+        return None
+
+    return manejador
+
+
+def preparar_cursor(cursor, clase):
+    """Configura el cursor para que cada fila salga como un objeto `clase`.
+    La consulta debe traer las columnas en el orden de los campos del dataclass
+    (ver columnas_de)."""
+    cursor.outputtypehandler = manejador_tipos(clase)
+    cursor.rowfactory = clase
+
+
+def columnas_de(clase, alias=None) -> str:
+    """Lista de columnas para el SELECT, en el orden de los campos de `clase`"""
+    prefijo = f"{alias}." if alias else ""
+    return ", ".join(prefijo + campo.name for campo in fields(clase))
 
 
 class DatabaseConfig:
@@ -11,35 +65,140 @@ class DatabaseConfig:
     DB_PORT = 1521
     DB_SID = "xe"
 
+    # Parámetros del pool de sesiones (compartido por todo el proceso)
+    POOL_MIN = 2
+    POOL_MAX = 10
+    POOL_INCREMENT = 1
+    POOL_PING_INTERVAL = 60   # segundos sin uso antes de hacer ping al adquirir
+    POOL_TIMEOUT = 300        # segundos que una sesión ociosa sobrevive en el pool
+    POOL_WAIT_TIMEOUT = 5000  # milisegundos máximos esperando una sesión libre
+
+    # Filas que se traen por viaje a la BD al recorrer consultas grandes
+    TAMANO_LOTE = 1000
+
+    _pool = None
+    _pool_lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    _stats = {
+        'adquisiciones': 0,
+        'esperas': 0,
+        'tiempo_adquisicion_total': 0.0,
+        'tiempo_adquisicion_max': 0.0,
+    }
+
+    @classmethod
+    def get_pool(cls):
+        """Devuelve el pool de sesiones del proceso, creándolo la primera vez.
+        Todas las conexiones de la aplicación salen de aquí."""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = oracledb.create_pool(
+                        user=cls.DB_USER,
+                        password=cls.DB_PASSWORD,
+                        host=cls.DB_HOST,
+                        port=cls.DB_PORT,
+                        sid=cls.DB_SID,
+                        min=cls.POOL_MIN,
+                        max=cls.POOL_MAX,
+                        increment=cls.POOL_INCREMENT,
+                        ping_interval=cls.POOL_PING_INTERVAL,
+                        timeout=cls.POOL_TIMEOUT,
+                        wait_timeout=cls.POOL_WAIT_TIMEOUT,
+                        getmode=oracledb.POOL_GETMODE_TIMEDWAIT
+                    )
+        return cls._pool
+
+    @classmethod
+    def _adquirir(cls):
+        """Toma una sesión del pool y registra la latencia de la adquisición"""
+        pool = cls.get_pool()
+        # Si todas las sesiones están ocupadas y no se puede crecer, toca esperar
+        espera = pool.busy >= pool.max
+        inicio = time.perf_counter()
+        connection = pool.acquire()
+        transcurrido = time.perf_counter() - inicio
+
+        with cls._stats_lock:
+            cls._stats['adquisiciones'] += 1
+            if espera:
+                cls._stats['esperas'] += 1
+            cls._stats['tiempo_adquisicion_total'] += transcurrido
+            cls._stats['tiempo_adquisicion_max'] = max(
+                cls._stats['tiempo_adquisicion_max'], transcurrido
+            )
+        return connection
+
+    @classmethod
+    def obtener_estadisticas_pool(cls) -> dict:
+        """Retorna el estado del pool para poder dimensionarlo:
+        sesiones abiertas/en uso, esperas y latencia de adquisición (ms)"""
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+
+        pool = cls._pool
+        adquisiciones = stats['adquisiciones']
+        return {
+            'abiertas': pool.opened if pool else 0,
+            'en_uso': pool.busy if pool else 0,
+            'maximo': pool.max if pool else cls.POOL_MAX,
+            'adquisiciones': adquisiciones,
+            'esperas': stats['esperas'],
+            'latencia_promedio_ms': (stats['tiempo_adquisicion_total'] / adquisiciones * 1000
+                                     if adquisiciones else 0.0),
+            'latencia_max_ms': stats['tiempo_adquisicion_max'] * 1000,
+        }
+
+    @classmethod
+    def cerrar_pool(cls):
+        """Cierra el pool (al salir de la aplicación)"""
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.close(force=True)
+                cls._pool = None
+
     @classmethod
     @contextmanager
     def get_connection(cls):
         """Context manager para manejar conexiones de forma segura,
         Utiliza oracledb para conectarse a Oracle DB. XE no sirve XD
-        Simplemente usa este método para obtener una conexión."""
+        La sesión sale del pool y se devuelve al cerrar (no se reconecta)."""
         connection = None
         try:
-            connection = oracledb.connect(
-                user=cls.DB_USER,
-                password=cls.DB_PASSWORD,
-                host=cls.DB_HOST,
-                port=cls.DB_PORT,
-                sid=cls.DB_SID
-            )
+            connection = cls._adquirir()
             yield connection
         except oracledb.DatabaseError as e:
             print(f"Error de base de datos: {e}")
             raise
         finally:
             if connection:
+                # close() sobre una conexión del pool la devuelve al pool
                 connection.close()
 
     @classmethod
-    def execute_query(cls, sql, params=None, fetch=True):
+    @contextmanager
+    def get_transaction(cls):
+        """Conexión para ejecutar varias sentencias en una sola transacción.
+        Hace commit al salir sin errores y rollback si algo falla."""
+        with cls.get_connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    @classmethod
+    def execute_query(cls, sql, params=None, fetch=True, clase=None):
         """Ejecuta una consulta SQL y retorna los resultados
-        with opciones para parámetros y fetch de resultados."""
+        with opciones para parámetros y fetch de resultados.
+
+        Con clase=<dataclass> cada fila llega como objeto de esa clase
+        (rowfactory + outputtypehandler, ver preparar_cursor)."""
         with cls.get_connection() as conn:
             with conn.cursor() as cursor:
+                if clase is not None:
+                    preparar_cursor(cursor, clase)
                 cursor.execute(sql, params or {})
 
                 if fetch:
@@ -48,6 +207,33 @@ class DatabaseConfig:
                     conn.commit()
                     return cursor.rowcount
 
+    @classmethod
+    def stream_query(cls, sql, params=None, batch_size=None, por_lotes=False, clase=None):
+        """Recorre el resultado de una consulta sin cargarlo entero en memoria.
+        Trae `batch_size` filas por viaje (arraysize/prefetchrows) y mantiene la
+        sesión del pool abierta hasta terminar (o abandonar) la iteración.
+
+        Con por_lotes=True entrega listas de filas en vez de fila por fila.
+        Con clase=<dataclass> las filas llegan como objetos (igual que execute_query)."""
+        batch_size = batch_size or cls.TAMANO_LOTE
+        with cls.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.arraysize = batch_size
+                # +1 evita un viaje extra para descubrir que no hay más filas
+                cursor.prefetchrows = batch_size + 1
+                if clase is not None:
+                    preparar_cursor(cursor, clase)
+                cursor.execute(sql, params or {})
+
+                if por_lotes:
+                    while True:
+                        lote = cursor.fetchmany()
+                        if not lote:
+                            break
+                        yield lote
+                else:
+                    yield from cursor
+
     @classmethod
     def execute_many(cls, sql, data_list):
         """Ejecuta múltiples inserciones
@@ -60,11 +246,6 @@ class DatabaseConfig:
 
 
 def get_connection():
-    """Función auxiliar para obtener una conexión directa"""
-    return oracledb.connect(
-        user=DatabaseConfig.DB_USER,
-        password=DatabaseConfig.DB_PASSWORD,
-        host=DatabaseConfig.DB_HOST,
-        port=DatabaseConfig.DB_PORT,
-        sid=DatabaseConfig.DB_SID
-    )
\ No newline at end of file
+    """Función auxiliar para obtener una conexión directa del pool.
+    Quien la usa debe llamar a close() para devolverla."""
+    return DatabaseConfig._adquirir()
@@ -0,0 +1,20 @@
+-- Migración 001: secuencias para las claves de Venta, Credito, Cuota y Pago.
+-- Para bases ya existentes: cada secuencia arranca después del mayor ID actual,
+-- así no choca con los IDs generados antes por timestamp o max()+1.
+
+DECLARE
+    PROCEDURE crear_secuencia(p_nombre VARCHAR2, p_tabla VARCHAR2, p_columna VARCHAR2) IS
+        v_inicio NUMBER;
+    BEGIN
+        EXECUTE IMMEDIATE 'SELECT NVL(MAX(' || p_columna || '), 0) + 1 FROM ' || p_tabla
+            INTO v_inicio;
+        EXECUTE IMMEDIATE 'CREATE SEQUENCE ' || p_nombre || ' START WITH ' || v_inicio
+            || ' INCREMENT BY 1 CACHE 100';
+    END;
+BEGIN
+    crear_secuencia('seq_venta', 'Venta', 'id_venta');
+    crear_secuencia('seq_credito', 'Credito', 'id_credito');
+    crear_secuencia('seq_cuota', 'Cuota', 'id_pago');
+    crear_secuencia('seq_pago', 'Pago', 'codigo_pago');
+END;
+/
@@ -0,0 +1,8 @@
+-- Migración 002: índice único sobre Venta.codigo_venta.
+-- Las facturas se abren por código (Venta.obtener_factura); sin índice cada
+-- apertura recorre toda la tabla. Si la creación falla por duplicados, hay
+-- que corregir esas ventas antes (ver la consulta de abajo).
+--
+-- SELECT codigo_venta, COUNT(*) FROM Venta GROUP BY codigo_venta HAVING COUNT(*) > 1;
+
+CREATE UNIQUE INDEX ux_venta_codigo ON Venta (codigo_venta);
@@ -0,0 +1,6 @@
+-- Migración 003: índice sobre Venta (fecha DESC, id_venta DESC).
+-- La consulta de ventas recientes (Venta.obtener_recientes) ordena por fecha
+-- descendente y corta con FETCH FIRST; con este índice Oracle lee solo las
+-- primeras filas del índice en lugar de ordenar toda la tabla.
+
+CREATE INDEX ix_venta_fecha ON Venta (fecha DESC, id_venta DESC);
@@ -0,0 +1,23 @@
+-- Migración 004: resumen diario de ventas (ResumenVentasDia).
+-- Los reportes de IVA por trimestre, ventas por tipo y ventas del mes leen de
+-- esta tabla en vez de recorrer Venta. La aplicación la mantiene al registrar
+-- cada venta; aquí se llena con la historia existente. Para recalcularla más
+-- adelante: python -m model.resumen_ventas [desde] [hasta]
+
+CREATE TABLE ResumenVentasDia (
+    fecha DATE NOT NULL,
+    tipo_venta VARCHAR(20) NOT NULL,
+    cantidad INT NOT NULL,
+    total_bruto DECIMAL(14,2) NOT NULL,
+    iva_total DECIMAL(14,2) NOT NULL,
+    total_neto DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (fecha, tipo_venta)
+) ORGANIZATION INDEX;
+
+INSERT INTO ResumenVentasDia (fecha, tipo_venta, cantidad, total_bruto, iva_total, total_neto)
+SELECT TRUNC(fecha), tipo_venta, COUNT(*),
+       NVL(SUM(total_bruto), 0), NVL(SUM(iva_total), 0), NVL(SUM(total_neto), 0)
+FROM Venta
+GROUP BY TRUNC(fecha), tipo_venta;
+
+COMMIT;
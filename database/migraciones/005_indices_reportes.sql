@@ -0,0 +1,20 @@
+-- Migración 005: índices de apoyo para reportes, créditos y auditoría.
+-- Todas las consultas por fecha usan rangos [:desde, :hasta) sobre la columna
+-- sin funciones (util/fechas.py), así que estos índices sí se pueden usar.
+-- Para revisar los planes: python -m report.explicar
+--
+-- Ya cubiertos, no se crean aquí:
+--   Venta(fecha)   -> ix_venta_fecha (migración 003)
+--   Pago(id_pago)  -> índice de la restricción UNIQUE de la tabla
+
+-- Ventas de un cliente (consulta por cliente, reporte de morosos)
+CREATE INDEX ix_venta_cliente ON Venta (codigo_cliente);
+
+-- Cuotas de un crédito por estado (siguiente cuota pendiente, morosos, resúmenes)
+CREATE INDEX ix_cuota_credito_estado ON Cuota (id_credito, estado);
+
+-- Sesión activa de un usuario (registrar_salida, obtener_sesion_activa)
+CREATE INDEX ix_auditoria_usuario_salida ON Auditoria (usuario, fecha_salida);
+
+-- Filtro por rango de fechas y paginación de la ventana de auditoría
+CREATE INDEX ix_auditoria_ingreso ON Auditoria (fecha_ingreso DESC, id_auditoria DESC);
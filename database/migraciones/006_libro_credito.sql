@@ -0,0 +1,37 @@
+-- Migración 006: saldos acumulados del crédito (libro) en la tabla Credito.
+-- Cada pago actualiza estas columnas en la misma transacción
+-- (Credito.registrar_pago_cuota), así la información de un crédito se lee de una
+-- sola fila sin sumar Pago ni contar Cuota. Aquí se llenan con lo que ya
+-- existe; para verificarlas o corregirlas más adelante:
+--   python -m model.credito            (solo informa diferencias)
+--   python -m model.credito --corregir (además las corrige)
+
+ALTER TABLE Credito ADD (
+    total_cuotas INT DEFAULT 0 NOT NULL,
+    cuotas_pagadas INT DEFAULT 0 NOT NULL,
+    total_pagado DECIMAL(12,2) DEFAULT 0 NOT NULL,
+    siguiente_cuota INT,
+    fecha_ultimo_pago DATE
+);
+
+MERGE INTO Credito c
+USING (
+    SELECT cu.id_credito,
+           COUNT(*) AS total_cuotas,
+           COUNT(CASE WHEN cu.estado = 'Pagada' THEN 1 END) AS cuotas_pagadas,
+           COALESCE(SUM(p.valor), 0) AS total_pagado,
+           MIN(CASE WHEN cu.estado != 'Pagada' THEN cu.n_cuota END) AS siguiente_cuota,
+           MAX(p.fecha_pago) AS fecha_ultimo_pago
+    FROM Cuota cu
+    LEFT JOIN Pago p ON p.id_pago = cu.id_pago
+    GROUP BY cu.id_credito
+) r
+ON (c.id_credito = r.id_credito)
+WHEN MATCHED THEN UPDATE SET
+    c.total_cuotas = r.total_cuotas,
+    c.cuotas_pagadas = r.cuotas_pagadas,
+    c.total_pagado = r.total_pagado,
+    c.siguiente_cuota = r.siguiente_cuota,
+    c.fecha_ultimo_pago = r.fecha_ultimo_pago;
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- Migración 007: cartera morosa (CarteraMorosa) y vencimiento de cuotas.
+-- Cuotas 'Pendiente' con fecha de vencimiento pasada se marcan 'Vencida' y se
+-- guarda una foto por cliente con la deuda vencida por días de mora. La
+-- ventana de deudores y su PDF leen de esta tabla. Para llenarla (y una vez
+-- al día en adelante): python -m model.cartera
+
+CREATE TABLE CarteraMorosa (
+    codigo_cliente INT NOT NULL,
+    nombre VARCHAR(100) NOT NULL,
+    creditos INT NOT NULL,
+    cuotas_vencidas INT NOT NULL,
+    dias_mora INT NOT NULL,
+    vencido_0_30 DECIMAL(14,2) NOT NULL,
+    vencido_31_60 DECIMAL(14,2) NOT NULL,
+    vencido_61_90 DECIMAL(14,2) NOT NULL,
+    vencido_90_mas DECIMAL(14,2) NOT NULL,
+    total_vencido DECIMAL(14,2) NOT NULL,
+    exposicion DECIMAL(14,2) NOT NULL,
+    fecha_corte DATE NOT NULL,
+    PRIMARY KEY (codigo_cliente)
+) ORGANIZATION INDEX;
+
+-- Cuotas por vencer (el UPDATE del proceso de cartera)
+CREATE INDEX ix_cuota_estado_vencimiento ON Cuota (estado, fecha_vencimiento);
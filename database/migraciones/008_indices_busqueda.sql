@@ -0,0 +1,26 @@
+-- Migración 008: índices para las búsquedas por nombre (BaseModel.buscar_por_texto).
+-- Las búsquedas primero piden los nombres que EMPIEZAN por el texto
+-- (UPPER(nombre) LIKE 'TEXTO%'), que usan estos índices por función.
+-- Los productos y categorías se buscan en el catálogo en memoria
+-- (util/busqueda.py); el índice de Producto es para las búsquedas directas.
+
+CREATE INDEX ix_cliente_nombre_upper ON Cliente (UPPER(nombre));
+CREATE INDEX ix_producto_nombre_upper ON Producto (UPPER(nombre));
+CREATE INDEX ix_usuario_nombre_upper ON Usuario (UPPER(nombre_usuario));
+
+-- Clientes que tienen el texto EN MEDIO del nombre: índice Oracle Text con
+-- subcadenas (SUBSTRING_INDEX) y sin tildes (BASE_LETTER), que se actualiza
+-- con cada commit. Si Oracle Text no está instalado, la búsqueda usa LIKE.
+BEGIN
+    ctx_ddl.create_preference('cliente_palabras', 'BASIC_WORDLIST');
+    ctx_ddl.set_attribute('cliente_palabras', 'SUBSTRING_INDEX', 'TRUE');
+    ctx_ddl.set_attribute('cliente_palabras', 'PREFIX_INDEX', 'TRUE');
+    ctx_ddl.create_preference('cliente_lexer', 'BASIC_LEXER');
+    ctx_ddl.set_attribute('cliente_lexer', 'BASE_LETTER', 'YES');
+END;
+/
+
+CREATE INDEX ix_cliente_nombre_texto ON Cliente (nombre)
+    INDEXTYPE IS CTXSYS.CONTEXT
+    PARAMETERS ('WORDLIST cliente_palabras LEXER cliente_lexer
+                 STOPLIST CTXSYS.EMPTY_STOPLIST SYNC (ON COMMIT)');
@@ -73,6 +73,12 @@ CREATE TABLE Credito (
     interes DECIMAL(6,2) NOT NULL CHECK (interes >= 0),
     plazo_meses INT NOT NULL CHECK (plazo_meses > 0),
     id_venta INT UNIQUE NOT NULL,
+    -- Libro del crédito: lo actualiza cada pago (ver Credito.registrar_pago_cuota)
+    total_cuotas INT DEFAULT 0 NOT NULL,
+    cuotas_pagadas INT DEFAULT 0 NOT NULL,
+    total_pagado DECIMAL(12,2) DEFAULT 0 NOT NULL,
+    siguiente_cuota INT,
+    fecha_ultimo_pago DATE,
     FOREIGN KEY (id_venta) REFERENCES Venta(id_venta)
 );
 
@@ -103,6 +109,66 @@ CREATE TABLE Auditoria (
     FOREIGN KEY (usuario) REFERENCES Usuario(id_usuario)
 );
 
+-- Resumen diario de ventas para los reportes (ver model/resumen_ventas.py)
+CREATE TABLE ResumenVentasDia (
+    fecha DATE NOT NULL,
+    tipo_venta VARCHAR(20) NOT NULL,
+    cantidad INT NOT NULL,
+    total_bruto DECIMAL(14,2) NOT NULL,
+    iva_total DECIMAL(14,2) NOT NULL,
+    total_neto DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (fecha, tipo_venta)
+) ORGANIZATION INDEX;
+
+-- Foto de la cartera morosa por cliente (ver model/cartera.py)
+CREATE TABLE CarteraMorosa (
+    codigo_cliente INT NOT NULL,
+    nombre VARCHAR(100) NOT NULL,
+    creditos INT NOT NULL,
+    cuotas_vencidas INT NOT NULL,
+    dias_mora INT NOT NULL,
+    vencido_0_30 DECIMAL(14,2) NOT NULL,
+    vencido_31_60 DECIMAL(14,2) NOT NULL,
+    vencido_61_90 DECIMAL(14,2) NOT NULL,
+    vencido_90_mas DECIMAL(14,2) NOT NULL,
+    total_vencido DECIMAL(14,2) NOT NULL,
+    exposicion DECIMAL(14,2) NOT NULL,
+    fecha_corte DATE NOT NULL,
+    PRIMARY KEY (codigo_cliente)
+) ORGANIZATION INDEX;
+
+-- Secuencias para las claves generadas por el sistema (ver database/secuencias.py)
+CREATE SEQUENCE seq_venta START WITH 1 INCREMENT BY 1 CACHE 100;
+CREATE SEQUENCE seq_credito START WITH 1 INCREMENT BY 1 CACHE 100;
+CREATE SEQUENCE seq_cuota START WITH 1 INCREMENT BY 1 CACHE 100;
+CREATE SEQUENCE seq_pago START WITH 1 INCREMENT BY 1 CACHE 100;
+
+-- Índices de apoyo para las consultas de la aplicación
+CREATE UNIQUE INDEX ux_venta_codigo ON Venta (codigo_venta);
+CREATE INDEX ix_venta_fecha ON Venta (fecha DESC, id_venta DESC);
+CREATE INDEX ix_venta_cliente ON Venta (codigo_cliente);
+CREATE INDEX ix_cuota_credito_estado ON Cuota (id_credito, estado);
+CREATE INDEX ix_cuota_estado_vencimiento ON Cuota (estado, fecha_vencimiento);
+CREATE INDEX ix_auditoria_usuario_salida ON Auditoria (usuario, fecha_salida);
+CREATE INDEX ix_auditoria_ingreso ON Auditoria (fecha_ingreso DESC, id_auditoria DESC);
+CREATE INDEX ix_cliente_nombre_upper ON Cliente (UPPER(nombre));
+CREATE INDEX ix_producto_nombre_upper ON Producto (UPPER(nombre));
+CREATE INDEX ix_usuario_nombre_upper ON Usuario (UPPER(nombre_usuario));
+
+-- Búsqueda de clientes por texto en medio del nombre (Oracle Text, ver migración 008)
+BEGIN
+    ctx_ddl.create_preference('cliente_palabras', 'BASIC_WORDLIST');
+    ctx_ddl.set_attribute('cliente_palabras', 'SUBSTRING_INDEX', 'TRUE');
+    ctx_ddl.set_attribute('cliente_palabras', 'PREFIX_INDEX', 'TRUE');
+    ctx_ddl.create_preference('cliente_lexer', 'BASIC_LEXER');
+    ctx_ddl.set_attribute('cliente_lexer', 'BASE_LETTER', 'YES');
+END;
+/
+CREATE INDEX ix_cliente_nombre_texto ON Cliente (nombre)
+    INDEXTYPE IS CTXSYS.CONTEXT
+    PARAMETERS ('WORDLIST cliente_palabras LEXER cliente_lexer
+                 STOPLIST CTXSYS.EMPTY_STOPLIST SYNC (ON COMMIT)');
+
 INSERT INTO Categoria (codigo_categoria, iva, utilidad, nombre) VALUES (1, 0.16, 35.00, 'Audio');
 INSERT INTO Categoria (codigo_categoria, iva, utilidad, nombre) VALUES (2, 0.19, 39.00, 'Video');
 INSERT INTO Categoria (codigo_categoria, iva, utilidad, nombre) VALUES (3, 0.12, 40.00, 'Tecnologia');
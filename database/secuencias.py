@@ -0,0 +1,55 @@
+import threading
+from collections import deque
+from typing import List
+
+from database.connection import DatabaseConfig
+
+
+class GeneradorIds:
+    """Reparte IDs sacados de secuencias de Oracle.
+    En vez de un NEXTVAL por registro trae un bloque de valores en un solo
+    viaje a la BD y los va entregando desde memoria. Las secuencias garantizan
+    que dos cajas nunca reciban el mismo ID (a diferencia de timestamp o max()+1)."""
+
+    TAMANO_BLOQUE = 20
+
+    _bloques = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def siguiente(cls, secuencia: str) -> int:
+        """Retorna el siguiente ID disponible de la secuencia"""
+        return cls.reservar(secuencia, 1)[0]
+
+    @classmethod
+    def reservar(cls, secuencia: str, cantidad: int) -> List[int]:
+        """Reserva `cantidad` IDs de la secuencia. Solo va a la BD cuando
+        el bloque local no alcanza, y entonces trae todos los que faltan de una."""
+        if cantidad <= 0:
+            return []
+
+        with cls._lock:
+            bloque = cls._bloques.setdefault(secuencia, deque())
+            faltantes = cantidad - len(bloque)
+            if faltantes > 0:
+                bloque.extend(cls._traer_bloque(secuencia, max(faltantes, cls.TAMANO_BLOQUE)))
+            return [bloque.popleft() for _ in range(cantidad)]
+
+    @classmethod
+    def descartar(cls, secuencia: str = None):
+        """Olvida los IDs guardados en memoria (p. ej. tras recrear una secuencia).
+        Los valores descartados simplemente no se usan; las secuencias admiten huecos."""
+        with cls._lock:
+            if secuencia is None:
+                cls._bloques.clear()
+            else:
+                cls._bloques.pop(secuencia, None)
+
+    @staticmethod
+    def _traer_bloque(secuencia: str, cantidad: int) -> List[int]:
+        """Trae `cantidad` valores de la secuencia en una sola consulta"""
+        if not secuencia.isidentifier():
+            raise ValueError(f"Nombre de secuencia inválido: {secuencia}")
+
+        sql = f"SELECT {secuencia}.NEXTVAL FROM dual CONNECT BY LEVEL <= :n"
+        return [r[0] for r in DatabaseConfig.execute_query(sql, {'n': cantidad})]
@@ -0,0 +1,163 @@
+"""
+Tablas de amortización (sistema francés) de los créditos
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+Dos modos:
+
+- Exacto (Decimal), para lo que se guarda: valor_cuota() y tabla_amortizacion().
+  Cada período se redondea al centavo y la última cuota se ajusta para que el
+  saldo termine exactamente en 0 (absorbe la diferencia de los redondeos).
+
+- Por lotes (NumPy si está instalado), para proyecciones y simulaciones:
+  tablas_lote() calcula a la vez las tablas de miles de créditos con plazos
+  distintos. Sin NumPy hace lo mismo con listas, más lento.
+
+El interés es la tasa ANUAL en porcentaje (5 = 5% anual), como en Credito.
+"""
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: solo acelera tablas_lote
+    np = None
+
+CENTAVO = Decimal('0.01')
+
+
+@dataclass
+class PeriodoAmortizacion:
+    """Una fila de la tabla de amortización"""
+    n_cuota: int
+    valor_cuota: Decimal
+    interes: Decimal
+    capital: Decimal
+    saldo: Decimal  # Saldo que queda después de pagar la cuota
+
+
+def _centavos(valor: Decimal) -> Decimal:
+    return valor.quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def _centavos_np(valores):
+    """Redondeo al centavo hacia arriba en .5, como _centavos (np.round redondea
+    al par). El np.round previo quita el ruido del float en los empates
+    (32098.145 * 100 = 3209814.4999999995)."""
+    return np.floor(np.round(valores * 100, 6) + 0.5) / 100
+
+
+def tasa_mensual(interes_anual) -> Decimal:
+    """Tasa mensual (fracción) a partir del interés anual en porcentaje"""
+    return Decimal(str(interes_anual)) / 100 / 12
+
+
+def valor_cuota(saldo, interes_anual, plazo_meses: int) -> Decimal:
+    """
+    Cuota fija mensual: Cuota = Saldo * i * (1+i)^n / ((1+i)^n - 1)
+
+    Returns:
+        Decimal redondeado al centavo (0 si el plazo es 0)
+    """
+    if plazo_meses <= 0:
+        return Decimal(0)
+
+    saldo = Decimal(str(saldo))
+    i = tasa_mensual(interes_anual)
+    if i == 0:
+        return _centavos(saldo / plazo_meses)
+
+    factor = (1 + i) ** plazo_meses
+    return _centavos(saldo * i * factor / (factor - 1))
+
+
+def tabla_amortizacion(saldo, interes_anual, plazo_meses: int) -> List[PeriodoAmortizacion]:
+    """
+    Tabla completa con interés, capital y saldo de cada período.
+    La última cuota paga exactamente el saldo que quede más su interés.
+    """
+    saldo = _centavos(Decimal(str(saldo)))
+    i = tasa_mensual(interes_anual)
+    cuota = valor_cuota(saldo, interes_anual, plazo_meses)
+
+    tabla = []
+    for n in range(1, plazo_meses + 1):
+        interes = _centavos(saldo * i)
+        if n == plazo_meses:
+            capital = saldo
+        else:
+            capital = min(cuota - interes, saldo)
+        saldo -= capital
+        tabla.append(PeriodoAmortizacion(n, interes + capital, interes, capital, saldo))
+    return tabla
+
+
+def tablas_lote(saldos: Sequence[float], intereses: Sequence[float],
+                plazos: Sequence[int]) -> dict:
+    """
+    Tablas de amortización de muchos créditos a la vez (en float, al centavo).
+
+    Args:
+        saldos, intereses, plazos: Un valor por crédito (misma longitud)
+
+    Returns:
+        dict con 'cuota', 'interes', 'capital' y 'saldo': matrices de
+        (créditos x plazo máximo). Los períodos después del plazo de un
+        crédito quedan en 0. Con NumPy son ndarrays; sin NumPy, listas de listas.
+    """
+    if np is None:
+        return _tablas_lote_listas(saldos, intereses, plazos)
+
+    saldo = _centavos_np(np.asarray(saldos, dtype=float))
+    i = np.asarray(intereses, dtype=float) / 100 / 12
+    plazo = np.asarray(plazos, dtype=int)
+    n_creditos = len(saldo)
+    n_periodos = int(plazo.max()) if n_creditos else 0
+
+    # Cuota fija de cada crédito (sin interés: saldo / plazo)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = (1 + i) ** plazo
+        cuota = np.where(i > 0, saldo * i * factor / (factor - 1),
+                         saldo / np.maximum(plazo, 1))
+    cuota = np.where(plazo > 0, _centavos_np(cuota), 0.0)
+
+    tablas = {k: np.zeros((n_creditos, n_periodos))
+              for k in ('cuota', 'interes', 'capital', 'saldo')}
+
+    # Un paso por período, vectorizado sobre todos los créditos
+    for p in range(n_periodos):
+        activo = p < plazo
+        ultimo = p == plazo - 1
+        interes = _centavos_np(saldo * i)
+        capital = np.where(ultimo, saldo, np.minimum(cuota - interes, saldo))
+        capital = np.where(activo, capital, 0.0)
+        interes = np.where(activo, interes, 0.0)
+        saldo = np.round(saldo - capital, 2)  # Solo quita el ruido del float
+
+        tablas['interes'][:, p] = interes
+        tablas['capital'][:, p] = capital
+        tablas['cuota'][:, p] = interes + capital
+        tablas['saldo'][:, p] = np.where(activo, saldo, 0.0)
+    return tablas
+
+
+def _tablas_lote_listas(saldos, intereses, plazos) -> dict:
+    """tablas_lote sin NumPy (mismo resultado, con listas)"""
+    n_periodos = max(plazos, default=0)
+    tablas = {k: [] for k in ('cuota', 'interes', 'capital', 'saldo')}
+
+    for saldo, interes_anual, plazo in zip(saldos, intereses, plazos):
+        filas = {k: [0.0] * n_periodos for k in tablas}
+        for periodo in tabla_amortizacion(saldo, interes_anual, plazo):
+            p = periodo.n_cuota - 1
+            filas['cuota'][p] = float(periodo.valor_cuota)
+            filas['interes'][p] = float(periodo.interes)
+            filas['capital'][p] = float(periodo.capital)
+            filas['saldo'][p] = float(periodo.saldo)
+        for k in tablas:
+            tablas[k].append(filas[k])
+    return tablas
@@ -4,13 +4,15 @@ Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
 Fecha: 2025-11
 Licencia: GPLv3
 """
-from modelo_base import BaseModel
-from dataclasses import dataclass
+import re
+
+from modelo_base import BaseModel, registro
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+from util.fechas import rango_dias
 
 
-@dataclass
+@registro
 class AuditoriaData:
     """Representa un registro de auditoría"""
     id_auditoria: int
@@ -207,6 +209,88 @@ class Auditoria(BaseModel):
             print(f"Error al obtener registros con nombres: {e}")
             return []
 
+    def iterar_con_nombres(self):
+        """
+        Recorre todos los registros de auditoría con el nombre del usuario
+        sin cargarlos todos en memoria (para exportaciones grandes).
+
+        Yields:
+            Tuplas: (id_auditoria, fecha_ingreso, fecha_salida, codigo_usuario, nombre_usuario)
+        """
+        sql = """
+            SELECT
+                a.id_auditoria,
+                a.fecha_ingreso,
+                a.fecha_salida,
+                a.usuario,
+                c.nombre
+            FROM Auditoria a
+            INNER JOIN Cliente c ON a.usuario = c.codigo_cliente
+            ORDER BY a.fecha_ingreso DESC, a.id_auditoria DESC
+        """
+        return self.db.stream_query(sql)
+
+    def obtener_pagina_con_nombres(self, limite: int = 200, despues_de: tuple = None,
+                                   cerradas: bool = None, codigo_usuario: int = None,
+                                   nombre: str = None):
+        """
+        Igual que obtener_con_nombres pero de a una página, ordenada por
+        fecha de ingreso descendente (paginación por clave, sin OFFSET).
+        Los filtros se aplican en la consulta.
+
+        Args:
+            limite: Cantidad de registros de la página
+            despues_de: (fecha_ingreso, id_auditoria) del último registro ya mostrado
+            cerradas: True solo sesiones cerradas, False solo activas, None todas
+            codigo_usuario: Solo los registros de ese usuario
+            nombre: Solo los usuarios cuyo nombre contiene el texto (sin
+                    distinguir mayúsculas)
+
+        Returns:
+            (filas, siguiente_clave). siguiente_clave es None si no hay más registros.
+        """
+        sql = """
+            SELECT
+                a.id_auditoria,
+                a.fecha_ingreso,
+                a.fecha_salida,
+                a.usuario,
+                c.nombre
+            FROM Auditoria a
+            INNER JOIN Cliente c ON a.usuario = c.codigo_cliente
+        """
+        params = {'limite': limite}
+        condiciones = []
+        if cerradas is not None:
+            condiciones.append("a.fecha_salida IS NOT NULL" if cerradas
+                               else "a.fecha_salida IS NULL")
+        if codigo_usuario is not None:
+            condiciones.append("a.usuario = :codigo_usuario")
+            params['codigo_usuario'] = codigo_usuario
+        if nombre:
+            # El texto va literal en LIKE: se escapan sus comodines
+            literal = re.sub(r"([\\%_])", r"\\\1", nombre.strip().upper())
+            condiciones.append("UPPER(c.nombre) LIKE :nombre ESCAPE '\\'")
+            params['nombre'] = f"%{literal}%"
+        if despues_de is not None:
+            condiciones.append("(a.fecha_ingreso < :fecha"
+                               " OR (a.fecha_ingreso = :fecha AND a.id_auditoria < :id_auditoria))")
+            params['fecha'], params['id_auditoria'] = despues_de
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += """
+            ORDER BY a.fecha_ingreso DESC, a.id_auditoria DESC
+            FETCH FIRST :limite ROWS ONLY
+        """
+        try:
+            filas = self.db.execute_query(sql, params)
+        except Exception as e:
+            print(f"Error al obtener página de auditoría: {e}")
+            return [], None
+
+        siguiente = (filas[-1][1], filas[-1][0]) if len(filas) == limite else None
+        return filas, siguiente
+
     def obtener_sesiones_activas(self) -> List[tuple]:
         """
         Obtiene todas las sesiones activas con información del usuario.
@@ -231,13 +315,13 @@ class Auditoria(BaseModel):
             print(f"Error al obtener sesiones activas: {e}")
             return []
 
-    def obtener_por_rango_fechas(self, fecha_inicio: datetime, fecha_fin: datetime) -> List[tuple]:
+    def obtener_por_rango_fechas(self, fecha_inicio: date, fecha_fin: date) -> List[tuple]:
         """
         Obtiene registros de auditoría en un rango de fechas.
 
         Args:
-            fecha_inicio: Fecha inicial del rango
-            fecha_fin: Fecha final del rango
+            fecha_inicio: Primer día del rango
+            fecha_fin: Último día del rango (se incluye completo)
 
         Returns:
             Lista de tuplas con información de auditoría y usuario
@@ -251,14 +335,12 @@ class Auditoria(BaseModel):
                 c.nombre
             FROM Auditoria a
             INNER JOIN Cliente c ON a.usuario = c.codigo_cliente
-            WHERE a.fecha_ingreso BETWEEN :fecha_inicio AND :fecha_fin
+            WHERE a.fecha_ingreso >= :desde AND a.fecha_ingreso < :hasta
             ORDER BY a.fecha_ingreso DESC
         """
+        desde, hasta = rango_dias(fecha_inicio, fecha_fin)
         try:
-            return self.db.execute_query(sql, {
-                'fecha_inicio': fecha_inicio,
-                'fecha_fin': fecha_fin
-            })
+            return self.db.execute_query(sql, {'desde': desde, 'hasta': hasta})
         except Exception as e:
             print(f"Error al obtener registros por rango de fechas: {e}")
             return []
@@ -0,0 +1,171 @@
+"""
+Cartera morosa: vencimiento de cuotas y antigüedad de la deuda por cliente
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+El proceso de cartera (una transacción):
+
+1. Marca como 'Vencida' todas las cuotas 'Pendiente' cuya fecha de
+   vencimiento ya pasó, con un solo UPDATE.
+2. Recalcula la tabla CarteraMorosa: una fila por cliente con cuotas
+   vencidas, con lo vencido repartido por días de mora (0-30, 31-60, 61-90,
+   más de 90) y la exposición (todo lo que el cliente aún debe, vencido o no).
+
+La ventana de deudores y su PDF leen solo CarteraMorosa (pocas filas ya
+agregadas). Se corre una vez al día:
+
+    python -m model.cartera              # corte = hoy
+    python -m model.cartera 2025-11-30   # corte en otra fecha
+
+La ventana también lo corre en segundo plano si la foto es de un día anterior.
+"""
+import sys
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from modelo_base import BaseModel, registro
+
+
+@registro
+class MorosoData:
+    """Deuda vencida de un cliente a la fecha de corte"""
+    codigo_cliente: int
+    nombre: str
+    creditos: int
+    cuotas_vencidas: int
+    dias_mora: int  # Días de la cuota vencida más antigua
+    vencido_0_30: Decimal
+    vencido_31_60: Decimal
+    vencido_61_90: Decimal
+    vencido_90_mas: Decimal
+    total_vencido: Decimal
+    exposicion: Decimal  # Saldo sin pagar del cliente (vencido o no)
+    fecha_corte: date
+
+    def a_fila(self) -> tuple:
+        """Fila para la tabla de la ventana y el PDF"""
+        return (self.nombre, self.creditos, self.cuotas_vencidas, self.dias_mora,
+                self.vencido_0_30, self.vencido_31_60, self.vencido_61_90,
+                self.vencido_90_mas, self.total_vencido, self.exposicion)
+
+
+class Cartera(BaseModel):
+    """Proceso de vencimiento de cuotas y foto de la cartera morosa"""
+
+    ENCABEZADOS = ["Cliente", "Créditos", "Cuotas Vencidas", "Días Mora",
+                   "0-30", "31-60", "61-90", "+90", "Total Vencido", "Exposición"]
+
+    SQL_MARCAR_VENCIDAS = """
+        UPDATE Cuota SET estado = 'Vencida'
+        WHERE estado = 'Pendiente' AND fecha_vencimiento < :corte
+    """
+
+    # Días de mora de una cuota vencida: :corte - fecha_vencimiento (>= 1).
+    # Solo cuenta como vencida a la fecha de corte lo que venció antes de ella:
+    # con un corte anterior a otra corrida ya hay cuotas 'Vencida' posteriores.
+    SQL_CARTERA = """
+        INSERT INTO CarteraMorosa
+            (codigo_cliente, nombre, creditos, cuotas_vencidas, dias_mora,
+             vencido_0_30, vencido_31_60, vencido_61_90, vencido_90_mas,
+             total_vencido, exposicion, fecha_corte)
+        SELECT cl.codigo_cliente, cl.nombre,
+               COUNT(DISTINCT cr.id_credito),
+               COUNT(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                          THEN 1 END),
+               MAX(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                        THEN :corte - cu.fecha_vencimiento END),
+               NVL(SUM(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                             AND :corte - cu.fecha_vencimiento <= 30
+                            THEN cu.valor_cuota END), 0),
+               NVL(SUM(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                             AND :corte - cu.fecha_vencimiento BETWEEN 31 AND 60
+                            THEN cu.valor_cuota END), 0),
+               NVL(SUM(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                             AND :corte - cu.fecha_vencimiento BETWEEN 61 AND 90
+                            THEN cu.valor_cuota END), 0),
+               NVL(SUM(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                             AND :corte - cu.fecha_vencimiento > 90
+                            THEN cu.valor_cuota END), 0),
+               NVL(SUM(CASE WHEN cu.estado = 'Vencida' AND cu.fecha_vencimiento < :corte
+                            THEN cu.valor_cuota END), 0),
+               SUM(cu.valor_cuota),
+               :corte
+        FROM Cuota cu
+        JOIN Credito cr ON cr.id_credito = cu.id_credito
+        JOIN Venta v ON v.id_venta = cr.id_venta
+        JOIN Cliente cl ON cl.codigo_cliente = v.codigo_cliente
+        WHERE cu.estado != 'Pagada'
+        GROUP BY cl.codigo_cliente, cl.nombre
+        HAVING COUNT(CASE WHEN cu.estado = 'Vencida'
+                           AND cu.fecha_vencimiento < :corte THEN 1 END) > 0
+    """
+
+    SQL_OBTENER = """
+        SELECT codigo_cliente, nombre, creditos, cuotas_vencidas, dias_mora,
+               vencido_0_30, vencido_31_60, vencido_61_90, vencido_90_mas,
+               total_vencido, exposicion, fecha_corte
+        FROM CarteraMorosa
+        ORDER BY dias_mora DESC, total_vencido DESC
+    """
+
+    def get_table_name(self):
+        return "CarteraMorosa"
+
+    def get_primary_key(self):
+        return "codigo_cliente"
+
+    def actualizar(self, corte: date = None) -> dict:
+        """
+        Marca las cuotas vencidas y recalcula la foto de la cartera morosa,
+        en una sola transacción.
+
+        Args:
+            corte: Fecha de corte (None = hoy). Vence lo que venció antes de ella.
+
+        Returns:
+            dict con cuotas_vencidas (marcadas ahora) y clientes, o None si falla
+        """
+        params = {'corte': corte or date.today()}
+        try:
+            with self.db.get_transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(self.SQL_MARCAR_VENCIDAS, params)
+                    marcadas = cursor.rowcount
+                    cursor.execute("DELETE FROM CarteraMorosa")
+                    cursor.execute(self.SQL_CARTERA, params)
+                    return {'cuotas_vencidas': marcadas, 'clientes': cursor.rowcount}
+        except Exception as e:
+            print(f"Error al actualizar la cartera morosa: {e}")
+            return None
+
+    def obtener(self) -> List[MorosoData]:
+        """Clientes morosos de la última foto, los de más días de mora primero"""
+        try:
+            resultados = self.db.execute_query(self.SQL_OBTENER)
+            return [MorosoData(*r) for r in resultados]
+        except Exception as e:
+            print(f"Error al obtener la cartera morosa: {e}")
+            return []
+
+    def fecha_corte(self) -> Optional[date]:
+        """Fecha de corte de la foto actual (None si está vacía)"""
+        try:
+            resultado = self.db.execute_query("SELECT MAX(fecha_corte) FROM CarteraMorosa")
+            corte = resultado[0][0] if resultado else None
+            return corte.date() if hasattr(corte, 'date') else corte
+        except Exception as e:
+            print(f"Error al obtener la fecha de corte: {e}")
+            return None
+
+
+if __name__ == "__main__":
+    corte = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else date.today()
+    resultado = Cartera().actualizar(corte)
+    if resultado is None:
+        sys.exit(1)
+    print(f"✓ Cartera al {corte}: {resultado['cuotas_vencidas']} cuotas marcadas como vencidas, "
+          f"{resultado['clientes']} clientes morosos")
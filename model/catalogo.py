@@ -0,0 +1,134 @@
+"""
+Catálogo en memoria de productos y categorías
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from database.connection import DatabaseConfig
+from model.producto import Producto, ProductoData
+from model.categoria import Categoria, CategoriaData
+from util.busqueda import IndiceTexto
+
+
+class Catalogo:
+    """Cache de lectura de Producto y Categoria compartido por todas las ventanas.
+
+    La primera consulta carga las dos tablas; después las búsquedas por código
+    o por categoría son O(1) sin ir a la BD, y las búsquedas por nombre usan un
+    índice de texto en memoria (util/busqueda.py). Se recarga cuando:
+      - pasa el TTL,
+      - Producto/Categoria crean, actualizan o eliminan (invalidar()),
+      - otra caja cambió las tablas (se revisa ORA_ROWSCN cada INTERVALO_VERIFICACION).
+
+    Los objetos que entrega son compartidos: no se deben modificar.
+    """
+
+    TTL = 300                   # segundos que dura el catálogo cargado
+    INTERVALO_VERIFICACION = 15  # segundos entre revisiones de cambios en la BD
+
+    _lock = threading.RLock()
+    _productos: Dict[int, ProductoData] = {}
+    _por_categoria: Dict[int, List[ProductoData]] = {}
+    _categorias: Dict[int, CategoriaData] = {}
+    _indice_productos: IndiceTexto = IndiceTexto([])
+    _indice_categorias: IndiceTexto = IndiceTexto([])
+    _cargado_en = None
+    _verificado_en = None
+    _firma = None
+
+    @classmethod
+    def productos(cls) -> List[ProductoData]:
+        """Todos los productos ordenados por nombre"""
+        cls._asegurar_vigente()
+        return list(cls._productos.values())
+
+    @classmethod
+    def producto(cls, codigo: int) -> Optional[ProductoData]:
+        """Producto por código, o None si no existe"""
+        cls._asegurar_vigente()
+        return cls._productos.get(codigo)
+
+    @classmethod
+    def productos_por_categoria(cls, codigo_categoria: int) -> List[ProductoData]:
+        """Productos de una categoría ordenados por nombre"""
+        cls._asegurar_vigente()
+        return list(cls._por_categoria.get(codigo_categoria, []))
+
+    @classmethod
+    def buscar_productos(cls, texto: str, limite: int = None) -> List[ProductoData]:
+        """Productos cuyo nombre contiene el texto (sin importar tildes ni
+        mayúsculas), los que empiezan así primero"""
+        cls._asegurar_vigente()
+        return cls._indice_productos.buscar(texto, limite)
+
+    @classmethod
+    def buscar_categorias(cls, texto: str) -> List[CategoriaData]:
+        """Categorías cuyo nombre contiene el texto"""
+        cls._asegurar_vigente()
+        return cls._indice_categorias.buscar(texto)
+
+    @classmethod
+    def categorias(cls) -> List[CategoriaData]:
+        """Todas las categorías ordenadas por código"""
+        cls._asegurar_vigente()
+        return list(cls._categorias.values())
+
+    @classmethod
+    def categoria(cls, codigo_categoria: int) -> Optional[CategoriaData]:
+        """Categoría por código, o None si no existe"""
+        cls._asegurar_vigente()
+        return cls._categorias.get(codigo_categoria)
+
+    @classmethod
+    def invalidar(cls):
+        """Marca el catálogo como viejo; la siguiente lectura lo recarga"""
+        with cls._lock:
+            cls._cargado_en = None
+
+    @classmethod
+    def _asegurar_vigente(cls):
+        """Recarga el catálogo si venció, fue invalidado o cambió en la BD"""
+        with cls._lock:
+            ahora = time.monotonic()
+            if cls._cargado_en is None or ahora - cls._cargado_en > cls.TTL:
+                cls._cargar()
+            elif ahora - cls._verificado_en > cls.INTERVALO_VERIFICACION:
+                cls._verificado_en = ahora
+                if cls._firma_bd() != cls._firma:
+                    cls._cargar()
+
+    @classmethod
+    def _cargar(cls):
+        """Lee las dos tablas y arma los índices"""
+        firma = cls._firma_bd()
+        categorias = Categoria().obtener_todos_como_objetos()
+        productos = sorted(Producto().obtener_todos_como_objetos(), key=lambda p: p.nombre)
+
+        por_categoria = {}
+        for p in productos:
+            por_categoria.setdefault(p.codigo_categoria, []).append(p)
+
+        cls._categorias = {c.codigo_categoria: c for c in categorias}
+        cls._productos = {p.codigo: p for p in productos}
+        cls._por_categoria = por_categoria
+        cls._indice_productos = IndiceTexto((p, p.nombre) for p in productos)
+        cls._indice_categorias = IndiceTexto((c, c.nombre) for c in categorias)
+        cls._firma = firma
+        cls._cargado_en = cls._verificado_en = time.monotonic()
+
+    @staticmethod
+    def _firma_bd():
+        """Resumen barato del estado de las tablas: si cambia, alguien las modificó.
+        ORA_ROWSCN detecta inserciones y actualizaciones; COUNT(*) los borrados."""
+        sql = """
+            SELECT (SELECT MAX(ORA_ROWSCN) FROM Producto),
+                   (SELECT COUNT(*) FROM Producto),
+                   (SELECT MAX(ORA_ROWSCN) FROM Categoria),
+                   (SELECT COUNT(*) FROM Categoria)
+            FROM dual
+        """
+        return tuple(DatabaseConfig.execute_query(sql)[0])
@@ -4,13 +4,12 @@ Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
 Fecha: 2025-11
 Licencia: GPLv3
 """
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import List, Optional
 from decimal import Decimal
 
 
-@dataclass
+@registro
 class CategoriaData:
     """Representa una categoría de productos"""
     codigo_categoria: int
@@ -31,6 +30,9 @@ class Categoria(BaseModel):
     def get_primary_key(self):
         return "codigo_categoria"
 
+    def get_clase_datos(self):
+        return CategoriaData
+
     def crear(self, codigo_categoria: int, iva: Decimal, utilidad: Decimal, nombre: str) -> bool:
         """Crea una nueva categoría"""
         sql = """
@@ -44,6 +46,7 @@ class Categoria(BaseModel):
                 'utilidad': utilidad,
                 'nombre': nombre
             }, fetch=False)
+            self._invalidar_catalogo()
             return True
         except Exception as e:
             print(f"Error al crear categoría: {e}")
@@ -71,40 +74,31 @@ class Categoria(BaseModel):
 
         try:
             filas = self.db.execute_query(sql, params, fetch=False)
+            self._invalidar_catalogo()
             return filas > 0
         except Exception as e:
             print(f"Error al actualizar categoría: {e}")
             return False
 
+    def eliminar(self, codigo_categoria: int) -> bool:
+        """Elimina una categoría"""
+        eliminado = super().eliminar(codigo_categoria)
+        self._invalidar_catalogo()
+        return eliminado
+
+    @staticmethod
+    def _invalidar_catalogo():
+        """Avisa al catálogo en memoria que las categorías cambiaron"""
+        from model.catalogo import Catalogo
+        Catalogo.invalidar()
+
     def obtener_todos_como_objetos(self) -> List[CategoriaData]:
-        """Obtiene todas las categorías como objetos"""
-        resultados = self.obtener_todos()
-        categorias = []
-
-        for r in resultados:
-            # Mapeo explícito de las columnas según el orden en la tabla
-            # Asumiendo el orden: codigo_categoria, iva, utilidad, nombre
-            categoria = CategoriaData(
-                codigo_categoria=r[0],
-                iva=Decimal(str(r[1])),  # Convertir a Decimal
-                utilidad=Decimal(str(r[2])),  # Convertir a Decimal
-                nombre=r[3]
-            )
-            categorias.append(categoria)
-
-        return categorias
+        """Obtiene todas las categorías como objetos (iva y utilidad llegan como Decimal)"""
+        return self.seleccionar(orden="codigo_categoria")
 
     def obtener_por_codigo(self, codigo_categoria: int) -> Optional[CategoriaData]:
         """Obtiene una categoría por su código"""
-        resultado = self.obtener_por_id(codigo_categoria)
-        if resultado:
-            return CategoriaData(
-                codigo_categoria=resultado[0],
-                iva=Decimal(str(resultado[1])),
-                utilidad=Decimal(str(resultado[2])),
-                nombre=resultado[3]
-            )
-        return None
+        return self.obtener_objeto(codigo_categoria)
 
     def obtener_todos(self):
         """Obtiene todos los registros de la tabla"""
@@ -112,17 +106,6 @@ class Categoria(BaseModel):
         return self.db.execute_query(sql)
 
     def buscar_por_nombre(self, nombre: str) -> List[CategoriaData]:
-        """Busca categorías por nombre"""
-        sql = "SELECT * FROM Categoria WHERE UPPER(nombre) LIKE UPPER(:nombre)"
-        resultados = self.db.execute_query(sql, {'nombre': f'%{nombre}%'})
-
-        categorias = []
-        for r in resultados:
-            categoria = CategoriaData(
-                codigo_categoria=r[0],
-                iva=Decimal(str(r[1])),
-                utilidad=Decimal(str(r[2])),
-                nombre=r[3]
-            )
-            categorias.append(categoria)
-        return categorias
\ No newline at end of file
+        """Busca categorías por nombre (en el catálogo en memoria)"""
+        from model.catalogo import Catalogo
+        return Catalogo.buscar_categorias(nombre)
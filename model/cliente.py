@@ -6,12 +6,11 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
 
 
-@dataclass
+@registro
 class ClienteData:
     """Representa un cliente (solo datos de contacto)"""
     codigo_cliente: int
@@ -38,6 +37,9 @@ class Cliente(BaseModel):
     def get_primary_key(self):
         return "codigo_cliente"
 
+    def get_clase_datos(self):
+        return ClienteData
+
     def crear(self, codigo_cliente: int, nombre: str, telefono: str = None,
               departamento: str = None, municipio: str = None, calle: str = None,
               direccion: str = None) -> bool:
@@ -104,20 +106,16 @@ class Cliente(BaseModel):
 
     def obtener_todos_como_objetos(self) -> List[ClienteData]:
         """Obtiene todos los clientes como objetos"""
-        resultados = self.obtener_todos()
-        return [ClienteData(*r) for r in resultados]
+        return self.seleccionar()
 
-    def buscar_por_nombre(self, nombre: str) -> List[ClienteData]:
-        """Busca clientes por nombre"""
-        sql = "SELECT * FROM Cliente WHERE UPPER(nombre) LIKE UPPER(:nombre)"
-        resultados = self.db.execute_query(sql, {'nombre': f'%{nombre}%'})
-        return [ClienteData(*r) for r in resultados]
+    def buscar_por_nombre(self, nombre: str, limite: int = None) -> List[ClienteData]:
+        """Busca clientes por nombre: primero los que empiezan así (índice sobre
+        UPPER(nombre)) y después los que lo contienen (índice Oracle Text)"""
+        return self.buscar_por_texto("nombre", nombre, limite, indice_texto=True)
 
     def buscar_por_municipio(self, municipio: str) -> List[ClienteData]:
         """Busca clientes por municipio"""
-        sql = "SELECT * FROM Cliente WHERE UPPER(municipio) = UPPER(:municipio)"
-        resultados = self.db.execute_query(sql, {'municipio': municipio})
-        return [ClienteData(*r) for r in resultados]
+        return self.seleccionar("UPPER(municipio) = UPPER(:municipio)", {'municipio': municipio})
 
     def eliminar(self, id_valor):
         """Elimina un cliente por su código"""
@@ -6,14 +6,21 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
+from database.connection import columnas_de
 from typing import Optional, List
-from datetime import date, datetime
+from datetime import date
+from decimal import Decimal
 from dateutil.relativedelta import relativedelta
+from model import amortizacion
+from model.cuota import CuotaData
 
 
-@dataclass
+class LibroDesactualizado(Exception):
+    """El libro del crédito (siguiente_cuota) no coincide con sus cuotas"""
+
+
+@registro
 class CreditoData:
     """Representa un crédito asociado a una venta"""
     id_credito: int
@@ -22,57 +29,58 @@ class CreditoData:
     interes: float
     plazo_meses: int
     id_venta: int
+    # Libro del crédito (se actualiza con cada pago)
+    total_cuotas: int = 0
+    cuotas_pagadas: int = 0
+    total_pagado: float = 0
+    siguiente_cuota: Optional[int] = None
+    fecha_ultimo_pago: Optional[date] = None
 
     def __str__(self):
         return f"Credito(id={self.id_credito}, venta={self.id_venta})"
 
+    @property
+    def saldo_pendiente(self) -> float:
+        return self.saldo_financiado - self.total_pagado
 
-@dataclass
-class CuotaData:
-    """Estructura de datos para una cuota"""
-    id_pago: int
-    n_cuota: int
-    fecha_vencimiento: date
-    valor_cuota: float
-    estado: str
-    id_credito: int
 
+class Credito(BaseModel):
 
-def convertir_fecha_oracle(fecha_obj):
+    MAX_IN = 1000  # Oracle no admite más elementos en una lista IN
+
+    # Libro de cada crédito calculado desde Cuota y Pago (la fuente de verdad).
+    # Lo usan recalcular_libro y conciliar_libro (ver _sql_libro_real).
+    SQL_LIBRO_REAL = """
+        SELECT c.id_credito,
+               COUNT(cu.id_pago) AS total_cuotas,
+               COUNT(CASE WHEN cu.estado = 'Pagada' THEN 1 END) AS cuotas_pagadas,
+               COALESCE(SUM(p.valor), 0) AS total_pagado,
+               MIN(CASE WHEN cu.estado != 'Pagada' THEN cu.n_cuota END) AS siguiente_cuota,
+               MAX(p.fecha_pago) AS fecha_ultimo_pago
+        FROM Credito c
+        LEFT JOIN Cuota cu ON cu.id_credito = c.id_credito
+        LEFT JOIN Pago p ON p.id_pago = cu.id_pago
+        {filtro}
+        GROUP BY c.id_credito
     """
-    Convierte una fecha de Oracle (que puede venir como string o datetime) a objeto date
-    """
-    if fecha_obj is None:
-        return date.today()
-
-    if isinstance(fecha_obj, date):
-        return fecha_obj
-
-    if isinstance(fecha_obj, datetime):
-        return fecha_obj.date()
 
-    if isinstance(fecha_obj, str):
-        # Intentar diferentes formatos de Oracle
-        formatos = [
-            '%Y-%m-%d',
-            '%d/%m/%Y',
-            '%Y-%m-%d %H:%M:%S',
-            '%d-%m-%Y',
-        ]
+    def _sql_libro_real(self, id_credito: int = None, ids_credito: List[int] = None):
+        """SQL_LIBRO_REAL de un crédito (por clave primaria), de varios
+        (IN, a lo sumo MAX_IN) o de todos. El filtro se arma solo si hay ids:
+        con `:id IS NULL OR ...` Oracle no usa la clave primaria y un solo
+        crédito costaría lo de la tabla entera.
 
-        for fmt in formatos:
-            try:
-                return datetime.strptime(fecha_obj, fmt).date()
-            except ValueError:
-                continue
-
-        print(f"⚠️ Formato de fecha no reconocido: {fecha_obj}")
-        return date.today()
-
-    return date.today()
-
-
-class Credito(BaseModel):
+        Returns:
+            (sql, params)
+        """
+        if id_credito is not None:
+            return (self.SQL_LIBRO_REAL.format(filtro="WHERE c.id_credito = :id_credito"),
+                    {'id_credito': id_credito})
+        if ids_credito is not None:
+            binds = {f"c{i}": id_c for i, id_c in enumerate(ids_credito)}
+            filtro = f"WHERE c.id_credito IN ({', '.join(':' + b for b in binds)})"
+            return self.SQL_LIBRO_REAL.format(filtro=filtro), binds
+        return self.SQL_LIBRO_REAL.format(filtro=""), {}
 
     def get_table_name(self):
         return "Credito"
@@ -80,6 +88,12 @@ class Credito(BaseModel):
     def get_primary_key(self):
         return "id_credito"
 
+    def get_sequence_name(self):
+        return "seq_credito"
+
+    def get_clase_datos(self):
+        return CreditoData
+
     # ---------------------------------------------------------
     # CREAR
     # ---------------------------------------------------------
@@ -164,23 +178,20 @@ class Credito(BaseModel):
     # OBTENER COMO OBJETOS
     # ---------------------------------------------------------
     def obtener_todos_como_objetos(self) -> List[CreditoData]:
-        resultados = self.obtener_todos()
-        return [CreditoData(*r) for r in resultados]
+        return self.seleccionar()
 
     # ---------------------------------------------------------
     # OBTENER POR ID
     # ---------------------------------------------------------
     def obtener_por_id_credito(self, id_credito: int) -> Optional[CreditoData]:
-        resultado = self.obtener_por_id(id_credito)
-        return CreditoData(*resultado) if resultado else None
+        return self.obtener_objeto(id_credito)
 
     # ---------------------------------------------------------
     # OBTENER POR VENTA
     # ---------------------------------------------------------
     def obtener_por_venta(self, id_venta: int) -> Optional[CreditoData]:
-        sql = "SELECT * FROM Credito WHERE id_venta = :id_venta"
-        resultado = self.db.execute_query(sql, {'id_venta': id_venta})
-        return CreditoData(*resultado[0]) if resultado else None
+        resultado = self.seleccionar("id_venta = :id_venta", {'id_venta': id_venta})
+        return resultado[0] if resultado else None
 
     # ---------------------------------------------------------
     # ELIMINAR
@@ -196,9 +207,8 @@ class Credito(BaseModel):
 
     def obtener_creditos_activos(self) -> List[CreditoData]:
         """Obtiene todos los créditos con estado 'Activo' (que tengan cuotas pendientes)"""
-        sql = """
-            SELECT c.id_credito, c.cuota_inicial, c.saldo_financiado,
-                   c.interes, c.plazo_meses, c.id_venta
+        sql = f"""
+            SELECT {self.columnas('c')}
             FROM Credito c
             INNER JOIN Venta v ON c.id_venta = v.id_venta
             WHERE v.estado_credito = 'Activo'
@@ -209,8 +219,68 @@ class Credito(BaseModel):
                ))
             ORDER BY c.id_credito DESC
         """
-        resultados = self.db.execute_query(sql)
-        return [CreditoData(*r) for r in resultados]
+        return self.db.execute_query(sql, clase=CreditoData)
+
+    # Resumen de un crédito para listas/combos (cuotas y saldos salen del libro)
+    SQL_RESUMEN = """
+        SELECT c.id_credito,
+               v.id_venta,
+               v.codigo_venta,
+               cl.nombre AS nombre_cliente,
+               c.saldo_financiado,
+               c.total_cuotas,
+               c.cuotas_pagadas,
+               c.total_pagado,
+               c.saldo_financiado - c.total_pagado AS saldo_pendiente
+        FROM Credito c
+        INNER JOIN Venta v ON c.id_venta = v.id_venta
+        INNER JOIN Cliente cl ON v.codigo_cliente = cl.codigo_cliente
+    """
+
+    @staticmethod
+    def _a_resumen(r) -> dict:
+        """Convierte una fila de SQL_RESUMEN en dict"""
+        return {
+            'id_credito': r[0],
+            'id_venta': r[1],
+            'codigo_venta': r[2],
+            'nombre_cliente': r[3],
+            'saldo_financiado': r[4],
+            'total_cuotas': r[5],
+            'cuotas_pagadas': r[6],
+            'total_pagado': r[7],
+            'saldo_pendiente': r[8]
+        }
+
+    def obtener_resumen_creditos_activos(self, limite: int = None,
+                                         desplazamiento: int = 0) -> List[dict]:
+        """
+        Obtiene en UNA consulta el resumen de todos los créditos activos
+        (cliente, venta, cuotas y saldo pendiente) para llenar listas/combos.
+        Cuotas y saldos salen del libro del crédito, sin recorrer Cuota ni Pago.
+
+        Args:
+            limite: Máximo de créditos a retornar (None = todos)
+            desplazamiento: Créditos a saltar (para paginar)
+        """
+        sql = self.SQL_RESUMEN + """
+            WHERE v.estado_credito = 'Activo'
+               OR (v.estado_credito IS NULL AND c.cuotas_pagadas < c.total_cuotas)
+            ORDER BY c.id_credito DESC
+        """
+        params = {}
+        if limite is not None:
+            sql += " OFFSET :desplazamiento ROWS FETCH NEXT :limite ROWS ONLY"
+            params = {'desplazamiento': desplazamiento, 'limite': limite}
+
+        resultados = self.db.execute_query(sql, params)
+        return [self._a_resumen(r) for r in resultados]
+
+    def obtener_resumen_credito(self, id_credito: int) -> Optional[dict]:
+        """Resumen de un solo crédito (lectura por clave primaria)"""
+        sql = self.SQL_RESUMEN + " WHERE c.id_credito = :id_credito"
+        resultado = self.db.execute_query(sql, {'id_credito': id_credito})
+        return self._a_resumen(resultado[0]) if resultado else None
 
     def obtener_info_credito_completa(self, id_credito: int) -> Optional[dict]:
         """
@@ -221,6 +291,7 @@ class Credito(BaseModel):
         - Cuotas pagadas
         - Total pagado
         - Saldo pendiente
+        Los totales vienen del libro del crédito: es una lectura por clave primaria.
         """
         sql = """
             SELECT c.id_credito,
@@ -233,20 +304,12 @@ class Credito(BaseModel):
                    v.codigo_cliente,
                    cl.nombre as nombre_cliente,
                    cl.telefono,
-                   (SELECT COUNT(*) FROM Cuota WHERE id_credito = c.id_credito) as total_cuotas,
-                   (SELECT COUNT(*) 
-                    FROM Cuota 
-                    WHERE id_credito = c.id_credito 
-                      AND estado = 'Pagada') as cuotas_pagadas,
-                   (SELECT COALESCE(SUM(p.valor), 0) 
-                    FROM Pago p 
-                    INNER JOIN Cuota cu ON p.id_pago = cu.id_pago 
-                    WHERE cu.id_credito = c.id_credito) as total_pagado,
-                   (c.saldo_financiado - 
-                    COALESCE((SELECT SUM(p.valor) 
-                              FROM Pago p 
-                              INNER JOIN Cuota cu ON p.id_pago = cu.id_pago 
-                              WHERE cu.id_credito = c.id_credito), 0)) as saldo_pendiente
+                   c.total_cuotas,
+                   c.cuotas_pagadas,
+                   c.total_pagado,
+                   c.saldo_financiado - c.total_pagado as saldo_pendiente,
+                   c.siguiente_cuota,
+                   c.fecha_ultimo_pago
             FROM Credito c
             INNER JOIN Venta v ON c.id_venta = v.id_venta
             INNER JOIN Cliente cl ON v.codigo_cliente = cl.codigo_cliente
@@ -273,50 +336,231 @@ class Credito(BaseModel):
             'total_cuotas': r[10],
             'cuotas_pagadas': r[11],
             'total_pagado': r[12],
-            'saldo_pendiente': r[13]
+            'saldo_pendiente': r[13],
+            'siguiente_cuota': r[14],
+            'fecha_ultimo_pago': r[15]
         }
 
-    def obtener_siguiente_cuota_pendiente(self, id_credito: int) -> Optional['CuotaData']:
-        """Obtiene la siguiente cuota pendiente de pago"""
-        sql = """
-            SELECT id_pago, n_cuota, fecha_vencimiento, valor_cuota, estado, id_credito
+    def obtener_siguiente_cuota_pendiente(self, id_credito: int) -> Optional[CuotaData]:
+        """Obtiene la siguiente cuota sin pagar (Pendiente o Vencida)"""
+        sql = f"""
+            SELECT {columnas_de(CuotaData)}
             FROM Cuota
             WHERE id_credito = :id_credito
-              AND estado = 'Pendiente'
+              AND estado != 'Pagada'
             ORDER BY n_cuota ASC
             FETCH FIRST 1 ROWS ONLY
         """
-        resultado = self.db.execute_query(sql, {'id_credito': id_credito})
+        try:
+            resultado = self.db.execute_query(sql, {'id_credito': id_credito}, clase=CuotaData)
+            return resultado[0] if resultado else None
+        except Exception as e:
+            print(f"Error al obtener la siguiente cuota: {e}")
+            return None
 
-        if resultado:
-            try:
-                # Convertir la tupla a lista
-                datos = list(resultado[0])
-
-                print(f"DEBUG - Datos originales de cuota: {datos}")
-                print(f"DEBUG - Tipos: {[type(x).__name__ for x in datos]}")
-
-                # Crear el objeto con el orden correcto del SELECT
-                cuota = CuotaData(
-                    id_pago=int(datos[0]),
-                    n_cuota=int(datos[1]),
-                    fecha_vencimiento=convertir_fecha_oracle(datos[2]),
-                    valor_cuota=float(datos[3]),
-                    estado=str(datos[4]),
-                    id_credito=int(datos[5])
-                )
-
-                print(f"DEBUG - Cuota creada: {cuota}")
-                return cuota
-
-            except Exception as e:
-                print(f"❌ Error al crear CuotaData: {e}")
-                print(f"   Datos: {resultado[0]}")
-                import traceback
-                traceback.print_exc()
-                return None
-
-        return None
+    # ---------------------------------------------------------
+    # PAGOS Y LIBRO DEL CRÉDITO
+    # ---------------------------------------------------------
+    # Sentencias del asiento de un pago; las usan el pago en línea
+    # (SQL_PAGAR_SIGUIENTE_CUOTA) y la importación masiva (util.importar_pagos).
+    # En el libro, :valor y :cantidad son lo pagado en esta transacción.
+    SQL_INSERTAR_PAGO = """
+        INSERT INTO Pago (codigo_pago, fecha_pago, estado, valor, id_pago)
+        VALUES (:codigo_pago, :fecha_pago, 'Completado', :valor, :id_pago)
+    """
+
+    SQL_LIBRO_PAGO = """
+        UPDATE Credito
+        SET total_pagado = total_pagado + :valor,
+            cuotas_pagadas = cuotas_pagadas + :cantidad,
+            fecha_ultimo_pago = GREATEST(NVL(fecha_ultimo_pago, :fecha_pago), :fecha_pago),
+            siguiente_cuota = (SELECT MIN(n_cuota) FROM Cuota
+                               WHERE id_credito = :id_credito AND estado != 'Pagada')
+        WHERE id_credito = :id_credito
+    """
+
+    SQL_FINALIZAR_VENTA = """
+        UPDATE Venta SET estado_credito = 'Finalizado'
+        WHERE id_venta = (SELECT id_venta FROM Credito
+                          WHERE id_credito = :id_credito AND siguiente_cuota IS NULL)
+    """
+
+    # Pago de la siguiente cuota en un solo bloque PL/SQL: un viaje a la BD.
+    # El bloqueo es sobre la fila del crédito (SKIP LOCKED): si otra caja está
+    # pagando el mismo crédito no se espera, se informa que está ocupado.
+    SQL_PAGAR_SIGUIENTE_CUOTA = """
+        DECLARE
+            CURSOR c_credito IS
+                SELECT siguiente_cuota FROM Credito
+                WHERE id_credito = :id_credito
+                FOR UPDATE SKIP LOCKED;
+            v_n_cuota     Credito.siguiente_cuota%TYPE;
+            v_existe      NUMBER;
+        BEGIN
+            OPEN c_credito;
+            FETCH c_credito INTO v_n_cuota;
+            IF c_credito%NOTFOUND THEN
+                -- Sin fila: o la bloqueó otra caja o el crédito no existe.
+                -- Un SELECT sin FOR UPDATE no espera por el bloqueo.
+                CLOSE c_credito;
+                SELECT COUNT(*) INTO v_existe FROM Credito WHERE id_credito = :id_credito;
+                :resultado := CASE WHEN v_existe > 0 THEN 'OCUPADO' ELSE 'NO_EXISTE' END;
+                RETURN;
+            END IF;
+            CLOSE c_credito;
+
+            IF v_n_cuota IS NULL THEN
+                :resultado := 'SIN_PENDIENTES';
+                RETURN;
+            END IF;
+
+            UPDATE Cuota SET estado = 'Pagada'
+            WHERE id_credito = :id_credito AND n_cuota = v_n_cuota
+              AND estado != 'Pagada'
+            RETURNING id_pago, valor_cuota INTO :id_pago, :valor;
+
+            IF SQL%ROWCOUNT = 0 THEN
+                -- siguiente_cuota apunta a una cuota ya pagada (o inexistente):
+                -- el libro no coincide con Cuota y no se registra ningún pago
+                :resultado := 'LIBRO_DESACTUALIZADO';
+                RETURN;
+            END IF;
+
+            SELECT seq_pago.NEXTVAL INTO :codigo_pago FROM dual;
+            {insertar_pago};
+            {libro_pago};
+            {finalizar_venta};
+
+            :n_cuota := v_n_cuota;
+            :resultado := 'PAGADA';
+        END;
+    """.format(insertar_pago=SQL_INSERTAR_PAGO.strip(),
+               libro_pago=SQL_LIBRO_PAGO.strip(),
+               finalizar_venta=SQL_FINALIZAR_VENTA.strip())
+
+    def registrar_pago_cuota(self, id_credito: int, fecha_pago: date = None) -> dict:
+        """
+        Paga la siguiente cuota pendiente del crédito en UNA transacción y un
+        solo viaje a la BD: bloquea el crédito, marca la cuota como pagada,
+        crea el Pago, actualiza el libro del crédito y, si era la última,
+        marca el crédito de la venta como finalizado.
+
+        Returns:
+            El resumen actualizado del crédito (mismas claves que
+            obtener_resumen_creditos_activos) más n_cuota, valor_pagado,
+            codigo_pago y credito_finalizado
+
+        Raises:
+            LookupError: Si el crédito no existe
+            ValueError: Si otra caja está pagando el crédito o no le quedan cuotas
+            LibroDesactualizado: Si siguiente_cuota no es una cuota pendiente
+        """
+        fecha_pago = fecha_pago or date.today()
+
+        with self.db.get_transaction() as conn:
+            with conn.cursor() as cursor:
+                resultado = cursor.var(str)
+                n_cuota = cursor.var(int)
+                valor = cursor.var(Decimal)  # NUMBER: se usa en el libro
+                codigo_pago = cursor.var(int)
+                cursor.execute(self.SQL_PAGAR_SIGUIENTE_CUOTA, {
+                    'id_credito': id_credito,
+                    'fecha_pago': fecha_pago,
+                    'cantidad': 1,
+                    'resultado': resultado,
+                    'n_cuota': n_cuota,
+                    'valor': valor,
+                    'codigo_pago': codigo_pago,
+                    'id_pago': cursor.var(int)
+                })
+
+        if resultado.getvalue() == 'NO_EXISTE':
+            raise LookupError(f"No existe el crédito {id_credito}")
+        if resultado.getvalue() == 'OCUPADO':
+            raise ValueError(f"Otra caja está registrando un pago del crédito {id_credito}")
+        if resultado.getvalue() == 'SIN_PENDIENTES':
+            raise ValueError(f"El crédito {id_credito} no tiene cuotas pendientes")
+        if resultado.getvalue() == 'LIBRO_DESACTUALIZADO':
+            raise LibroDesactualizado(
+                f"El libro del crédito {id_credito} no coincide con sus cuotas; "
+                f"recalcúlelo (Credito.recalcular_libro) antes de registrar el pago")
+
+        resumen = self.obtener_resumen_credito(id_credito)
+        resumen.update({
+            'n_cuota': n_cuota.getvalue(),
+            'valor_pagado': float(valor.getvalue()),
+            'codigo_pago': codigo_pago.getvalue(),
+            'credito_finalizado': resumen['cuotas_pagadas'] >= resumen['total_cuotas']
+        })
+        return resumen
+
+    def recalcular_libro(self, id_credito: int = None, ids_credito: List[int] = None) -> int:
+        """
+        Recalcula el libro desde Cuota y Pago de un crédito, de los de
+        ids_credito (a lo sumo MAX_IN) o de todos si no se da ninguno.
+        Se usa después de generar cuotas y para corregir diferencias.
+
+        Returns:
+            int: Créditos actualizados, o -1 si falla
+        """
+        libro_real, params = self._sql_libro_real(id_credito, ids_credito)
+        sql = f"""
+            MERGE INTO Credito c
+            USING ({libro_real}) r
+            ON (c.id_credito = r.id_credito)
+            WHEN MATCHED THEN UPDATE SET
+                c.total_cuotas = r.total_cuotas,
+                c.cuotas_pagadas = r.cuotas_pagadas,
+                c.total_pagado = r.total_pagado,
+                c.siguiente_cuota = r.siguiente_cuota,
+                c.fecha_ultimo_pago = r.fecha_ultimo_pago
+        """
+        try:
+            return self.db.execute_query(sql, params, fetch=False)
+        except Exception as e:
+            print(f"Error al recalcular libro de créditos: {e}")
+            return -1
+
+    def conciliar_libro(self, corregir: bool = False) -> List[dict]:
+        """
+        Compara el libro de cada crédito con lo que dicen Cuota y Pago.
+
+        Args:
+            corregir: Si es True, recalcula los créditos con diferencias
+
+        Returns:
+            Lista de dicts con id_credito y, por columna distinta, (libro, real)
+        """
+        columnas = ['total_cuotas', 'cuotas_pagadas', 'total_pagado',
+                    'siguiente_cuota', 'fecha_ultimo_pago']
+        libro_real, params = self._sql_libro_real()
+        sql = f"""
+            SELECT c.id_credito,
+                   {', '.join(f'c.{col}, r.{col}' for col in columnas)}
+            FROM Credito c
+            INNER JOIN ({libro_real}) r ON r.id_credito = c.id_credito
+            WHERE {' OR '.join(f'DECODE(c.{col}, r.{col}, 0, 1) = 1' for col in columnas)}
+            ORDER BY c.id_credito
+        """
+        try:
+            filas = self.db.execute_query(sql, params)
+        except Exception as e:
+            print(f"Error al conciliar libro de créditos: {e}")
+            return []
+
+        diferencias = []
+        for fila in filas:
+            diferencia = {'id_credito': fila[0]}
+            for i, col in enumerate(columnas):
+                libro, real = fila[1 + 2 * i], fila[2 + 2 * i]
+                if libro != real:
+                    diferencia[col] = (libro, real)
+            diferencias.append(diferencia)
+
+        if corregir:
+            for diferencia in diferencias:
+                self.recalcular_libro(diferencia['id_credito'])
+        return diferencias
 
     def calcular_valor_cuota(self, saldo_financiado: float, interes: float, plazo_meses: int) -> float:
         """
@@ -325,32 +569,47 @@ class Credito(BaseModel):
         Donde:
         - i = tasa de interés mensual (interes/100/12)
         - n = número de meses
+        La última cuota puede diferir unos centavos (ver construir_cuotas).
         """
-        if plazo_meses == 0:
-            return 0
+        return float(amortizacion.valor_cuota(saldo_financiado, interes, plazo_meses))
 
-        if interes == 0:
-            return saldo_financiado / plazo_meses
-
-        # Convertir interés anual a mensual
-        interes_mensual = (interes / 100) / 12
+    def construir_cuotas(self, id_credito: int, saldo_financiado: float, interes: float,
+                         plazo_meses: int, fecha_inicio: date = None,
+                         ids_pago: List[int] = None) -> List[dict]:
+        """
+        Arma en memoria el plan de cuotas de un crédito (no inserta nada).
+        Cada cuota es un dict con las columnas de la tabla Cuota, listo para executemany.
+        Los valores salen de la tabla de amortización exacta: la última cuota
+        se ajusta para que la suma pague exactamente el saldo y sus intereses.
+        Si no se pasan ids_pago se reservan de la secuencia de Cuota.
+        """
+        from model.cuota import Cuota
 
-        # Aplicar fórmula de amortización
-        numerador = interes_mensual * ((1 + interes_mensual) ** plazo_meses)
-        denominador = ((1 + interes_mensual) ** plazo_meses) - 1
+        tabla = amortizacion.tabla_amortizacion(saldo_financiado, interes, plazo_meses)
+        if not tabla or any(periodo.valor_cuota <= 0 for periodo in tabla):
+            raise ValueError("El valor de la cuota debe ser mayor a 0")
 
-        cuota = saldo_financiado * (numerador / denominador)
+        if ids_pago is None:
+            ids_pago = Cuota().reservar_ids(plazo_meses)
 
-        return round(cuota, 2)
+        fecha_inicio = fecha_inicio or date.today()
+        return [{
+            'id_pago': ids_pago[periodo.n_cuota - 1],
+            'n_cuota': periodo.n_cuota,
+            'estado': "Pendiente",
+            'valor_cuota': periodo.valor_cuota,
+            'fecha_vencimiento': fecha_inicio + relativedelta(months=periodo.n_cuota),
+            'id_credito': id_credito
+        } for periodo in tabla]
 
     def generar_cuotas(self, id_credito: int) -> bool:
         """
-        Genera automáticamente todas las cuotas para un crédito
+        Genera automáticamente todas las cuotas para un crédito.
+        El plan se arma en memoria y se inserta con un solo executemany
+        (una transacción), en vez de una conexión por cuota.
         Retorna True si se crearon exitosamente
         """
         from model.cuota import Cuota
-        from datetime import date, timedelta
-        from dateutil.relativedelta import relativedelta
 
         # Obtener información del crédito
         credito = self.obtener_por_id_credito(id_credito)
@@ -358,80 +617,98 @@ class Credito(BaseModel):
             print(f"Error: No se encontró el crédito {id_credito}")
             return False
 
-        # Calcular valor de la cuota
-        valor_cuota = self.calcular_valor_cuota(
-            credito.saldo_financiado,
-            credito.interes,
-            credito.plazo_meses
-        )
-
-        if valor_cuota <= 0:
-            print("Error: El valor de la cuota debe ser mayor a 0")
-            return False
-
-        # Crear controlador de cuotas
-        cuota_controller = Cuota()
-
-        # Fecha inicial (un mes después de hoy)
-        fecha_actual = date.today()
-
-        print(f"\n📄 Generando {credito.plazo_meses} cuotas para el crédito #{id_credito}")
-        print(f"   Valor por cuota: ${valor_cuota:,.2f}")
-
         try:
-            for i in range(1, credito.plazo_meses + 1):
-                # Calcular fecha de vencimiento (i meses desde hoy)
-                fecha_vencimiento = fecha_actual + relativedelta(months=i)
-
-                # Generar ID único para la cuota
-                id_pago = int(f"{id_credito}{i:03d}")  # Ej: 1763441304001
-
-                # Crear la cuota
-                exito = cuota_controller.crear(
-                    id_pago=id_pago,
-                    n_cuota=i,
-                    fecha_vencimiento=fecha_vencimiento,
-                    valor_cuota=valor_cuota,
-                    estado="Pendiente",
-                    id_credito=id_credito
-                )
-
-                if exito:
-                    print(f"   ✅ Cuota {i}/{credito.plazo_meses} - Vence: {fecha_vencimiento.strftime('%d/%m/%Y')}")
-                else:
-                    print(f"   ❌ Error al crear cuota {i}")
-                    return False
-
-            print(f"\n✅ Se generaron exitosamente {credito.plazo_meses} cuotas\n")
-            return True
+            cuotas = self.construir_cuotas(
+                id_credito,
+                credito.saldo_financiado,
+                credito.interes,
+                credito.plazo_meses
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
 
-        except Exception as e:
-            print(f"❌ Error al generar cuotas: {e}")
-            import traceback
-            traceback.print_exc()
+        if not Cuota().crear_varias(cuotas):
             return False
+        self.recalcular_libro(id_credito)
+        return True
 
-    def obtener_clientes_morosos(self):
+    def generar_cuotas_lote(self, ids_credito: List[int] = None,
+                            fecha_inicio: date = None) -> int:
         """
-        Retorna una lista con tuplas:
-        (nombre_cliente, codigo_venta, id_pago, fecha_vencimiento, estado_cuota)
+        Genera las cuotas de muchos créditos a la vez (migraciones, refinanciaciones).
+        Solo considera créditos que todavía no tienen cuotas; si ids_credito es None
+        se procesan todos. Todo el lote se escribe en una sola transacción.
+        Retorna la cantidad de créditos a los que se les generaron cuotas.
         """
-        sql = """
-              SELECT cl.nombre,
-                     v.codigo_venta,
-                     cu.id_pago,
-                     cu.fecha_vencimiento,
-                     cu.estado
-              FROM Cliente cl
-                       JOIN Venta v ON v.codigo_cliente = cl.codigo_cliente
-                       JOIN Credito cr ON cr.id_venta = v.id_venta
-                       JOIN Cuota cu ON cu.id_credito = cr.id_credito
-              WHERE cu.estado IN ('VENCIDA', 'PENDIENTE')
-              ORDER BY cl.nombre \
-              """
+        from model.cuota import Cuota
 
-        try:
-            return self.db.execute_query(sql)
-        except Exception as e:
-            print("Error al obtener morosos:", e)
-            return []
+        sql = f"""
+            SELECT {self.columnas('c')}
+            FROM Credito c
+            WHERE NOT EXISTS (SELECT 1 FROM Cuota cu WHERE cu.id_credito = c.id_credito)
+        """
+        if ids_credito is None:
+            creditos = self.db.execute_query(sql, clase=CreditoData)
+        else:
+            # El filtro va en la consulta, por tramos de MAX_IN ids
+            ids_credito = list(ids_credito)
+            creditos = []
+            for inicio in range(0, len(ids_credito), self.MAX_IN):
+                binds = {f"c{i}": id_c for i, id_c in
+                         enumerate(ids_credito[inicio:inicio + self.MAX_IN])}
+                creditos += self.db.execute_query(
+                    sql + f" AND c.id_credito IN ({', '.join(':' + b for b in binds)})",
+                    binds, clase=CreditoData)
+
+        # Todas las claves del lote salen de la secuencia en un solo viaje
+        cuota_controller = Cuota()
+        ids_pago = cuota_controller.reservar_ids(sum(c.plazo_meses for c in creditos))
+
+        cuotas = []
+        generados = []
+        inicio = 0
+        for credito in creditos:
+            ids_cuotas = ids_pago[inicio:inicio + credito.plazo_meses]
+            inicio += credito.plazo_meses
+            try:
+                cuotas.extend(self.construir_cuotas(
+                    credito.id_credito,
+                    credito.saldo_financiado,
+                    credito.interes,
+                    credito.plazo_meses,
+                    fecha_inicio,
+                    ids_cuotas
+                ))
+                generados.append(credito.id_credito)
+            except ValueError as e:
+                print(f"Crédito {credito.id_credito} omitido: {e}")
+
+        if not cuotas:
+            return 0
+
+        if not cuota_controller.crear_varias(cuotas):
+            return 0
+        # El libro solo de los créditos del lote: un MERGE por tramo de MAX_IN
+        for inicio in range(0, len(generados), self.MAX_IN):
+            self.recalcular_libro(ids_credito=generados[inicio:inicio + self.MAX_IN])
+        return len(generados)
+
+if __name__ == "__main__":
+    import sys
+
+    # Verificación del libro: python -m model.credito [--corregir]
+    corregir = "--corregir" in sys.argv
+    diferencias = Credito().conciliar_libro(corregir=corregir)
+    for diferencia in diferencias:
+        detalle = ", ".join(f"{col}: libro={libro} real={real}"
+                            for col, (libro, real) in diferencia.items() if col != 'id_credito')
+        print(f"⚠️ Crédito {diferencia['id_credito']}: {detalle}")
+
+    if not diferencias:
+        print("✓ El libro de créditos coincide con Cuota y Pago")
+    elif corregir:
+        print(f"✓ Se corrigieron {len(diferencias)} créditos")
+    else:
+        print(f"{len(diferencias)} créditos con diferencias (use --corregir para corregirlos)")
+        sys.exit(1)
@@ -6,47 +6,12 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
-from datetime import date, datetime
+from datetime import date
 
 
-def convertir_fecha_oracle(fecha_obj):
-    """
-    Convierte una fecha de Oracle (que puede venir como string) a objeto date
-    """
-    if fecha_obj is None:
-        return date.today()
-
-    if isinstance(fecha_obj, date):
-        return fecha_obj
-
-    if isinstance(fecha_obj, datetime):
-        return fecha_obj.date()
-
-    if isinstance(fecha_obj, str):
-        # Intentar diferentes formatos de Oracle
-        formatos = [
-            '%Y-%m-%d',
-            '%d/%m/%Y',
-            '%Y-%m-%d %H:%M:%S',
-            '%d-%m-%Y',
-        ]
-
-        for fmt in formatos:
-            try:
-                return datetime.strptime(fecha_obj, fmt).date()
-            except ValueError:
-                continue
-
-        print(f"⚠️ Formato de fecha no reconocido: {fecha_obj}")
-        return date.today()
-
-    return date.today()
-
-
-@dataclass
+@registro
 class CuotaData:
     """Representa una cuota programada de un crédito"""
     id_pago: int
@@ -68,6 +33,12 @@ class Cuota(BaseModel):
     def get_primary_key(self):
         return "id_pago"
 
+    def get_sequence_name(self):
+        return "seq_cuota"
+
+    def get_clase_datos(self):
+        return CuotaData
+
     # ---------------------------------------------------------
     # CREAR
     # ---------------------------------------------------------
@@ -93,6 +64,23 @@ class Cuota(BaseModel):
             print(f"Error al crear cuota: {e}")
             return False
 
+    def crear_varias(self, cuotas: List[dict]) -> bool:
+        """Crea muchas cuotas con un solo executemany (una transacción).
+        Cada dict lleva las mismas claves que los parámetros de crear()."""
+        if not cuotas:
+            return False
+
+        sql = """
+            INSERT INTO Cuota (id_pago, n_cuota, estado, valor_cuota, fecha_vencimiento, id_credito)
+            VALUES (:id_pago, :n_cuota, :estado, :valor_cuota, :fecha_vencimiento, :id_credito)
+        """
+        try:
+            self.db.execute_many(sql, cuotas)
+            return True
+        except Exception as e:
+            print(f"Error al crear cuotas: {e}")
+            return False
+
     # ---------------------------------------------------------
     # ACTUALIZAR
     # ---------------------------------------------------------
@@ -140,25 +128,20 @@ class Cuota(BaseModel):
     # OBTENER TODOS COMO OBJETOS
     # ---------------------------------------------------------
     def obtener_todos_como_objetos(self) -> List[CuotaData]:
-        resultados = self.obtener_todos()
-        return self._convertir_resultados_a_objetos(resultados)
+        return self.seleccionar()
 
     # ---------------------------------------------------------
     # OBTENER POR CRÉDITO
     # ---------------------------------------------------------
     def obtener_por_credito(self, id_credito: int) -> List[CuotaData]:
-        sql = "SELECT * FROM Cuota WHERE id_credito = :id_credito ORDER BY n_cuota"
-        resultados = self.db.execute_query(sql, {'id_credito': id_credito})
-        return self._convertir_resultados_a_objetos(resultados)
+        return self.seleccionar("id_credito = :id_credito", {'id_credito': id_credito},
+                                orden="n_cuota")
 
     # ---------------------------------------------------------
     # OBTENER POR ID
     # ---------------------------------------------------------
     def obtener_por_id_pago(self, id_pago: int) -> Optional[CuotaData]:
-        resultado = self.obtener_por_id(id_pago)
-        if resultado:
-            return self._convertir_fila_a_objeto(resultado)
-        return None
+        return self.obtener_objeto(id_pago)
 
     # ---------------------------------------------------------
     # ELIMINAR
@@ -171,51 +154,3 @@ class Cuota(BaseModel):
         except Exception as e:
             print(f"Error al eliminar cuota: {e}")
             return False
-
-    # ---------------------------------------------------------
-    # MÉTODOS AUXILIARES PARA CONVERSIÓN
-    # ---------------------------------------------------------
-    def _convertir_resultados_a_objetos(self, resultados) -> List[CuotaData]:
-        """Convierte una lista de tuplas en objetos CuotaData"""
-        cuotas = []
-        for fila in resultados:
-            cuota = self._convertir_fila_a_objeto(fila)
-            if cuota:
-                cuotas.append(cuota)
-        return cuotas
-
-    def _convertir_fila_a_objeto(self, fila) -> Optional[CuotaData]:
-        """Convierte una fila de la BD en un objeto CuotaData"""
-        try:
-            # Convertir a lista para poder modificar
-            datos = list(fila)
-
-            # Imprimir para debug
-            print(f"DEBUG - Fila original: {datos}")
-            print(f"DEBUG - Tipos: {[type(x).__name__ for x in datos]}")
-
-            # Identificar qué campo es la fecha (buscar datetime o date)
-            for i, valor in enumerate(datos):
-                if isinstance(valor, (date, datetime)):
-                    print(f"DEBUG - Fecha encontrada en índice {i}: {valor}")
-                    datos[i] = convertir_fecha_oracle(valor)
-
-            # Crear el objeto
-            cuota = CuotaData(
-                id_pago=int(datos[0]),
-                n_cuota=int(datos[1]),
-                estado=str(datos[2]),
-                valor_cuota=float(datos[3]),
-                fecha_vencimiento=convertir_fecha_oracle(datos[4]),
-                id_credito=int(datos[5])
-            )
-
-            print(f"DEBUG - Cuota creada: {cuota}")
-            return cuota
-
-        except Exception as e:
-            print(f"❌ Error al convertir fila a objeto: {e}")
-            print(f"   Fila: {fila}")
-            import traceback
-            traceback.print_exc()
-            return None
\ No newline at end of file
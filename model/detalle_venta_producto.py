@@ -6,12 +6,11 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
 
 
-@dataclass
+@registro
 class DetalleVentaProductoData:
     """Representa un detalle de venta (producto dentro de una venta)"""
     id_venta: int
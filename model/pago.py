@@ -6,13 +6,12 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
 from datetime import date
 
 
-@dataclass
+@registro
 class PagoData:
     """Representa un pago realizado a una cuota"""
     codigo_pago: int
@@ -33,6 +32,12 @@ class Pago(BaseModel):
     def get_primary_key(self):
         return "codigo_pago"
 
+    def get_sequence_name(self):
+        return "seq_pago"
+
+    def get_clase_datos(self):
+        return PagoData
+
     # ---------------------------------------------------------
     # CREAR
     # ---------------------------------------------------------
@@ -104,23 +109,20 @@ class Pago(BaseModel):
     # OBTENER TODOS COMO OBJETOS
     # ---------------------------------------------------------
     def obtener_todos_como_objetos(self) -> List[PagoData]:
-        resultados = self.obtener_todos()
-        return [PagoData(*r) for r in resultados]
+        return self.seleccionar()
 
     # ---------------------------------------------------------
     # OBTENER POR CUOTA (1–1)
     # ---------------------------------------------------------
     def obtener_por_id_pago(self, id_pago: int) -> Optional[PagoData]:
-        sql = "SELECT * FROM Pago WHERE id_pago = :id_pago"
-        resultado = self.db.execute_query(sql, {'id_pago': id_pago})
-        return PagoData(*resultado[0]) if resultado else None
+        resultado = self.seleccionar("id_pago = :id_pago", {'id_pago': id_pago})
+        return resultado[0] if resultado else None
 
     # ---------------------------------------------------------
     # OBTENER POR CÓDIGO
     # ---------------------------------------------------------
     def obtener_por_codigo_pago(self, codigo_pago: int) -> Optional[PagoData]:
-        resultado = self.obtener_por_id(codigo_pago)
-        return PagoData(*resultado) if resultado else None
+        return self.obtener_objeto(codigo_pago)
 
     # ---------------------------------------------------------
     # ELIMINAR
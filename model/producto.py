@@ -5,13 +5,12 @@ Miguel Ángel Vargas Peláez
 Fecha: 2025-11
 Licencia: GPLv3
 """
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
 from decimal import Decimal
 
 
-@dataclass
+@registro
 class ProductoData:
     """Representa un producto"""
     codigo: int
@@ -36,6 +35,9 @@ class Producto(BaseModel):
     def get_primary_key(self):
         return "codigo"
 
+    def get_clase_datos(self):
+        return ProductoData
+
     def crear(self, codigo: int, nombre: str, valor_adquisicion: float,
               codigo_categoria: int, descripcion: str = None,
               valor_venta: float = None, cantidad: int = 0) -> bool:
@@ -56,6 +58,7 @@ class Producto(BaseModel):
                 'codigo_categoria': codigo_categoria,
                 'cantidad': cantidad
             }, fetch=False)
+            self._invalidar_catalogo()
             return True
         except Exception as e:
             print(f"Error al crear producto: {e}")
@@ -94,91 +97,43 @@ class Producto(BaseModel):
 
         try:
             filas = self.db.execute_query(sql, params, fetch=False)
+            self._invalidar_catalogo()
             return filas > 0
         except Exception as e:
             print(f"Error al actualizar producto: {e}")
             return False
 
+    def eliminar(self, codigo: int) -> bool:
+        """Elimina un producto"""
+        eliminado = super().eliminar(codigo)
+        self._invalidar_catalogo()
+        return eliminado
+
+    @staticmethod
+    def _invalidar_catalogo():
+        """Avisa al catálogo en memoria que los productos cambiaron"""
+        from model.catalogo import Catalogo
+        Catalogo.invalidar()
+
     def obtener_todos_como_objetos(self) -> List[ProductoData]:
         """Obtiene todos los productos como objetos"""
-        resultados = self.obtener_todos()
-        # Si hay problemas con el orden de las columnas, usa mapeo explícito:
-        productos = []
-        for r in resultados:
-            producto = ProductoData(
-                codigo=r[0],
-                descripcion=r[1],
-                nombre=r[2],
-                valor_adquisicion=r[3],
-                valor_venta=r[4],
-                codigo_categoria=r[5],
-                cantidad=r[6] if len(r) > 6 else 0  # ← Maneja el caso donde pueda faltar la columna
-            )
-            productos.append(producto)
-        return productos
-
-    def buscar_por_nombre(self, nombre: str) -> List[ProductoData]:
-        """Busca productos por nombre"""
-        sql = "SELECT * FROM Producto WHERE UPPER(nombre) LIKE UPPER(:nombre)"
-        resultados = self.db.execute_query(sql, {'nombre': f'%{nombre}%'})
-        return [ProductoData(
-            codigo=r[0],
-            descripcion=r[1],
-            nombre=r[2],
-            valor_adquisicion=r[3],
-            valor_venta=r[4],
-            codigo_categoria=r[5],
-            cantidad=r[6] if len(r) > 6 else 0
-        ) for r in resultados]
+        return self.seleccionar()
+
+    def buscar_por_nombre(self, nombre: str, limite: int = None) -> List[ProductoData]:
+        """Busca productos por nombre en la BD (las ventanas usan Catalogo.buscar_productos)"""
+        return self.buscar_por_texto("nombre", nombre, limite)
 
     def buscar_por_categoria(self, codigo_categoria: int) -> List[ProductoData]:
         """Obtiene todos los productos de una categoría"""
-        sql = "SELECT * FROM Producto WHERE codigo_categoria = :categoria"
-        resultados = self.db.execute_query(sql, {'categoria': codigo_categoria})
-        return [ProductoData(
-            codigo=r[0],
-            descripcion=r[1],
-            nombre=r[2],
-            valor_adquisicion=r[3],
-            valor_venta=r[4],
-            codigo_categoria=r[5],
-            cantidad=r[6] if len(r) > 6 else 0
-        ) for r in resultados]
+        return self.seleccionar("codigo_categoria = :categoria", {'categoria': codigo_categoria})
 
     def buscar_por_rango_precio(self, precio_min: float, precio_max: float) -> List[ProductoData]:
         """Busca productos en un rango de precios"""
-        sql = """
-            SELECT * FROM Producto 
-            WHERE valor_venta BETWEEN :precio_min AND :precio_max
-            ORDER BY valor_venta
-        """
-        resultados = self.db.execute_query(sql, {
+        return self.seleccionar("valor_venta BETWEEN :precio_min AND :precio_max", {
             'precio_min': precio_min,
             'precio_max': precio_max
-        })
-        return [ProductoData(
-            codigo=r[0],
-            descripcion=r[1],
-            nombre=r[2],
-            valor_adquisicion=r[3],
-            valor_venta=r[4],
-            codigo_categoria=r[5],
-            cantidad=r[6] if len(r) > 6 else 0
-        ) for r in resultados]
+        }, orden="valor_venta")
 
     def obtener_por_id(self, codigo: int) -> Optional[ProductoData]:
         """Obtiene un producto por su código"""
-        sql = "SELECT * FROM Producto WHERE codigo = :codigo"
-        resultados = self.db.execute_query(sql, {'codigo': codigo})
-        if resultados:
-            r = resultados[0]
-            return ProductoData(
-                codigo=r[0],
-                descripcion=r[1],
-                nombre=r[2],
-                valor_adquisicion=r[3],
-                valor_venta=r[4],
-                codigo_categoria=r[5],
-                cantidad=r[6] if len(r) > 6 else 0
-            )
-        return None
\ No newline at end of file
+        return self.obtener_objeto(codigo)
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Resumen diario de ventas para los reportes
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+ResumenVentasDia guarda, por día y tipo de venta, cuántas ventas hubo y la
+suma de bruto, IVA y neto. Los reportes de IVA, ventas por tipo y ventas del
+mes leen de aquí: un trimestre son a lo sumo ~180 filas, sin importar cuántas
+ventas tenga la tabla Venta.
+
+Se mantiene al registrar cada venta (Venta.registrar_venta_completa, en la
+misma transacción). Para llenarla o corregirla desde Venta:
+
+    python -m model.resumen_ventas                         # todo
+    python -m model.resumen_ventas 2025-01-01 2025-04-01   # [desde, hasta)
+"""
+import sys
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+import oracledb
+
+from modelo_base import BaseModel, registro
+
+
+@registro
+class ResumenVentasDiaData:
+    """Totales de las ventas de un día y un tipo de venta"""
+    fecha: date
+    tipo_venta: str
+    cantidad: int
+    total_bruto: Decimal
+    iva_total: Decimal
+    total_neto: Decimal
+
+
+class ResumenVentas(BaseModel):
+    """Gestión de la tabla de resumen diario de ventas"""
+
+    SQL_ACUMULAR = """
+        MERGE INTO ResumenVentasDia r
+        USING (SELECT :fecha AS fecha, :tipo_venta AS tipo_venta FROM dual) v
+        ON (r.fecha = v.fecha AND r.tipo_venta = v.tipo_venta)
+        WHEN MATCHED THEN UPDATE SET
+            r.cantidad = r.cantidad + 1,
+            r.total_bruto = r.total_bruto + :total_bruto,
+            r.iva_total = r.iva_total + :iva_total,
+            r.total_neto = r.total_neto + :total_neto
+        WHEN NOT MATCHED THEN INSERT
+            (fecha, tipo_venta, cantidad, total_bruto, iva_total, total_neto)
+            VALUES (v.fecha, v.tipo_venta, 1, :total_bruto, :iva_total, :total_neto)
+    """
+
+    def get_table_name(self):
+        return "ResumenVentasDia"
+
+    def get_primary_key(self):
+        return "fecha"
+
+    @classmethod
+    def acumular(cls, cursor, fecha: date, tipo_venta: str,
+                 total_bruto=None, iva_total=None, total_neto=None):
+        """
+        Suma una venta al resumen de su día. Se llama con el cursor de la
+        transacción que inserta la venta, así el resumen nunca queda
+        distinto de la tabla Venta.
+        """
+        params = {
+            'fecha': fecha,
+            'tipo_venta': tipo_venta,
+            'total_bruto': total_bruto or 0,
+            'iva_total': iva_total or 0,
+            'total_neto': total_neto or 0
+        }
+        try:
+            cursor.execute(cls.SQL_ACUMULAR, params)
+        except oracledb.IntegrityError:
+            # Otra caja insertó la fila del día justo antes: ahora ya existe
+            cursor.execute(cls.SQL_ACUMULAR, params)
+
+    def reconstruir(self, desde: date = None, hasta: date = None) -> int:
+        """
+        Recalcula el resumen a partir de la tabla Venta, en una transacción.
+        Sirve para llenarlo la primera vez o corregirlo tras cambios hechos
+        por fuera de la aplicación.
+
+        Args:
+            desde: Primer día a recalcular (None = desde el principio)
+            hasta: Día siguiente al último a recalcular (None = hasta hoy)
+
+        Returns:
+            int: Filas de resumen generadas, o -1 si falla
+        """
+        condiciones = []
+        params = {}
+        if desde is not None:
+            condiciones.append("fecha >= :desde")
+            params['desde'] = desde
+        if hasta is not None:
+            condiciones.append("fecha < :hasta")
+            params['hasta'] = hasta
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        try:
+            with self.db.get_transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM ResumenVentasDia {where}", params)
+                    cursor.execute(f"""
+                        INSERT INTO ResumenVentasDia
+                            (fecha, tipo_venta, cantidad, total_bruto, iva_total, total_neto)
+                        SELECT TRUNC(fecha), tipo_venta, COUNT(*),
+                               NVL(SUM(total_bruto), 0), NVL(SUM(iva_total), 0),
+                               NVL(SUM(total_neto), 0)
+                        FROM Venta
+                        {where}
+                        GROUP BY TRUNC(fecha), tipo_venta
+                    """, params)
+                    return cursor.rowcount
+        except Exception as e:
+            print(f"Error al reconstruir resumen de ventas: {e}")
+            return -1
+
+    def por_tipo(self, desde: date, hasta: date) -> Dict[str, int]:
+        """
+        Cantidad de ventas por tipo en el rango [desde, hasta).
+
+        Returns:
+            Diccionario {tipo_venta: cantidad}
+        """
+        sql = """
+            SELECT tipo_venta, SUM(cantidad)
+            FROM ResumenVentasDia
+            WHERE fecha >= :desde AND fecha < :hasta
+            GROUP BY tipo_venta
+            ORDER BY tipo_venta
+        """
+        try:
+            resultados = self.db.execute_query(sql, {'desde': desde, 'hasta': hasta})
+            return {tipo: cantidad for tipo, cantidad in resultados}
+        except Exception as e:
+            print(f"Error al obtener ventas por tipo: {e}")
+            return {}
+
+    def por_dia(self, desde: date, hasta: date) -> List[ResumenVentasDiaData]:
+        """Filas del resumen en el rango [desde, hasta), por fecha y tipo"""
+        sql = """
+            SELECT fecha, tipo_venta, cantidad, total_bruto, iva_total, total_neto
+            FROM ResumenVentasDia
+            WHERE fecha >= :desde AND fecha < :hasta
+            ORDER BY fecha, tipo_venta
+        """
+        try:
+            resultados = self.db.execute_query(sql, {'desde': desde, 'hasta': hasta})
+            return [ResumenVentasDiaData(*r) for r in resultados]
+        except Exception as e:
+            print(f"Error al obtener resumen de ventas: {e}")
+            return []
+
+
+if __name__ == "__main__":
+    desde = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    hasta = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+    filas = ResumenVentas().reconstruir(desde, hasta)
+    if filas < 0:
+        sys.exit(1)
+    print(f"✓ Resumen de ventas reconstruido: {filas} filas")
@@ -5,8 +5,7 @@ Miguel Ángel Vargas Peláez
 Fecha: 2025-11
 Licencia: GPLv3
 """
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import List
 
 """
@@ -14,7 +13,7 @@ Realmente esto nunca lo vamos a usar JSAJAJJSASJSJSJ
 Ahí está por si acaso :v
 """
 
-@dataclass
+@registro
 class RolData:
     """Representa un rol en el sistema"""
     id_rol: int
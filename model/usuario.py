@@ -6,12 +6,11 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
 
 
-@dataclass
+@registro
 class UsuarioData:
     """Representa un usuario (datos principales + rol)"""
     id_usuario: int
@@ -29,6 +28,16 @@ class UsuarioData:
                 f"email={self.email!r})")
 
 
+@registro
+class UsuarioRolData:
+    """Usuario con el nombre de su rol (lo que guarda la sesión, sin contraseña)"""
+    id_usuario: int
+    nombre_usuario: str
+    email: str
+    id_rol: Optional[int] = None
+    nombre_rol: Optional[str] = None
+
+
 class Usuario(BaseModel):
     """Gestión de usuarios"""
 
@@ -38,6 +47,9 @@ class Usuario(BaseModel):
     def get_primary_key(self):
         return "id_usuario"
 
+    def get_clase_datos(self):
+        return UsuarioData
+
     # ---------------------------------------------------------
     # CREAR
     # ---------------------------------------------------------
@@ -133,17 +145,14 @@ class Usuario(BaseModel):
     # ---------------------------------------------------------
     # BÚSQUEDAS
     # ---------------------------------------------------------
-    def buscar_por_nombre(self, nombre_usuario: str) -> List[UsuarioData]:
-        """Busca usuarios por nombre"""
-        sql = "SELECT * FROM Usuario WHERE UPPER(nombre_usuario) LIKE UPPER(:nombre)"
-        resultados = self.db.execute_query(sql, {'nombre': f'%{nombre_usuario}%'})
-        return [UsuarioData(*r) for r in resultados]
+    def buscar_por_nombre(self, nombre_usuario: str, limite: int = None) -> List[UsuarioData]:
+        """Busca usuarios por nombre (primero los que empiezan así)"""
+        return self.buscar_por_texto("nombre_usuario", nombre_usuario, limite)
 
     def buscar_por_email(self, email: str) -> Optional[UsuarioData]:
         """Busca usuario por email exacto"""
-        sql = "SELECT * FROM Usuario WHERE UPPER(email) = UPPER(:email)"
-        resultado = self.db.execute_query(sql, {'email': email})
-        return UsuarioData(*resultado[0]) if resultado else None
+        resultado = self.seleccionar("UPPER(email) = UPPER(:email)", {'email': email}, limite=1)
+        return resultado[0] if resultado else None
 
 
     # ---------------------------------------------------------
@@ -165,7 +174,16 @@ class Usuario(BaseModel):
 
     def obtener_por_id(self, id_usuario: int) -> Optional[UsuarioData]:
         """Obtiene un usuario por ID como objeto UsuarioData"""
-        sql = "SELECT * FROM Usuario WHERE id_usuario = :id_usuario"
-        resultado = self.db.execute_query(sql, {'id_usuario': id_usuario})
-        return UsuarioData(*resultado[0]) if resultado else None
+        return self.obtener_objeto(id_usuario)
+
+    def obtener_con_rol(self, id_usuario: int) -> Optional[UsuarioRolData]:
+        """Usuario y nombre de su rol en una sola consulta (para la sesión)"""
+        sql = """
+            SELECT u.id_usuario, u.nombre_usuario, u.email, u.id_rol, r.nombre
+            FROM Usuario u
+            LEFT JOIN Rol r ON r.id_rol = u.id_rol
+            WHERE u.id_usuario = :id_usuario
+        """
+        resultado = self.db.execute_query(sql, {'id_usuario': id_usuario}, clase=UsuarioRolData)
+        return resultado[0] if resultado else None
 
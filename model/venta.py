@@ -6,14 +6,14 @@ Fecha: 2025-11
 Licencia: GPLv3
 """
 
-from modelo_base import BaseModel
-from dataclasses import dataclass
+from modelo_base import BaseModel, registro
 from typing import Optional, List
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
+from util.fechas import rango_dias
 
 
-@dataclass
+@registro
 class VentaData:
     """Representa una venta"""
     id_venta: int
@@ -40,6 +40,12 @@ class Venta(BaseModel):
     def get_primary_key(self):
         return "id_venta"
 
+    def get_sequence_name(self):
+        return "seq_venta"
+
+    def get_clase_datos(self):
+        return VentaData
+
     def crear(self, id_venta: int, codigo_venta: str, estado_venta: str,
               fecha: date, tipo_venta: str, codigo_cliente: int,
               total_neto: float = None, estado_credito: str = None,
@@ -71,6 +77,143 @@ class Venta(BaseModel):
             print(f"Error al crear venta: {e}")
             return False
 
+    def registrar_venta_completa(self, carrito: List[tuple], codigo_cliente: int,
+                                 credito_opts: Optional[dict] = None,
+                                 total_bruto: float = None, iva_total: float = None,
+                                 total_neto: float = None) -> Optional[dict]:
+        """
+        Registra una venta completa en UNA sola transacción y conexión:
+        cabecera, detalles (executemany), descuento de stock (executemany con
+        validación de existencias) y, si es a crédito, el crédito con sus cuotas.
+        Si algo falla se hace rollback y no queda nada a medias.
+
+        Args:
+            carrito: Lista de tuplas (codigo_producto, cantidad)
+            codigo_cliente: Cliente que compra
+            credito_opts: None para contado, o dict con cuota_inicial,
+                          saldo_financiado, interes y plazo_meses
+            total_bruto, iva_total, total_neto: Totales calculados en la venta
+
+        Returns:
+            dict con id_venta, codigo_venta, id_credito e ids_cuotas, o None si falla
+        """
+        from model.credito import Credito
+        from model.cuota import Cuota
+        from model.resumen_ventas import ResumenVentas
+
+        if not carrito:
+            print("Error al registrar venta: el carrito está vacío")
+            return None
+
+        ahora = datetime.now()
+        id_venta = self.siguiente_id()
+        codigo_venta = f"VTA-{id_venta:08d}"
+        es_credito = credito_opts is not None
+
+        detalles = [{'id_venta': id_venta, 'codigo_producto': codigo, 'cantidad': cantidad}
+                    for codigo, cantidad in carrito]
+        descuentos = [{'codigo': codigo, 'n': cantidad} for codigo, cantidad in carrito]
+
+        try:
+            # Las claves se reservan antes de abrir la transacción: traer un
+            # bloque de la secuencia usa otra conexión del pool y no debe
+            # pedirse mientras esta transacción tiene el stock bloqueado
+            credito_controller = Credito()
+            id_credito = None
+            ids_cuotas = []
+            if es_credito:
+                id_credito = credito_controller.siguiente_id()
+                ids_cuotas = Cuota().reservar_ids(credito_opts['plazo_meses'])
+
+            with self.db.get_transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        INSERT INTO Venta (id_venta, codigo_venta, estado_venta, fecha,
+                                          total_neto, estado_credito, tipo_venta,
+                                          total_bruto, iva_total, codigo_cliente)
+                        VALUES (:id_venta, :codigo_venta, :estado_venta, :fecha,
+                                :total_neto, :estado_credito, :tipo_venta,
+                                :total_bruto, :iva_total, :codigo_cliente)
+                    """, {
+                        'id_venta': id_venta,
+                        'codigo_venta': codigo_venta,
+                        'estado_venta': "Completada",
+                        'fecha': ahora.date(),
+                        'total_neto': total_neto,
+                        'estado_credito': "Activo" if es_credito else None,
+                        'tipo_venta': "Credito" if es_credito else "Contado",
+                        'total_bruto': total_bruto,
+                        'iva_total': iva_total,
+                        'codigo_cliente': codigo_cliente
+                    })
+
+                    cursor.executemany("""
+                        INSERT INTO DetalleVentaProducto (id_venta, codigo_producto, cantidad)
+                        VALUES (:id_venta, :codigo_producto, :cantidad)
+                    """, detalles)
+
+                    # El WHERE evita dejar stock negativo si otra caja vendió primero
+                    cursor.executemany("""
+                        UPDATE Producto
+                        SET cantidad = cantidad - :n
+                        WHERE codigo = :codigo AND cantidad >= :n
+                    """, descuentos, arraydmlrowcounts=True)
+
+                    for (codigo, _), filas in zip(carrito, cursor.getarraydmlrowcounts()):
+                        if filas == 0:
+                            raise ValueError(f"Stock insuficiente para el producto {codigo}")
+
+                    # El resumen diario de los reportes se actualiza en la misma transacción
+                    ResumenVentas.acumular(cursor, ahora.date(),
+                                           "Credito" if es_credito else "Contado",
+                                           total_bruto, iva_total, total_neto)
+
+                    if es_credito:
+                        cursor.execute("""
+                            INSERT INTO Credito (id_credito, cuota_inicial, saldo_financiado,
+                                                 interes, plazo_meses, id_venta,
+                                                 total_cuotas, siguiente_cuota)
+                            VALUES (:id_credito, :cuota_inicial, :saldo_financiado,
+                                    :interes, :plazo_meses, :id_venta,
+                                    :plazo_meses, 1)
+                        """, {
+                            'id_credito': id_credito,
+                            'cuota_inicial': credito_opts['cuota_inicial'],
+                            'saldo_financiado': credito_opts['saldo_financiado'],
+                            'interes': credito_opts['interes'],
+                            'plazo_meses': credito_opts['plazo_meses'],
+                            'id_venta': id_venta
+                        })
+
+                        cuotas = credito_controller.construir_cuotas(
+                            id_credito,
+                            credito_opts['saldo_financiado'],
+                            credito_opts['interes'],
+                            credito_opts['plazo_meses'],
+                            ahora.date(),
+                            ids_pago=ids_cuotas
+                        )
+                        cursor.executemany("""
+                            INSERT INTO Cuota (id_pago, n_cuota, estado, valor_cuota,
+                                               fecha_vencimiento, id_credito)
+                            VALUES (:id_pago, :n_cuota, :estado, :valor_cuota,
+                                    :fecha_vencimiento, :id_credito)
+                        """, cuotas)
+
+            # Cambió el stock: el catálogo en memoria debe releerlo
+            from model.catalogo import Catalogo
+            Catalogo.invalidar()
+
+            return {
+                'id_venta': id_venta,
+                'codigo_venta': codigo_venta,
+                'id_credito': id_credito,
+                'ids_cuotas': ids_cuotas
+            }
+        except Exception as e:
+            print(f"Error al registrar venta completa: {e}")
+            return None
+
     def actualizar_estado(self, id_venta: int, estado_venta: str) -> bool:
         """Actualiza el estado de una venta"""
         sql = "UPDATE Venta SET estado_venta = :estado WHERE id_venta = :id"
@@ -117,46 +260,125 @@ class Venta(BaseModel):
         resultados = self.obtener_todos()
         return [VentaData(*r) for r in resultados]
 
+    def obtener_factura(self, codigo_venta: str) -> Optional[dict]:
+        """
+        Obtiene todo lo necesario para mostrar una factura en UNA consulta:
+        cabecera de la venta, cliente y productos con su precio.
+        Busca por codigo_venta usando su índice único (no recorre todas las ventas).
+
+        Returns:
+            dict con 'venta' (VentaData), 'cliente' (ClienteData) y 'detalles':
+            lista de tuplas (DetalleVentaProductoData, nombre_producto, precio_unitario, subtotal).
+            None si la venta no existe.
+        """
+        from model.cliente import ClienteData
+        from model.detalle_venta_producto import DetalleVentaProductoData
+
+        sql = """
+            SELECT v.id_venta, v.codigo_venta, v.estado_venta, v.fecha, v.total_neto,
+                   v.estado_credito, v.tipo_venta, v.total_bruto, v.iva_total, v.codigo_cliente,
+                   cl.nombre, cl.telefono, cl.departamento, cl.municipio, cl.calle, cl.direccion,
+                   d.codigo_producto, d.cantidad, p.nombre, p.valor_venta
+            FROM Venta v
+            INNER JOIN Cliente cl ON cl.codigo_cliente = v.codigo_cliente
+            LEFT JOIN DetalleVentaProducto d ON d.id_venta = v.id_venta
+            LEFT JOIN Producto p ON p.codigo = d.codigo_producto
+            WHERE v.codigo_venta = :codigo_venta
+            ORDER BY p.nombre
+        """
+        resultados = self.db.execute_query(sql, {'codigo_venta': codigo_venta})
+
+        if not resultados:
+            return None
+
+        primera = resultados[0]
+        venta = VentaData(*primera[0:10])
+        cliente = ClienteData(primera[9], *primera[10:16])
+
+        detalles = []
+        for r in resultados:
+            codigo_producto, cantidad, nombre_producto, valor_venta = r[16:20]
+            if codigo_producto is None:
+                continue  # Venta sin productos (LEFT JOIN)
+            precio_unitario = float(valor_venta or 0)
+            detalle = DetalleVentaProductoData(venta.id_venta, codigo_producto, cantidad)
+            detalles.append((detalle, nombre_producto, precio_unitario, precio_unitario * cantidad))
+
+        return {'venta': venta, 'cliente': cliente, 'detalles': detalles}
+
+    # Filtros admitidos por obtener_recientes y la columna a la que van
+    FILTROS_RECIENTES = {
+        'tipo_venta': 'v.tipo_venta',
+        'estado_venta': 'v.estado_venta',
+        'codigo_cliente': 'v.codigo_cliente',
+    }
+
+    def obtener_recientes(self, limite: int = 50, filtros: dict = None,
+                          despues_de: tuple = None) -> List[tuple]:
+        """
+        Obtiene las ventas más recientes con el nombre del cliente.
+        Oracle ordena y corta (índice ix_venta_fecha), así que el costo
+        depende de `limite` y no del tamaño de la tabla.
+
+        Args:
+            limite: Cantidad de ventas a traer
+            filtros: dict con tipo_venta, estado_venta y/o codigo_cliente
+            despues_de: (fecha, id_venta) de la última venta ya mostrada,
+                        para traer la página siguiente
+
+        Returns:
+            Lista de tuplas (VentaData, nombre_cliente), de la más reciente a la más antigua
+        """
+        condiciones = []
+        params = {'limite': limite}
+
+        for i, (filtro, valor) in enumerate((filtros or {}).items()):
+            if filtro not in self.FILTROS_RECIENTES:
+                raise ValueError(f"Filtro no soportado: {filtro}")
+            condiciones.append(f"{self.FILTROS_RECIENTES[filtro]} = :f{i}")
+            params[f"f{i}"] = valor
+
+        if despues_de is not None:
+            condiciones.append("(v.fecha < :fecha OR (v.fecha = :fecha AND v.id_venta < :id_venta))")
+            params['fecha'], params['id_venta'] = despues_de
+
+        sql = """
+            SELECT v.id_venta, v.codigo_venta, v.estado_venta, v.fecha, v.total_neto,
+                   v.estado_credito, v.tipo_venta, v.total_bruto, v.iva_total, v.codigo_cliente,
+                   cl.nombre
+            FROM Venta v
+            INNER JOIN Cliente cl ON cl.codigo_cliente = v.codigo_cliente
+        """
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += """
+            ORDER BY v.fecha DESC, v.id_venta DESC
+            FETCH FIRST :limite ROWS ONLY
+        """
+
+        resultados = self.db.execute_query(sql, params)
+        return [(VentaData(*r[:10]), r[10]) for r in resultados]
+
     def buscar_por_cliente(self, codigo_cliente: int) -> List[VentaData]:
         """Obtiene todas las ventas de un cliente"""
-        sql = "SELECT * FROM Venta WHERE codigo_cliente = :cliente ORDER BY fecha DESC"
-        resultados = self.db.execute_query(sql, {'cliente': codigo_cliente})
-        return [VentaData(*r) for r in resultados]
+        return self.seleccionar("codigo_cliente = :cliente", {'cliente': codigo_cliente},
+                                orden="fecha DESC")
 
     def buscar_por_fecha(self, fecha_inicio: date, fecha_fin: date) -> List[VentaData]:
-        """Busca ventas en un rango de fechas"""
-        sql = """
-            SELECT * FROM Venta 
-            WHERE fecha BETWEEN :fecha_inicio AND :fecha_fin
-            ORDER BY fecha DESC
-        """
-        resultados = self.db.execute_query(sql, {
-            'fecha_inicio': fecha_inicio,
-            'fecha_fin': fecha_fin
-        })
-        return [VentaData(*r) for r in resultados]
+        """Busca ventas en un rango de fechas (ambos días incluidos)"""
+        # Rango semiabierto sobre la columna sin funciones: usa ix_venta_fecha
+        desde, hasta = rango_dias(fecha_inicio, fecha_fin)
+        return self.seleccionar("fecha >= :desde AND fecha < :hasta",
+                                {'desde': desde, 'hasta': hasta}, orden="fecha DESC")
 
-    # En tu modelo venta.py, el método buscar_por_fecha debería verse así:
     def buscar_por_fecha_(self, fecha_inicio: str, fecha_fin: str) -> List[VentaData]:
-        """Busca ventas en un rango de fechas usando TO_DATE para Oracle"""
-        sql = """
-              SELECT * \
-              FROM Venta
-              WHERE fecha BETWEEN TO_DATE(:fecha_inicio, 'YYYY-MM-DD')
-                        AND TO_DATE(:fecha_fin, 'YYYY-MM-DD')
-              ORDER BY fecha DESC \
-              """
-        resultados = self.db.execute_query(sql, {
-            'fecha_inicio': fecha_inicio,
-            'fecha_fin': fecha_fin
-        })
-        return [VentaData(*r) for r in resultados]
+        """Igual que buscar_por_fecha pero con fechas 'YYYY-MM-DD'"""
+        return self.buscar_por_fecha(date.fromisoformat(fecha_inicio),
+                                     date.fromisoformat(fecha_fin))
 
     def buscar_por_tipo(self, tipo_venta: str) -> List[VentaData]:
         """Busca ventas por tipo"""
-        sql = "SELECT * FROM Venta WHERE tipo_venta = :tipo ORDER BY fecha DESC"
-        resultados = self.db.execute_query(sql, {'tipo': tipo_venta})
-        return [VentaData(*r) for r in resultados]
+        return self.seleccionar("tipo_venta = :tipo", {'tipo': tipo_venta}, orden="fecha DESC")
 
     def agregar_producto(self, id_venta: int, codigo_producto: int) -> bool:
         """Agrega un producto a una venta"""
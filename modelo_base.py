@@ -1,5 +1,20 @@
+import re
+import sys
 from abc import ABC, abstractmethod
-from database.connection import DatabaseConfig
+from dataclasses import dataclass
+from database.connection import DatabaseConfig, columnas_de
+from database.secuencias import GeneradorIds
+
+
+# Decorador de los registros de las filas (ProductoData, VentaData...): un
+# dataclass con __slots__, sin __dict__ por instancia, que es lo que más pesa
+# cuando una ventana guarda tablas enteras. Se usa igual que un dataclass
+# (mismos atributos, copy, ==), pero no admite atributos fuera de los campos.
+# En Python < 3.10 queda como dataclass normal. Medición: python -m util.medir_registros
+if sys.version_info >= (3, 10):
+    registro = dataclass(slots=True)
+else:
+    registro = dataclass
 
 
 """
@@ -28,6 +43,113 @@ class BaseModel(ABC):
         """Debe retornar el nombre de la clave primaria"""
         pass
 
+    def get_sequence_name(self):
+        """Nombre de la secuencia de Oracle que genera la clave primaria.
+        None si la clave la digita el usuario (cédula, código de producto...)"""
+        return None
+
+    def siguiente_id(self):
+        """Obtiene una nueva clave primaria desde la secuencia del modelo"""
+        return self.reservar_ids(1)[0]
+
+    def reservar_ids(self, cantidad):
+        """Reserva varias claves primarias de una vez (para inserciones masivas)"""
+        secuencia = self.get_sequence_name()
+        if secuencia is None:
+            raise ValueError(f"{self.get_table_name()} no tiene secuencia para generar IDs")
+        return GeneradorIds.reservar(secuencia, cantidad)
+
+    def get_clase_datos(self):
+        """Dataclass que representa una fila de la tabla (ProductoData...).
+        Sus campos deben llamarse como las columnas. None si el modelo no
+        usa el mapeo directo a objetos."""
+        return None
+
+    def columnas(self, alias=None) -> str:
+        """Columnas de la tabla en el orden de los campos de get_clase_datos()"""
+        return columnas_de(self.get_clase_datos(), alias)
+
+    def seleccionar(self, where=None, params=None, orden=None, limite=None) -> list:
+        """
+        SELECT con la lista explícita de columnas; cada fila llega ya como
+        objeto de get_clase_datos() con fechas y decimales convertidos por el
+        driver (ver DatabaseConfig.execute_query).
+
+        Args:
+            where: Condición SQL con variables (:nombre), sin la palabra WHERE
+            params: Valores de las variables
+            orden: Cláusula de orden, sin ORDER BY
+            limite: Cantidad máxima de filas
+        """
+        params = dict(params or {})
+        sql = f"SELECT {self.columnas()} FROM {self.get_table_name()}"
+        if where:
+            sql += f" WHERE {where}"
+        if orden:
+            sql += f" ORDER BY {orden}"
+        if limite is not None:
+            sql += " FETCH FIRST :limite_filas ROWS ONLY"
+            params['limite_filas'] = limite
+        return self.db.execute_query(sql, params, clase=self.get_clase_datos())
+
+    def obtener_objeto(self, id_valor):
+        """Obtiene un registro por su ID como objeto (None si no existe)"""
+        resultado = self.seleccionar(f"{self.get_primary_key()} = :id", {'id': id_valor})
+        return resultado[0] if resultado else None
+
+    # Filas máximas que retorna buscar_por_texto si no se indica otro límite
+    LIMITE_BUSQUEDA = 200
+
+    def buscar_por_texto(self, columna, texto, limite=None, indice_texto=False) -> list:
+        """
+        Busca filas cuya `columna` contiene `texto` (sin distinguir mayúsculas)
+        sin recorrer la tabla:
+
+        1. Las que empiezan por el texto: UPPER(columna) LIKE 'TEXTO%' usa el
+           índice por función sobre UPPER(columna) (migración 008).
+        2. Si no alcanzan, las que lo tienen en medio: con indice_texto=True por
+           el índice Oracle Text de la columna (CONTAINS, las más relevantes
+           primero); sin él, o si la consulta falla, con LIKE '%TEXTO%'.
+
+        Returns:
+            Objetos de get_clase_datos(), a lo sumo `limite`
+        """
+        if not columna.isidentifier():
+            raise ValueError(f"Nombre de columna inválido: {columna}")
+        texto = (texto or "").strip()
+        if not texto:
+            return []
+        limite = limite or self.LIMITE_BUSQUEDA
+
+        # El texto va literal en LIKE: se escapan sus comodines
+        literal = re.sub(r"([\\%_])", r"\\\1", texto.upper())
+        params = {'prefijo': f"{literal}%"}
+        al_inicio = f"UPPER({columna}) LIKE :prefijo ESCAPE '\\'"
+
+        resultados = self.seleccionar(al_inicio, params, orden=f"UPPER({columna})", limite=limite)
+        faltan = limite - len(resultados)
+        if faltan <= 0:
+            return resultados
+
+        # Lo que ya salió en el paso 1 no se repite
+        en_medio = f"NOT ({al_inicio})"
+        if indice_texto:
+            # Solo letras y números: los operadores de Oracle Text no aplican
+            palabras = [re.sub(r"\W", "", p) for p in texto.split()]
+            consulta = " AND ".join(f"%{p}%" for p in palabras if p)
+            if consulta:
+                try:
+                    return resultados + self.seleccionar(
+                        f"CONTAINS({columna}, :consulta, 1) > 0 AND {en_medio}",
+                        dict(params, consulta=consulta), orden="SCORE(1) DESC", limite=faltan)
+                except Exception as e:
+                    print(f"Búsqueda con Oracle Text no disponible, se usa LIKE: {e}")
+
+        params['contiene'] = f"%{literal}%"
+        return resultados + self.seleccionar(
+            f"UPPER({columna}) LIKE :contiene ESCAPE '\\' AND {en_medio}",
+            params, orden=f"UPPER({columna})", limite=faltan)
+
     def obtener_todos(self):
         """Obtiene todos los registros de la tabla"""
         sql = f"SELECT * FROM {self.get_table_name()}"
@@ -40,6 +162,66 @@ class BaseModel(ABC):
 
 
 
+    def obtener_pagina(self, limite=50, despues_de=None, ordenar_por=None,
+                       filtros=None, descendente=False, desplazamiento=0):
+        """Obtiene una página de registros sin traer toda la tabla.
+
+        Args:
+            limite: Cantidad máxima de filas de la página
+            despues_de: Clave de la última fila de la página anterior (paginación
+                        por clave/keyset). Es la que retorna la llamada anterior.
+            ordenar_por: Columna de orden (por defecto la clave primaria). Se
+                         desempata con la clave primaria para que el orden sea único.
+            filtros: dict {columna: valor} que se aplican con igualdad
+            descendente: Orden de mayor a menor
+            desplazamiento: Filas a saltar con OFFSET (solo si no se usa despues_de)
+
+        Returns:
+            (filas, siguiente_clave). siguiente_clave es None cuando no hay más páginas.
+        """
+        pk = self.get_primary_key()
+        columnas_orden = [ordenar_por] if ordenar_por else []
+        columnas_orden += [c for c in (pk if isinstance(pk, tuple) else (pk,))
+                           if c not in columnas_orden]
+        filtros = filtros or {}
+
+        for columna in columnas_orden + list(filtros):
+            if not columna.isidentifier():
+                raise ValueError(f"Nombre de columna inválido: {columna}")
+
+        params = {'limite': limite, 'desplazamiento': 0}
+        condiciones = []
+        for i, (columna, valor) in enumerate(filtros.items()):
+            condiciones.append(f"t.{columna} = :f{i}")
+            params[f"f{i}"] = valor
+
+        if despues_de is not None:
+            # (a, b) > (x, y)  ==>  a > x OR (a = x AND b > y)
+            operador = "<" if descendente else ">"
+            alternativas = []
+            for i, columna in enumerate(columnas_orden):
+                iguales = [f"t.{c} = :k{j}" for j, c in enumerate(columnas_orden[:i])]
+                alternativas.append("(" + " AND ".join(iguales + [f"t.{columna} {operador} :k{i}"]) + ")")
+            condiciones.append("(" + " OR ".join(alternativas) + ")")
+            params.update({f"k{i}": v for i, v in enumerate(despues_de)})
+        else:
+            params['desplazamiento'] = desplazamiento
+
+        direccion = "DESC" if descendente else "ASC"
+        # Las columnas de orden se agregan al final para poder armar la siguiente clave
+        sql = (f"SELECT t.*, {', '.join('t.' + c for c in columnas_orden)} "
+               f"FROM {self.get_table_name()} t")
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY " + ", ".join(f"t.{c} {direccion}" for c in columnas_orden)
+        sql += " OFFSET :desplazamiento ROWS FETCH NEXT :limite ROWS ONLY"
+
+        resultados = self.db.execute_query(sql, params)
+        n = len(columnas_orden)
+        filas = [r[:-n] for r in resultados]
+        siguiente = tuple(resultados[-1][-n:]) if len(resultados) == limite else None
+        return filas, siguiente
+
     def obtener_por_id(self, id_valor):
         """Obtiene un registro por su ID"""
         sql = f"SELECT * FROM {self.get_table_name()} WHERE {self.get_primary_key()} = :id"
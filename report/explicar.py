@@ -0,0 +1,93 @@
+"""
+Revisión de los planes de ejecución de los reportes
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+Corre EXPLAIN PLAN sobre cada consulta de report.report y avisa cuáles
+recorren una tabla completa (TABLE ACCESS FULL). Sirve para comprobar que
+un cambio en una consulta o en los índices no dejó un reporte leyendo toda
+la tabla:
+
+    python -m report.explicar
+
+Sale con código 1 si hay recorridos completos que no se esperaban.
+"""
+import sys
+
+from database.connection import DatabaseConfig
+from report.report import CONSULTAS_REPORTES
+
+# Reportes que por definición leen la tabla entera
+ESCANEO_ESPERADO = {'inventario'}
+
+
+def explicar(nombre: str, sql: str) -> list:
+    """
+    Pide a Oracle el plan de una consulta (sin ejecutarla).
+    Las variables :desde, :hasta, etc. no necesitan valor para EXPLAIN PLAN.
+
+    Returns:
+        Lista de tuplas (id, profundidad, operacion, opciones, objeto, costo)
+    """
+    with DatabaseConfig.get_transaction() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{nombre}' FOR {sql}")
+            cursor.execute("""
+                SELECT id, depth, operation, options, object_name, cost
+                FROM plan_table
+                WHERE statement_id = :nombre
+                ORDER BY id
+            """, {'nombre': nombre})
+            plan = cursor.fetchall()
+            cursor.execute("DELETE FROM plan_table WHERE statement_id = :nombre",
+                           {'nombre': nombre})
+    return plan
+
+
+def escaneos_completos(plan: list) -> list:
+    """Tablas que el plan recorre completas"""
+    return [objeto for _, _, operacion, opciones, objeto, _ in plan
+            if operacion == 'TABLE ACCESS' and opciones == 'FULL']
+
+
+def revisar_reportes() -> int:
+    """Muestra el plan de cada reporte y retorna cuántos tienen
+    recorridos completos no esperados"""
+    problemas = 0
+    for nombre, sql in CONSULTAS_REPORTES.items():
+        try:
+            plan = explicar(nombre, sql)
+        except Exception as e:
+            print(f"✗ {nombre}: no se pudo explicar la consulta: {e}")
+            problemas += 1
+            continue
+
+        completos = escaneos_completos(plan)
+        if not completos:
+            marca = "✓"
+        elif nombre in ESCANEO_ESPERADO:
+            marca = "~"
+        else:
+            marca = "⚠️"
+            problemas += 1
+
+        print(f"\n{marca} {nombre}")
+        for _, profundidad, operacion, opciones, objeto, costo in plan:
+            detalle = f"{operacion} {opciones or ''}".strip()
+            print(f"    {'  ' * profundidad}{detalle} {objeto or ''} (costo {costo})")
+        if completos:
+            print(f"    Recorre completas: {', '.join(completos)}")
+
+    print("\n" + "=" * 60)
+    if problemas:
+        print(f"⚠️ {problemas} reporte(s) con recorridos completos o errores")
+    else:
+        print("✓ Ningún reporte recorre tablas completas sin necesidad")
+    return problemas
+
+
+if __name__ == "__main__":
+    sys.exit(1 if revisar_reportes() else 0)
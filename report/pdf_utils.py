@@ -1,10 +1,51 @@
 import os
+import time
+from itertools import chain, islice
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from datetime import datetime
 
+MARGEN_IZQ = 50
+MARGEN_DER = 50
+Y_INICIAL = 700
+Y_MINIMA = 80
+ALTO_FILA = 20
+SEPARACION_COLUMNAS = 10
+FILAS_MUESTRA = 200  # Filas que se miran para calcular el ancho de las columnas
+
+
+def _calcular_anchos(headers, muestra, ancho_total):
+    """Reparte el ancho de la página entre las columnas según el texto más
+    largo de cada una (encabezado o filas de muestra)"""
+    anchos = [stringWidth(str(h), "Helvetica-Bold", 12) for h in headers]
+    for fila in muestra:
+        for i, col in enumerate(fila[:len(anchos)]):
+            anchos[i] = max(anchos[i], stringWidth(str(col), "Helvetica", 11))
+
+    anchos = [a + SEPARACION_COLUMNAS for a in anchos]
+    escala = ancho_total / sum(anchos) if sum(anchos) > ancho_total else 1
+    return [a * escala for a in anchos]
+
+
+def _recortar(texto, ancho, fuente, tamano):
+    """Corta el texto para que no se monte sobre la siguiente columna"""
+    if stringWidth(texto, fuente, tamano) <= ancho:
+        return texto
+    while texto and stringWidth(texto + "…", fuente, tamano) > ancho:
+        texto = texto[:-1]
+    return texto + "…"
+
+
 def crear_pdf(nombre_archivo, titulo, headers, filas):
+    """Genera un PDF con una tabla.
+
+    `filas` puede ser una lista o cualquier iterador (p. ej. un cursor de la BD):
+    se recorre una sola vez y las filas se dibujan a medida que llegan, sin
+    armar antes una lista con todas. Las páginas dibujadas sí quedan en memoria
+    (reportlab las guarda hasta save()). El ancho de cada columna se calcula con
+    las primeras FILAS_MUESTRA filas."""
     # Definir la ruta de la carpeta de reportes
     carpeta_reportes = "c://sgp/reportes"
 
@@ -15,6 +56,13 @@ def crear_pdf(nombre_archivo, titulo, headers, filas):
     # Ruta completa del archivo
     ruta_completa = os.path.join(carpeta_reportes, nombre_archivo)
 
+    inicio = time.perf_counter()
+    filas = iter(filas)
+    muestra = list(islice(filas, FILAS_MUESTRA))
+    ancho_pagina = letter[0] - MARGEN_IZQ - MARGEN_DER
+    anchos = _calcular_anchos(headers, muestra, ancho_pagina)
+    posiciones = [MARGEN_IZQ + sum(anchos[:i]) for i in range(len(anchos))]
+
     c = canvas.Canvas(ruta_completa, pagesize=letter)
 
     # Título
@@ -26,31 +74,40 @@ def crear_pdf(nombre_archivo, titulo, headers, filas):
     fecha_generacion = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     c.drawString(50, 730, f"Generado el: {fecha_generacion}")
 
-    y = 700
+    def escribir_encabezados(y):
+        c.setFont("Helvetica-Bold", 12)
+        for x, ancho, h in zip(posiciones, anchos, headers):
+            c.drawString(x, y, _recortar(str(h), ancho - SEPARACION_COLUMNAS, "Helvetica-Bold", 12))
+        y -= ALTO_FILA
+        c.line(MARGEN_IZQ, y, MARGEN_IZQ + ancho_pagina, y)
+        return y - ALTO_FILA
 
-    # Encabezados
-    c.setFont("Helvetica-Bold", 12)
-    for i, h in enumerate(headers):
-        c.drawString(50 + i * 150, y, str(h))
-    y -= 20
-    c.line(50, y, 550, y)
-    y -= 20
+    # Cada página se escribe en un solo objeto de texto: una fuente por página
+    # en lugar de un drawString por celda
+    y = escribir_encabezados(Y_INICIAL)
+    texto = c.beginText()
+    texto.setFont("Helvetica", 11)
+    total_filas = 0
 
-    # Filas
-    c.setFont("Helvetica", 11)
-    for fila in filas:
-        for i, col in enumerate(fila):
-            c.drawString(50 + i * 150, y, str(col))
-        y -= 20
+    for fila in chain(muestra, filas):
+        for x, ancho, col in zip(posiciones, anchos, fila):
+            texto.setTextOrigin(x, y)
+            texto.textOut(_recortar(str(col), ancho - SEPARACION_COLUMNAS, "Helvetica", 11))
+        y -= ALTO_FILA
+        total_filas += 1
 
-        if y < 80:
+        if y < Y_MINIMA:
+            c.drawText(texto)
             c.showPage()
-            y = 700
-            c.setFont("Helvetica-Bold", 12)
-            for i, h in enumerate(headers):
-                c.drawString(50 + i * 150, y, str(h))
-            y -= 40
-            c.setFont("Helvetica", 11)
+            y = escribir_encabezados(Y_INICIAL)
+            texto = c.beginText()
+            texto.setFont("Helvetica", 11)
 
+    c.drawText(texto)
     c.save()
-    return ruta_completa
\ No newline at end of file
+
+    transcurrido = time.perf_counter() - inicio
+    velocidad = total_filas / transcurrido if transcurrido > 0 else 0
+    print(f"📄 {nombre_archivo}: {total_filas} filas en {transcurrido:.2f}s "
+          f"({velocidad:,.0f} filas/s)")
+    return ruta_completa
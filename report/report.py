@@ -1,61 +1,46 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from textwrap import dedent
-from database.connection import get_connection
+from database.connection import DatabaseConfig
 from report.pdf_utils import crear_pdf
+from model.venta import Venta
+from model.cartera import Cartera
+from util.fechas import rango_mes, rango_texto, rango_trimestre
+
+# Las consultas de los reportes están en constantes para poder revisar sus
+# planes de ejecución (python -m report.explicar). Los rangos de fechas son
+# siempre [:desde, :hasta) calculados en Python (util/fechas.py).
+
+
+def _filas_con_total(filas, columna, fila_total):
+    """Entrega las filas tal como llegan y al final una fila de totales.
+    Suma la columna indicada mientras se recorren, así el reporte no
+    necesita tener todas las filas en memoria."""
+    total = 0
+    for fila in filas:
+        total += fila[columna] or 0
+        yield fila
+    yield fila_total(total)
+
+
 def generar_factura_pdf(venta_id):
     """
     Genera una factura en PDF para una venta específica usando crear_pdf()
     """
     print("Factura solicitada para venta:", venta_id)
 
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Consulta para obtener datos generales de la venta
-    sql_venta = dedent("""
-        SELECT 
-            v.codigo_venta,
-            v.fecha,
-            c.nombre AS cliente,
-            c.telefono,
-            c.direccion,
-            v.total_bruto,
-            v.iva_total,
-            v.total_neto
-        FROM VENTA v
-        JOIN CLIENTE c ON v.codigo_cliente = c.codigo_cliente
-        WHERE v.codigo_venta = :venta
-    """)
-
-    cursor.execute(sql_venta, {"venta": venta_id})
-    datos_venta = cursor.fetchone()
-
-    if not datos_venta:
+    # Cabecera, cliente y productos salen de una sola consulta
+    factura = Venta().obtener_factura(venta_id)
+
+    if not factura:
         raise Exception(f"No existe la venta con código {venta_id}")
 
-    # Consulta para obtener los productos de la venta
-    sql_productos = dedent("""
-        SELECT 
-            p.nombre AS producto,
-            dp.cantidad,
-            p.valor_venta,
-            (dp.cantidad * p.valor_venta) AS subtotal
-        FROM DETALLEVENTAPRODUCTO dp
-        JOIN PRODUCTO p ON p.codigo = dp.codigo_producto
-        JOIN VENTA v ON dp.id_venta = v.id_venta
-        WHERE v.codigo_venta = :venta
-        ORDER BY p.nombre
-    """)
-
-    cursor.execute(sql_productos, {"venta": venta_id})
-    productos = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-
-    # Desempaquetar datos de la venta
-    codigo_venta, fecha, cliente, telefono, direccion, total_bruto, iva_total, total_neto = datos_venta
+    venta = factura['venta']
+    cliente = factura['cliente']
+    codigo_venta, fecha = venta.codigo_venta, venta.fecha
+    total_bruto, iva_total, total_neto = venta.total_bruto, venta.iva_total, venta.total_neto
+    telefono, direccion = cliente.telefono, cliente.direccion
+    productos = [(nombre, detalle.cantidad, precio, subtotal)
+                 for detalle, nombre, precio, subtotal in factura['detalles']]
 
     # Preparar datos para el PDF
     nombre_pdf = f"factura_{venta_id}.pdf"
@@ -65,7 +50,7 @@ def generar_factura_pdf(venta_id):
     info_venta = [
         ("Factura N°:", codigo_venta),
         ("Fecha:", fecha.strftime('%d/%m/%Y')),
-        ("Cliente:", cliente),
+        ("Cliente:", cliente.nombre),
         ("Teléfono:", telefono or "No registrado"),
         ("Dirección:", direccion or "No registrada"),
     ]
@@ -100,27 +85,68 @@ def generar_factura_pdf(venta_id):
     print(f"✅ Factura generada con éxito: {nombre_pdf}")
     return nombre_pdf
 
-def reporte_total_ventas_mes(anio, mes):
-    conn = get_connection()
-    c = conn.cursor()
-
-    sql = """
-        SELECT fecha, total_neto, cliente 
-        FROM venta
-        WHERE fecha BETWEEN
-              TO_DATE(:anio || '-' || :mes || '-01','YYYY-MM-DD')
-        AND LAST_DAY(TO_DATE(:anio || '-' || :mes || '-01','YYYY-MM-DD'))
-    """
+SQL_VENTAS_MES = """
+    SELECT fecha, SUM(cantidad), SUM(total_neto)
+    FROM ResumenVentasDia
+    WHERE fecha >= :desde AND fecha < :hasta
+    GROUP BY fecha
+    ORDER BY fecha
+"""
+
+SQL_IVA_TRIMESTRE = """
+    SELECT fecha, tipo_venta, cantidad, iva_total
+    FROM ResumenVentasDia
+    WHERE fecha >= :desde AND fecha < :hasta
+    ORDER BY fecha, tipo_venta
+"""
+
+SQL_VENTAS_POR_TIPO = """
+    SELECT tipo_venta, SUM(cantidad), SUM(total_neto)
+    FROM ResumenVentasDia
+    WHERE fecha >= :desde AND fecha < :hasta
+    GROUP BY tipo_venta
+    ORDER BY tipo_venta
+"""
+
+SQL_INVENTARIO = """
+    SELECT p.codigo,
+           p.nombre,
+           p.codigo_categoria,
+           p.valor_adquisicion,
+           p.valor_venta
+    FROM Producto p
+    ORDER BY p.codigo_categoria, p.nombre
+"""
+
+# Foto de la cartera morosa (model/cartera.py): una fila por cliente
+SQL_CLIENTES_MOROSOS = """
+    SELECT nombre, creditos, cuotas_vencidas, dias_mora,
+           vencido_0_30, vencido_31_60, vencido_61_90, vencido_90_mas,
+           total_vencido, exposicion
+    FROM CarteraMorosa
+    ORDER BY dias_mora DESC, total_vencido DESC
+"""
+
+# Consultas de reportes que revisa report/explicar.py
+CONSULTAS_REPORTES = {
+    'ventas_mes': SQL_VENTAS_MES,
+    'iva_trimestre': SQL_IVA_TRIMESTRE,
+    'ventas_por_tipo': SQL_VENTAS_POR_TIPO,
+    'inventario': SQL_INVENTARIO,
+    'clientes_morosos': SQL_CLIENTES_MOROSOS,
+}
 
-    c.execute(sql, {"anio": anio, "mes": mes})
-    filas = c.fetchall()
+def reporte_total_ventas_mes(anio, mes):
+    # Lee del resumen diario: a lo sumo 31 días x tipos de venta
+    desde, hasta = rango_mes(int(anio), int(mes))
 
-    total = sum(f[1] for f in filas)
+    filas = DatabaseConfig.stream_query(SQL_VENTAS_MES, {"desde": desde, "hasta": hasta})
 
-    headers = ["Fecha", "Total Neto", "Cliente"]
+    headers = ["Fecha", "Ventas", "Total Neto"]
     pdf_name = f"reporte_ventas_mes_{anio}_{mes}.pdf"
 
-    crear_pdf(pdf_name, f"Ventas del Mes {anio}-{mes}", headers, filas + [("TOTAL", total, "")])
+    crear_pdf(pdf_name, f"Ventas del Mes {anio}-{mes}", headers,
+              _filas_con_total(filas, 2, lambda total: ("TOTAL", "", total)))
 
     return pdf_name
 
@@ -128,25 +154,16 @@ def reporte_total_ventas_mes(anio, mes):
 # REPORTE 3: IVA POR TRIMESTRE
 # -------------------------------
 def reporte_iva_trimestre(anio, trimestre):
-    conn = get_connection()
-    c = conn.cursor()
-
-    sql = """
-        SELECT codigo_venta, fecha, iva_total
-        FROM venta
-        WHERE EXTRACT(YEAR FROM fecha) = :anio
-          AND CEIL(EXTRACT(MONTH FROM fecha)/3) = :trimestre
-    """
+    # Rango [inicio del trimestre, inicio del siguiente) sobre el resumen diario
+    desde, hasta = rango_trimestre(int(anio), int(trimestre))
 
-    c.execute(sql, {"anio": anio, "trimestre": trimestre})
-    filas = c.fetchall()
+    filas = DatabaseConfig.stream_query(SQL_IVA_TRIMESTRE, {"desde": desde, "hasta": hasta})
 
-    total = sum(f[2] for f in filas)
-
-    headers = ["Venta", "Fecha", "IVA"]
+    headers = ["Fecha", "Tipo Venta", "Ventas", "IVA"]
     pdf_name = f"reporte_iva_Q{trimestre}_{anio}.pdf"
 
-    crear_pdf(pdf_name, f"IVA Trimestre Q{trimestre} {anio}", headers, filas + [("TOTAL", "", total)])
+    crear_pdf(pdf_name, f"IVA Trimestre Q{trimestre} {anio}", headers,
+              _filas_con_total(filas, 3, lambda total: ("TOTAL", "", "", total)))
 
     return pdf_name
 
@@ -154,21 +171,12 @@ def reporte_iva_trimestre(anio, trimestre):
 # REPORTE 4: VENTAS POR TIPO
 # -------------------------------
 def reporte_ventas_por_tipo(fecha_inicio, fecha_fin):
-    conn = get_connection()
-    c = conn.cursor()
-
-    sql = """
-        SELECT tipo_venta, COUNT(*)
-        FROM venta
-        WHERE fecha BETWEEN TO_DATE(:fi,'YYYY-MM-DD')
-        AND TO_DATE(:ff,'YYYY-MM-DD')
-        GROUP BY tipo_venta
-    """
+    # Fechas 'YYYY-MM-DD'; el día final se incluye completo
+    desde, hasta = rango_texto(fecha_inicio, fecha_fin)
 
-    c.execute(sql, {"fi": fecha_inicio, "ff": fecha_fin})
-    filas = c.fetchall()
+    filas = DatabaseConfig.stream_query(SQL_VENTAS_POR_TIPO, {"desde": desde, "hasta": hasta})
 
-    headers = ["Tipo Venta", "Cantidad"]
+    headers = ["Tipo Venta", "Cantidad", "Total Neto"]
     pdf_name = f"reporte_ventas_tipo_{fecha_inicio}_{fecha_fin}.pdf"
 
     crear_pdf(pdf_name, f"Ventas por Tipo", headers, filas)
@@ -176,21 +184,7 @@ def reporte_ventas_por_tipo(fecha_inicio, fecha_fin):
     return pdf_name
 
 def reporte_inventario_por_categoria():
-    conn = get_connection()
-    c = conn.cursor()
-
-    sql = """
-        SELECT p.codigo,
-               p.nombre,
-               p.codigo_categoria,
-               p.valor_adquisicion,
-               p.valor_venta
-        FROM Producto p
-        ORDER BY p.codigo_categoria, p.nombre
-    """
-
-    c.execute(sql)
-    filas = c.fetchall()
+    filas = DatabaseConfig.stream_query(SQL_INVENTARIO)
 
     headers = ["Código", "Producto", "Categoría", "Adquisición", "Venta"]
     pdf_name = "reporte_inventario.pdf"
@@ -203,24 +197,9 @@ def reporte_inventario_por_categoria():
 # REPORTE 6: CLIENTES MOROSOS
 # -------------------------------
 def reporte_clientes_morosos():
-    conn = get_connection()
-    c = conn.cursor()
-
-    sql = """
-        SELECT cl.nombre, v.codigo_venta, cu.codigo_cuota,
-               cu.fecha_vencimiento_cuota, cu.estado_cuota
-        FROM cliente cl
-        JOIN venta v ON v.cliente = cl.codigo_cliente
-        JOIN credito cr ON cr.venta = v.codigo_venta
-        JOIN cuota cu ON cu.credito = cr.credito_id
-        WHERE cu.estado_cuota IN ('VENCIDA', 'PENDIENTE')
-        ORDER BY cl.nombre
-    """
-
-    c.execute(sql)
-    filas = c.fetchall()
+    filas = DatabaseConfig.stream_query(SQL_CLIENTES_MOROSOS)
 
-    headers = ["Cliente", "Venta", "Cuota", "Vencimiento", "Estado"]
+    headers = Cartera.ENCABEZADOS
     pdf_name = "reporte_morosos.pdf"
 
     crear_pdf(pdf_name, "Clientes Morosos", headers, filas)
@@ -0,0 +1,147 @@
+"""
+Búsqueda de texto en memoria por trigramas
+Por: Juan David Ramirez Carmona y
+Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+IndiceTexto indexa textos (los nombres de los productos del catálogo) para
+buscarlos sin recorrerlos todos:
+
+- Los textos se guardan ordenados: los que EMPIEZAN por la búsqueda son un
+  rango contiguo que se encuentra con bisect.
+- Las palabras también se guardan ordenadas: los textos con una palabra que
+  empieza por la búsqueda salen igual, con bisect.
+- Para lo que aparece en medio de una palabra hay un índice de trigramas (cada
+  grupo de 3 letras seguidas apunta a los textos que lo tienen). Buscar
+  "levisor" es intersecar los textos de sus dos trigramas más raros y
+  confirmar que contienen la palabra.
+
+Los resultados salen en ese orden (empieza por, palabra que empieza por, en
+medio) y alfabéticos dentro de cada grupo. Con un límite se para al llenarlo,
+así una búsqueda de una letra sobre un millón de productos no ordena todo.
+
+- Sin tildes ni mayúsculas: "camara" encuentra "Cámara".
+- Con varias palabras, el texto debe contener todas ("tv 55" -> "TV LED 55").
+- Si todas las palabras tienen 1 o 2 letras, solo cuentan como inicio de palabra.
+"""
+import bisect
+import unicodedata
+from array import array
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes y con un solo espacio entre palabras"""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_tildes.lower().split())
+
+
+def coincide(texto: str, consulta: str) -> bool:
+    """True si el texto contiene todas las palabras de la consulta
+    (sin tildes ni mayúsculas), como en IndiceTexto.buscar"""
+    texto = normalizar(texto)
+    return all(p in texto for p in normalizar(consulta).split())
+
+
+def trigramas(palabra: str) -> set:
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+class IndiceTexto(Generic[T]):
+    """Índice de búsqueda sobre (objeto, texto). Es de solo lectura: si los
+    datos cambian se arma uno nuevo (el catálogo lo hace al recargar)."""
+
+    def __init__(self, elementos: Iterable[Tuple[T, str]]):
+        # La posición de cada texto es su lugar en orden alfabético
+        ordenados = sorted(((normalizar(texto), objeto) for objeto, texto in elementos),
+                           key=lambda par: par[0])
+        self._textos: List[str] = [texto for texto, _ in ordenados]
+        self._objetos: List[T] = [objeto for _, objeto in ordenados]
+        self._trigramas: Dict[str, array] = {}
+        palabras = []
+
+        for posicion, texto in enumerate(self._textos):
+            for trigrama in trigramas(texto):
+                lista = self._trigramas.get(trigrama)
+                if lista is None:
+                    lista = self._trigramas[trigrama] = array('l')
+                lista.append(posicion)
+            palabras.extend((palabra, posicion) for palabra in set(texto.split()))
+
+        palabras.sort()
+        self._palabras = [p for p, _ in palabras]
+        self._posiciones_palabras = array('l', (i for _, i in palabras))
+
+    def __len__(self):
+        return len(self._objetos)
+
+    def buscar(self, consulta: str, limite: Optional[int] = None) -> List[T]:
+        """Objetos cuyo texto contiene todas las palabras de la consulta, los más
+        relevantes primero. Con limite se detiene al encontrar esa cantidad."""
+        consulta = normalizar(consulta)
+        palabras = consulta.split()
+        if not palabras:
+            return []
+
+        textos = self._textos
+        encontrados = []
+        vistos = set()
+
+        def agregar(posiciones, cumple) -> bool:
+            """Agrega las posiciones que cumplen; True si ya se llenó el límite"""
+            for i in posiciones:
+                if i not in vistos and cumple(textos[i]):
+                    vistos.add(i)
+                    encontrados.append(i)
+                    if limite is not None and len(encontrados) >= limite:
+                        return True
+            return False
+
+        def palabras_al_inicio(texto):
+            return all(texto.startswith(p) or f" {p}" in texto for p in palabras)
+
+        def contiene(texto):
+            return all(p in texto for p in palabras)
+
+        # 1. Empiezan por la consulta (rango de textos ordenados)
+        lleno = agregar(range(*self._rango(textos, consulta)), lambda texto: True)
+
+        # 2. Una palabra empieza por cada palabra de la consulta
+        if not lleno:
+            # Se recorre el rango de la palabra menos común; las demás se confirman
+            inicio, fin = min((self._rango(self._palabras, p) for p in palabras),
+                              key=lambda rango: rango[1] - rango[0])
+            lleno = agregar(sorted(set(self._posiciones_palabras[inicio:fin])), palabras_al_inicio)
+
+        # 3. En medio de una palabra (trigramas), solo con palabras de 3+ letras
+        if not lleno and any(len(p) >= 3 for p in palabras):
+            agregar(sorted(self._por_trigramas(palabras)), contiene)
+
+        return [self._objetos[i] for i in encontrados]
+
+    @staticmethod
+    def _rango(ordenados: List[str], prefijo: str) -> Tuple[int, int]:
+        """[inicio, fin) de los elementos de la lista ordenada que empiezan por prefijo"""
+        return (bisect.bisect_left(ordenados, prefijo),
+                bisect.bisect_left(ordenados, prefijo + '\uffff'))
+
+    def _por_trigramas(self, palabras: List[str]) -> set:
+        """Posiciones que pueden contener las palabras (se confirman después)"""
+        listas = []
+        for trigrama in set().union(*(trigramas(p) for p in palabras)):
+            lista = self._trigramas.get(trigrama)
+            if lista is None:
+                return set()  # Un trigrama que no existe: nada coincide
+            listas.append(lista)
+        # Basta con los dos trigramas más raros; el resto lo filtra la confirmación
+        listas.sort(key=len)
+        candidatos = set(listas[0])
+        if len(listas) > 1:
+            candidatos.intersection_update(listas[1])
+        return candidatos
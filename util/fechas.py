@@ -0,0 +1,46 @@
+"""
+Rangos de fechas para las consultas
+Por: Juan David Ramirez Carmona y
+Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+Todas las consultas por fecha filtran con un rango semiabierto:
+
+    WHERE fecha >= :desde AND fecha < :hasta
+
+con `desde` y `hasta` calculados aquí. Así Oracle puede usar el índice de la
+columna (no hay TO_DATE, EXTRACT ni TRUNC sobre ella) y el último día entra
+completo aunque las fechas tengan hora. Se pasan objetos date, que oracledb
+enlaza como DATE; un datetime con microsegundos se enlaza como TIMESTAMP y
+obliga a convertir la columna, lo que otra vez impide usar el índice.
+"""
+from datetime import date, timedelta
+
+
+def rango_dias(fecha_inicio: date, fecha_fin: date):
+    """Rango [desde, hasta) que incluye completo el día final"""
+    return fecha_inicio, fecha_fin + timedelta(days=1)
+
+
+def rango_mes(anio: int, mes: int):
+    """Primer día del mes y primer día del siguiente: [desde, hasta)"""
+    desde = date(anio, mes, 1)
+    hasta = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return desde, hasta
+
+
+def rango_trimestre(anio: int, trimestre: int):
+    """Primer día del trimestre y primer día del siguiente: [desde, hasta)"""
+    if not 1 <= trimestre <= 4:
+        raise ValueError(f"Trimestre inválido: {trimestre}")
+    desde = date(anio, 3 * (trimestre - 1) + 1, 1)
+    hasta = date(anio + 1, 1, 1) if trimestre == 4 else date(anio, 3 * trimestre + 1, 1)
+    return desde, hasta
+
+
+def rango_texto(fecha_inicio: str, fecha_fin: str):
+    """Como rango_dias pero con fechas 'YYYY-MM-DD' (las que escriben las ventanas)"""
+    return rango_dias(date.fromisoformat(fecha_inicio), date.fromisoformat(fecha_fin))
@@ -0,0 +1,297 @@
+"""
+Importación masiva de pagos de cuotas desde archivos CSV
+Por: Juan David Ramirez Carmona y
+Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+Carga los extractos diarios (banco/caja) con miles de pagos de cuotas sin
+pasar por la ventana de pagos:
+
+    python -m util.importar_pagos extracto.csv [--lote 500] [--reiniciar]
+
+El archivo debe tener encabezado con las columnas:
+
+    id_credito,n_cuota,valor,fecha_pago
+    1001,3,250000.00,2025-11-14
+
+Se lee en lotes. Cada lote es una transacción: bloquea sus créditos (en orden
+de id_credito y antes que las cuotas, igual que el pago en línea, para no
+cruzarse con la ventana de pagos) y las cuotas pendientes, valida las filas
+contra ellas y aplica los pagos con executemany (Cuota, Pago, libro del
+Credito y estado de la Venta, con las mismas sentencias de model.credito).
+
+- Las filas que no se pueden aplicar van a <archivo>.rechazos.csv con el motivo.
+- Después de cada lote confirmado se guarda en <archivo>.checkpoint cuántas
+  filas van procesadas; si la importación se corta, al volver a correrla
+  sigue desde ahí (--reiniciar empieza de cero). Si se corta justo entre el
+  commit y el checkpoint, las filas de ese lote se rechazan como ya pagadas.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from database.connection import DatabaseConfig
+from model.credito import Credito
+from model.pago import Pago
+
+TAMANO_LOTE = 500  # Filas por transacción (y créditos por IN como máximo)
+COLUMNAS = ('id_credito', 'n_cuota', 'valor', 'fecha_pago')
+CENTAVO = Decimal('0.01')
+
+
+class ImportadorPagos:
+    """Importa un archivo CSV de pagos de cuotas por lotes"""
+
+    def __init__(self, archivo: str, tamano_lote: int = TAMANO_LOTE):
+        self.archivo = archivo
+        self.tamano_lote = tamano_lote
+        self.archivo_checkpoint = f"{archivo}.checkpoint"
+        self.archivo_rechazos = f"{archivo}.rechazos.csv"
+        self.pago_controller = Pago()
+        self.aplicados = 0
+        self.rechazados = 0
+
+    # ---------------------------------------------------------
+    # CHECKPOINT
+    # ---------------------------------------------------------
+    def leer_checkpoint(self) -> int:
+        """Filas de datos ya procesadas en una corrida anterior"""
+        if not os.path.exists(self.archivo_checkpoint):
+            return 0
+        with open(self.archivo_checkpoint, encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+
+    def guardar_checkpoint(self, procesadas: int):
+        """Guarda el avance (se reemplaza el archivo de una vez)"""
+        temporal = f"{self.archivo_checkpoint}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(str(procesadas))
+        os.replace(temporal, self.archivo_checkpoint)
+
+    def reiniciar(self):
+        """Olvida el avance y los rechazos de corridas anteriores"""
+        for ruta in (self.archivo_checkpoint, self.archivo_rechazos):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    # ---------------------------------------------------------
+    # IMPORTACIÓN
+    # ---------------------------------------------------------
+    def importar(self) -> dict:
+        """
+        Procesa el archivo desde el último checkpoint.
+
+        Returns:
+            dict con procesadas, aplicados, rechazados y segundos
+        """
+        inicio = time.perf_counter()
+        procesadas = self.leer_checkpoint()
+        if procesadas:
+            print(f"Continuando después de {procesadas} filas ya procesadas")
+
+        with open(self.archivo, newline='', encoding='utf-8') as entrada, \
+                open(self.archivo_rechazos, 'a', newline='', encoding='utf-8') as salida:
+            lector = csv.DictReader(entrada)
+            faltantes = [c for c in COLUMNAS if c not in (lector.fieldnames or [])]
+            if faltantes:
+                raise ValueError(f"Al archivo le faltan las columnas: {', '.join(faltantes)}")
+
+            rechazos = csv.writer(salida)
+            if salida.tell() == 0:
+                rechazos.writerow(['fila'] + list(COLUMNAS) + ['motivo'])
+
+            # Las filas ya procesadas se saltan sin validarlas
+            filas = enumerate(islice(lector, procesadas, None), start=procesadas + 1)
+
+            while True:
+                lote = list(islice(filas, self.tamano_lote))
+                if not lote:
+                    break
+
+                aplicados, rechazados = self.procesar_lote(lote)
+                for numero, fila, motivo in rechazados:
+                    rechazos.writerow([numero] + [fila.get(c) for c in COLUMNAS] + [motivo])
+                salida.flush()
+
+                procesadas += len(lote)
+                self.guardar_checkpoint(procesadas)
+                self.aplicados += aplicados
+                self.rechazados += len(rechazados)
+
+                transcurrido = time.perf_counter() - inicio
+                print(f"  {procesadas} filas: {self.aplicados} aplicadas, "
+                      f"{self.rechazados} rechazadas ({transcurrido:.1f}s)")
+
+        return {
+            'procesadas': procesadas,
+            'aplicados': self.aplicados,
+            'rechazados': self.rechazados,
+            'segundos': time.perf_counter() - inicio
+        }
+
+    def procesar_lote(self, lote):
+        """
+        Valida y aplica un lote en una sola transacción.
+
+        Args:
+            lote: Lista de (numero_fila, dict_fila)
+
+        Returns:
+            (cantidad_aplicada, [(numero_fila, fila, motivo), ...])
+        """
+        rechazados = []
+        pagos = []
+        for numero, fila in lote:
+            try:
+                pagos.append((numero, fila, self.leer_fila(fila)))
+            except ValueError as e:
+                rechazados.append((numero, fila, str(e)))
+
+        if not pagos:
+            return 0, rechazados
+
+        creditos = sorted({p['id_credito'] for _, _, p in pagos})
+
+        with DatabaseConfig.get_transaction() as conn:
+            with conn.cursor() as cursor:
+                pendientes = self._bloquear_pendientes(cursor, creditos)
+
+                validos = []
+                usadas = set()
+                for numero, fila, pago in pagos:
+                    clave = (pago['id_credito'], pago['n_cuota'])
+                    cuota = pendientes.get(clave)
+                    if cuota is None:
+                        motivo = "La cuota no existe o ya está pagada"
+                    elif clave in usadas:
+                        motivo = "Cuota repetida en el archivo"
+                    elif pago['valor'] != cuota['valor_cuota']:
+                        motivo = f"El valor no coincide con la cuota ({cuota['valor_cuota']})"
+                    else:
+                        usadas.add(clave)
+                        validos.append(dict(pago, id_pago=cuota['id_pago']))
+                        continue
+                    rechazados.append((numero, fila, motivo))
+
+                if validos:
+                    self._aplicar(cursor, validos)
+
+        return len(validos), rechazados
+
+    @staticmethod
+    def leer_fila(fila: dict) -> dict:
+        """Convierte una fila del CSV; lanza ValueError si no es válida"""
+        try:
+            pago = {
+                'id_credito': int(fila['id_credito']),
+                'n_cuota': int(fila['n_cuota']),
+                'valor': Decimal(fila['valor'].strip()).quantize(CENTAVO),
+                'fecha_pago': date.fromisoformat(fila['fecha_pago'].strip())
+            }
+        except (TypeError, AttributeError, ValueError, InvalidOperation):
+            raise ValueError("Fila con formato inválido")
+
+        if pago['valor'] <= 0:
+            raise ValueError("El valor debe ser mayor a 0")
+        if pago['fecha_pago'] > date.today():
+            raise ValueError("La fecha de pago es futura")
+        return pago
+
+    @staticmethod
+    def _bloquear_pendientes(cursor, creditos) -> dict:
+        """Bloquea los créditos del lote y sus cuotas pendientes (hasta el
+        commit) y retorna las cuotas por (id_credito, n_cuota)"""
+        binds = {f"c{i}": id_credito for i, id_credito in enumerate(creditos)}
+        en_lote = ', '.join(':' + b for b in binds)
+
+        # Primero los créditos y en orden de id: el pago en línea bloquea el
+        # crédito antes que la cuota, así ninguno espera al otro en círculo
+        cursor.execute(f"""
+            SELECT id_credito FROM Credito
+            WHERE id_credito IN ({en_lote})
+            ORDER BY id_credito
+            FOR UPDATE
+        """, binds)
+        cursor.fetchall()
+
+        cursor.execute(f"""
+            SELECT id_pago, id_credito, n_cuota, valor_cuota
+            FROM Cuota
+            WHERE id_credito IN ({en_lote})
+              AND estado != 'Pagada'
+            FOR UPDATE
+        """, binds)
+        return {
+            (id_credito, n_cuota): {
+                'id_pago': id_pago,
+                'valor_cuota': Decimal(str(valor_cuota)).quantize(CENTAVO)
+            }
+            for id_pago, id_credito, n_cuota, valor_cuota in cursor
+        }
+
+    def _aplicar(self, cursor, pagos):
+        """Aplica los pagos validados con executemany"""
+        codigos = self.pago_controller.reservar_ids(len(pagos))
+
+        cursor.executemany("""
+            UPDATE Cuota SET estado = 'Pagada' WHERE id_pago = :id_pago
+        """, [{'id_pago': p['id_pago']} for p in pagos])
+
+        cursor.executemany(Credito.SQL_INSERTAR_PAGO, [{
+            'codigo_pago': codigo,
+            'fecha_pago': p['fecha_pago'],
+            'valor': p['valor'],
+            'id_pago': p['id_pago']
+        } for codigo, p in zip(codigos, pagos)])
+
+        # Libro del crédito: una actualización por crédito con los totales del lote
+        por_credito = {}
+        for p in pagos:
+            acumulado = por_credito.setdefault(p['id_credito'], {
+                'id_credito': p['id_credito'], 'valor': Decimal(0),
+                'cantidad': 0, 'fecha_pago': p['fecha_pago']})
+            acumulado['valor'] += p['valor']
+            acumulado['cantidad'] += 1
+            acumulado['fecha_pago'] = max(acumulado['fecha_pago'], p['fecha_pago'])
+        libro = list(por_credito.values())
+
+        cursor.executemany(Credito.SQL_LIBRO_PAGO, libro)
+        cursor.executemany(Credito.SQL_FINALIZAR_VENTA,
+                           [{'id_credito': c['id_credito']} for c in libro])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa pagos de cuotas desde un CSV")
+    parser.add_argument("archivo", help="CSV con id_credito,n_cuota,valor,fecha_pago")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE,
+                        help=f"Filas por transacción (por defecto {TAMANO_LOTE})")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Ignora el checkpoint y los rechazos de corridas anteriores")
+    args = parser.parse_args()
+
+    importador = ImportadorPagos(args.archivo, args.lote)
+    if args.reiniciar:
+        importador.reiniciar()
+
+    try:
+        resultado = importador.importar()
+    except Exception as e:
+        print(f"❌ Error al importar pagos: {e}")
+        sys.exit(1)
+    finally:
+        DatabaseConfig.cerrar_pool()
+
+    en_esta_corrida = resultado['aplicados'] + resultado['rechazados']
+    velocidad = en_esta_corrida / resultado['segundos'] if resultado['segundos'] else 0
+    print(f"✓ {resultado['aplicados']} pagos aplicados, {resultado['rechazados']} rechazados "
+          f"en {resultado['segundos']:.1f}s ({velocidad:,.0f} filas/s)")
+    if resultado['rechazados']:
+        print(f"  Rechazos en: {importador.archivo_rechazos}")
@@ -0,0 +1,135 @@
+"""
+Medición de memoria de los registros de los modelos
+Por: Juan David Ramirez Carmona y
+Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+Mide cuánta memoria ocupan los registros de los modelos (ProductoData,
+VentaData, ...) tal como los entregan (con __slots__, ver
+modelo_base.registro), comparados con un dataclass normal (con __dict__):
+
+    python -m util.medir_registros [--filas 100000]
+
+Por cada tipo muestra:
+- Bytes por registro, sin contar sus valores (lo que cambia con __slots__).
+- MB de `filas` registros con __slots__ y con __dict__.
+- MB totales con valores de ejemplo (textos, Decimal, fechas) medidos con
+  tracemalloc: lo que de verdad ocupa una tabla de ese tamaño en una ventana.
+
+Sale con código 1 si algún registro pasa de PRESUPUESTO_MB por cada 100.000
+filas (sin contar los valores).
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Union, get_args, get_origin, get_type_hints
+
+from model.auditoria import AuditoriaData
+from model.cliente import ClienteData
+from model.credito import CreditoData
+from model.cuota import CuotaData
+from model.pago import PagoData
+from model.producto import ProductoData
+from model.venta import VentaData
+
+FILAS = 100_000
+PRESUPUESTO_MB = 16  # Por cada 100.000 registros, sin contar los valores
+
+REGISTROS = [ProductoData, ClienteData, VentaData, CreditoData,
+             CuotaData, PagoData, AuditoriaData]
+
+MB = 1024 * 1024
+
+
+def _valor_ejemplo(tipo, i: int):
+    """Valor distinto por fila, del tipo del campo"""
+    if get_origin(tipo) is Union:
+        tipo = next(t for t in get_args(tipo) if t is not type(None))
+    if tipo is int:
+        return 1_000_000 + i
+    if tipo is float:
+        return 1000.5 + i
+    if tipo is Decimal:
+        return Decimal(i) / 100 + 1000
+    if tipo is datetime:
+        return datetime(2025, 1, 1, 8, 30) + timedelta(days=i % 365)
+    if tipo is date:
+        return date(2025, 1, 1) + timedelta(days=i % 365)
+    return f"texto {i}"
+
+
+def _sin_slots(clase):
+    """La misma clase como dataclass normal (con __dict__), para comparar"""
+    return dataclass(type(f"{clase.__name__}Dict", (), {
+        '__annotations__': get_type_hints(clase)
+    }))
+
+
+def _tipos(clase) -> list:
+    tipos = get_type_hints(clase)
+    return [tipos[campo.name] for campo in fields(clase)]
+
+
+def _medir(crear) -> float:
+    """MB que quedan ocupados después de llamar crear() (se mide con tracemalloc)"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    resultado = crear()
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del resultado
+    return usado / MB
+
+
+def medir_sin_valores(clase, filas: int) -> float:
+    """MB de `filas` registros sin contar sus valores (que se crean antes de medir),
+    incluida la lista que los guarda"""
+    tipos = _tipos(clase)
+    valores = [[_valor_ejemplo(tipo, i) for tipo in tipos] for i in range(filas)]
+    return _medir(lambda: [clase(*fila) for fila in valores])
+
+
+def medir_con_valores(clase, filas: int) -> float:
+    """MB de `filas` registros de `clase` con sus valores"""
+    tipos = _tipos(clase)
+    return _medir(lambda: [clase(*[_valor_ejemplo(tipo, i) for tipo in tipos])
+                           for i in range(filas)])
+
+
+def medir_registros(filas: int = FILAS) -> int:
+    """Muestra la tabla de medición y retorna cuántos registros pasan del presupuesto"""
+    presupuesto = PRESUPUESTO_MB * filas / FILAS
+    excedidos = 0
+
+    print(f"Memoria de {filas:,} registros de cada tipo")
+    print(f"{'Registro':<16}{'Bytes':>7}{'__slots__ MB':>14}{'__dict__ MB':>13}"
+          f"{'Ahorro':>8}{'Con valores MB':>16}")
+    for clase in REGISTROS:
+        mb_slots = medir_sin_valores(clase, filas)
+        mb_dict = medir_sin_valores(_sin_slots(clase), filas)
+        marca = ""
+        if mb_slots > presupuesto:
+            excedidos += 1
+            marca = "  ⚠️ sobre el presupuesto"
+        print(f"{clase.__name__:<16}{mb_slots * MB / filas:>7.0f}{mb_slots:>14.1f}{mb_dict:>13.1f}"
+              f"{(1 - mb_slots / mb_dict) * 100:>7.0f}%{medir_con_valores(clase, filas):>16.1f}{marca}")
+
+    print(f"\nPresupuesto: {presupuesto:.1f} MB por tipo de registro y {filas:,} filas "
+          f"(sin contar los valores)")
+    return excedidos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide la memoria de los registros de los modelos")
+    parser.add_argument("--filas", type=int, default=FILAS,
+                        help=f"Registros a crear de cada tipo (por defecto {FILAS:,})")
+    args = parser.parse_args()
+    sys.exit(1 if medir_registros(args.filas) else 0)
@@ -7,58 +7,163 @@ Licencia: GPLv3
 """
 
 """
-Lit es un singleton que almacena el ID del usuario logueado
-No modificar 
+Lit es un singleton que almacena el usuario logueado.
+
+Al iniciar sesión se carga una sola vez (usuario + rol en una consulta) un
+ContextoSesion con el nombre, el rol y los permisos ya calculados. Las
+ventanas lo leen con get_contexto() sin volver a la base de datos; si el
+usuario o su rol cambian, refrescar() lo vuelve a cargar.
 """
+from typing import Optional
+
 from model import auditoria
-_usuario_id = None
+
+ROL_ADMINISTRADOR = 1
+ROL_PARAMETRICO = 2
+ROL_ESPORADICO = 3
+
+NOMBRES_ROL = {
+    ROL_ADMINISTRADOR: "Administrador",
+    ROL_PARAMETRICO: "Usuario Paramétrico",
+    ROL_ESPORADICO: "Usuario Esporádico",
+}
+
+# Permiso -> roles que lo tienen
+PERMISOS = {
+    'gestionar_clientes': {ROL_ADMINISTRADOR, ROL_PARAMETRICO},
+    'editar_productos': {ROL_ADMINISTRADOR, ROL_PARAMETRICO},
+    'gestionar_creditos': {ROL_ADMINISTRADOR, ROL_PARAMETRICO},
+    'auditoria': {ROL_ADMINISTRADOR},
+}
+
+
+class ContextoSesion:
+    """Usuario logueado, su rol y sus permisos (sin consultas al leerlos)"""
+
+    def __init__(self, usuario):
+        """usuario: UsuarioRolData (ver Usuario.obtener_con_rol)"""
+        self.usuario = usuario
+        self.permisos = frozenset(permiso for permiso, roles in PERMISOS.items()
+                                  if usuario.id_rol in roles)
+
+    @property
+    def id_usuario(self) -> int:
+        return self.usuario.id_usuario
+
+    @property
+    def nombre_usuario(self) -> str:
+        return self.usuario.nombre_usuario
+
+    @property
+    def id_rol(self) -> Optional[int]:
+        return self.usuario.id_rol
+
+    @property
+    def nombre_rol(self) -> str:
+        return NOMBRES_ROL.get(self.id_rol, self.usuario.nombre_rol or "Desconocido")
+
+    @property
+    def es_administrador(self) -> bool:
+        return self.id_rol == ROL_ADMINISTRADOR
+
+    @property
+    def solo_lectura(self) -> bool:
+        """Usuario Esporádico: solo consulta"""
+        return self.id_rol == ROL_ESPORADICO
+
+    def puede(self, permiso: str) -> bool:
+        """True si el rol del usuario tiene el permiso (ver PERMISOS)"""
+        return permiso in self.permisos
+
+    def __repr__(self):
+        return f"ContextoSesion({self.nombre_usuario!r}, rol={self.nombre_rol!r})"
+
+
+_contexto: Optional[ContextoSesion] = None
+
+
+def _cargar_contexto(id_usuario: int) -> Optional[ContextoSesion]:
+    """Lee el usuario y su rol de la base de datos (una consulta)"""
+    from model.usuario import Usuario
+
+    usuario = Usuario().obtener_con_rol(id_usuario)
+    return ContextoSesion(usuario) if usuario else None
 
 
 def get_usuario_entidad(id_usuario: int):
-    """Obtiene la entidad UsuarioData del usuario logueado."""
-    from model.usuario import Usuario, UsuarioData
+    """Obtiene la entidad UsuarioData de un usuario (consulta la base de datos)."""
+    from model.usuario import Usuario
 
     usuario_model = Usuario()
     return usuario_model.obtener_por_id(id_usuario)
 
 
-
 def get_usuario_rol(id_usuario: int) -> int | None:
-    """Obtiene el rol del usuario logueado."""
+    """Obtiene el rol de un usuario (sin consultar si es el logueado)."""
+    if _contexto is not None and _contexto.id_usuario == id_usuario:
+        return _contexto.id_rol
     usuario_data = get_usuario_entidad(id_usuario)
     if usuario_data:
         return usuario_data.id_rol
     return None
 
 def get_usuario_nombre(id_usuario: int) -> str | None:
-    """Obtiene el nombre del usuario logueado."""
+    """Obtiene el nombre de un usuario (sin consultar si es el logueado)."""
+    if _contexto is not None and _contexto.id_usuario == id_usuario:
+        return _contexto.nombre_usuario
     usuario_data = get_usuario_entidad(id_usuario)
     if usuario_data:
         return usuario_data.nombre_usuario
     return None
 
+def iniciar_sesion(id_usuario: int) -> Optional[ContextoSesion]:
+    """Carga el contexto del usuario y registra su ingreso en la auditoría.
+    Retorna None si el usuario no existe."""
+    global _contexto
+    contexto = _cargar_contexto(id_usuario)
+    if contexto is None:
+        print(f"Error: No existe el usuario {id_usuario}.")
+        return None
+    _contexto = contexto
+    print(f"Sesión iniciada: {_contexto}")
+    auditoria.Auditoria().registrar_ingreso(id_usuario)
+    return _contexto
+
 def set_usuario_id(id_usuario: int):
-    """Guarda el ID del usuario logueado."""
-    global _usuario_id
+    """Guarda el usuario logueado (ver iniciar_sesion)."""
     if isinstance(id_usuario, int):
-        _usuario_id = id_usuario
-        print(f"ID de usuario guardado: {_usuario_id}")
-        auditoria.Auditoria().registrar_ingreso(id_usuario)
+        iniciar_sesion(id_usuario)
     else:
         print("Error: El ID debe ser un número entero.")
 
+def get_contexto() -> Optional[ContextoSesion]:
+    """Contexto del usuario logueado (None si no hay sesión)."""
+    return _contexto
+
+def refrescar() -> Optional[ContextoSesion]:
+    """Vuelve a cargar el usuario logueado (p. ej. si cambió su rol).
+    Si ya no existe, la sesión se mantiene con los datos anteriores."""
+    global _contexto
+    if _contexto is None:
+        return None
+    contexto = _cargar_contexto(_contexto.id_usuario)
+    if contexto is not None:
+        _contexto = contexto
+    return _contexto
+
 def get_usuario_id() -> int | None:
     """Obtiene el ID del usuario actual."""
-    return _usuario_id
+    return _contexto.id_usuario if _contexto is not None else None
 
 def logout():
-    """Limpia el ID de usuario."""
-    global _usuario_id
-    auditoria.Auditoria().registrar_salida(_usuario_id)
-    print(f"Cerrando sesión del ID: {_usuario_id}")
-    _usuario_id = None
+    """Cierra la sesión del usuario."""
+    global _contexto
+    id_usuario = get_usuario_id()
+    auditoria.Auditoria().registrar_salida(id_usuario)
+    print(f"Cerrando sesión del ID: {id_usuario}")
+    _contexto = None
 
 
 def is_logged_in() -> bool:
-    """Verifica si hay un ID guardado."""
-    return _usuario_id is not None
\ No newline at end of file
+    """Verifica si hay un usuario logueado."""
+    return _contexto is not None
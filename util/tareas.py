@@ -0,0 +1,135 @@
+"""
+Ejecución de consultas en segundo plano para las ventanas
+Por: Juan David Ramirez Carmona y
+Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+Las ventanas no deben llamar a Oracle desde el hilo de la interfaz:
+si la consulta tarda, la ventana se congela. ejecutar() corre la función
+en un hilo del pool y entrega el resultado (o el error) de vuelta en el
+hilo de la interfaz por medio de señales.
+
+    ejecutar(self.modelo.obtener_algo, 10,
+             al_terminar=self.mostrar, al_fallar=self.mostrar_error,
+             ventana=self)
+"""
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+
+from database.connection import DatabaseConfig
+
+
+class _Senales(QObject):
+    """Señales de una tarea. Se emiten desde el hilo de trabajo y Qt las
+    entrega en el hilo donde se conectaron (el de la interfaz)."""
+    terminado = pyqtSignal(object)
+    error = pyqtSignal(object)
+    finalizado = pyqtSignal()
+
+
+class Tarea(QRunnable):
+    """Una llamada a ejecutar fuera del hilo de la interfaz"""
+
+    def __init__(self, funcion, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.senales = _Senales()
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        """Cancela la tarea. Si aún no empezó, no se ejecuta; si ya está
+        corriendo, su resultado se descarta (la consulta termina en la BD)."""
+        self._cancelada.set()
+        if _pool().tryTake(self):
+            self.senales.finalizado.emit()
+
+    def run(self):
+        try:
+            if self.cancelada:
+                return
+            resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelada:
+                self.senales.error.emit(e)
+        else:
+            if not self.cancelada:
+                self.senales.terminado.emit(resultado)
+        finally:
+            self.senales.finalizado.emit()
+
+
+_pool_tareas = None
+_en_curso = set()  # Mantiene vivas las tareas hasta que terminan
+
+
+def _pool() -> QThreadPool:
+    """Pool de hilos de las tareas. No tiene más hilos que sesiones el pool
+    de la BD, para que las tareas no se queden esperando conexión."""
+    global _pool_tareas
+    if _pool_tareas is None:
+        _pool_tareas = QThreadPool()
+        _pool_tareas.setMaxThreadCount(DatabaseConfig.POOL_MAX)
+    return _pool_tareas
+
+
+def ejecutar(funcion, *args, al_terminar=None, al_fallar=None, ventana=None,
+             **kwargs) -> Tarea:
+    """
+    Ejecuta funcion(*args, **kwargs) en segundo plano.
+
+    Args:
+        al_terminar: Recibe el resultado (en el hilo de la interfaz)
+        al_fallar: Recibe la excepción (en el hilo de la interfaz)
+        ventana: Ventana que muestra el cursor de ocupado mientras la tarea
+                 corre; sus tareas se pueden cancelar con cancelar_tareas()
+
+    Returns:
+        La Tarea, que se puede cancelar con tarea.cancelar()
+    """
+    tarea = Tarea(funcion, *args, **kwargs)
+
+    if al_terminar:
+        tarea.senales.terminado.connect(al_terminar)
+    if al_fallar:
+        tarea.senales.error.connect(al_fallar)
+    if ventana is not None:
+        _marcar_ocupada(ventana, tarea)
+
+    _en_curso.add(tarea)
+    tarea.senales.finalizado.connect(lambda: _en_curso.discard(tarea))
+    _pool().start(tarea)
+    return tarea
+
+
+def cancelar_tareas(ventana):
+    """Cancela las tareas pendientes de una ventana (p. ej. al cerrarla)"""
+    for tarea in list(getattr(ventana, '_tareas_activas', [])):
+        tarea.cancelar()
+
+
+def _marcar_ocupada(ventana, tarea):
+    """Pone el cursor de ocupado en la ventana mientras tenga tareas activas"""
+    if not hasattr(ventana, '_tareas_activas'):
+        ventana._tareas_activas = []
+    if not ventana._tareas_activas:
+        ventana.setCursor(Qt.BusyCursor)
+    ventana._tareas_activas.append(tarea)
+
+    def al_finalizar():
+        if tarea in ventana._tareas_activas:
+            ventana._tareas_activas.remove(tarea)
+            if not ventana._tareas_activas:
+                ventana.unsetCursor()
+
+    tarea.senales.finalizado.connect(al_finalizar)
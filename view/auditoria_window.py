@@ -9,10 +9,31 @@ import sys
 import csv
 from datetime import datetime, timedelta
 from PyQt5 import QtWidgets, uic
-from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QFileDialog
+from PyQt5.QtWidgets import QMessageBox, QFileDialog
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor
 from model.auditoria import Auditoria
+from view.modelo_tabla import Columna, ModeloTablaPaginado
+
+# Fondo de las filas con sesión activa
+COLOR_ACTIVA = QColor(200, 255, 200)
+
+
+def _formato_fecha(fecha):
+    return fecha.strftime('%d/%m/%Y %H:%M:%S') if fecha else "-"
+
+
+def _duracion(registro):
+    """Duración de la sesión (None si sigue activa)"""
+    return registro[2] - registro[1] if registro[2] else None
+
+
+def _formato_duracion(delta):
+    if delta is None:
+        return "En curso"
+    horas = int(delta.total_seconds() / 3600)
+    minutos = int((delta.total_seconds() % 3600) / 60)
+    return f"{horas}h {minutos}m"
 
 
 class AuditoriaWindow(QtWidgets.QMainWindow):
@@ -20,6 +41,8 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
     Ventana para visualizar el historial de ingresos y salidas de usuarios
     """
 
+    TAMANO_PAGINA = 200
+
     def __init__(self):
         super().__init__()
 
@@ -39,15 +62,14 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
             sys.exit(1)
 
         # Variables de estado
-        self.registros_actuales = []
         self.registro_seleccionado = None
 
+        # Configurar tabla (crea el modelo que usan las señales)
+        self.configurar_tabla()
+
         # Conectar señales
         self.conectar_senales()
 
-        # Configurar tabla
-        self.configurar_tabla()
-
         # Configurar fechas por defecto (última semana)
         self.configurar_fechas_default()
 
@@ -69,22 +91,49 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
         self.comboBox_filtro.currentIndexChanged.connect(self.aplicar_filtro_rapido)
 
         # Tabla
-        self.tableWidget_auditoria.itemSelectionChanged.connect(self.registro_seleccionado_cambio)
+        self.tableView_auditoria.selectionModel().selectionChanged.connect(self.registro_seleccionado_cambio)
+        self.modelo_auditoria.pagina_cargada.connect(self._pagina_cargada)
+        self.modelo_auditoria.error.connect(self._error_cargando_registros)
 
         # Enter en búsqueda
         self.lineEdit_buscar_usuario.returnPressed.connect(self.buscar_usuario)
 
     def configurar_tabla(self):
-        """Configura las propiedades de la tabla"""
-        self.tableWidget_auditoria.setColumnWidth(0, 100)  # ID Registro
-        self.tableWidget_auditoria.setColumnWidth(1, 180)  # Fecha Ingreso
-        self.tableWidget_auditoria.setColumnWidth(2, 180)  # Fecha Salida
-        self.tableWidget_auditoria.setColumnWidth(3, 120)  # Duración
-        self.tableWidget_auditoria.setColumnWidth(4, 100)  # ID Usuario
-        self.tableWidget_auditoria.setColumnWidth(5, 250)  # Nombre Usuario
-        self.tableWidget_auditoria.setColumnWidth(6, 120)  # Estado
+        """Configura las propiedades de la tabla.
 
-        self.tableWidget_auditoria.setSortingEnabled(True)
+        Formato de registros:
+        (id_auditoria, fecha_ingreso, fecha_salida, codigo_usuario, nombre_usuario)
+        """
+        fondo = lambda r: COLOR_ACTIVA if r[2] is None else None
+        columnas = [
+            Columna("ID Registro", lambda r: r[0], fondo=fondo),
+            Columna("Fecha Ingreso", lambda r: r[1], _formato_fecha, fondo=fondo),
+            Columna("Fecha Salida", lambda r: r[2], _formato_fecha, fondo=fondo),
+            Columna("Duración", _duracion, _formato_duracion, fondo=fondo),
+            Columna("ID Usuario", lambda r: r[3], fondo=fondo),
+            Columna("Nombre Usuario", lambda r: r[4], fondo=fondo),
+            Columna("Estado", lambda r: r[2] is None,
+                    lambda activa: "🟢 Activa" if activa else "🔴 Cerrada", fondo=fondo),
+        ]
+        self.modelo_auditoria = ModeloTablaPaginado(columnas, parent=self)
+        self.tableView_auditoria.setModel(self.modelo_auditoria)
+
+        self.tableView_auditoria.setColumnWidth(0, 100)  # ID Registro
+        self.tableView_auditoria.setColumnWidth(1, 180)  # Fecha Ingreso
+        self.tableView_auditoria.setColumnWidth(2, 180)  # Fecha Salida
+        self.tableView_auditoria.setColumnWidth(3, 120)  # Duración
+        self.tableView_auditoria.setColumnWidth(4, 100)  # ID Usuario
+        self.tableView_auditoria.setColumnWidth(5, 250)  # Nombre Usuario
+        self.tableView_auditoria.setColumnWidth(6, 120)  # Estado
+
+        # Sin orden por encabezado: los registros llegan por páginas ya
+        # ordenados desde la BD y ordenar en la vista solo movería los cargados
+        self.tableView_auditoria.setSortingEnabled(False)
+
+    @property
+    def registros_actuales(self):
+        """Registros cargados en la tabla"""
+        return self.modelo_auditoria.filas
 
     def configurar_fechas_default(self):
         """Configura las fechas por defecto (última semana)"""
@@ -95,39 +144,40 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
         self.dateEdit_fin.setDate(fecha_fin)
 
     def cargar_todos_registros(self):
-        """Carga todos los registros de auditoría"""
-        try:
-            registros = self.auditoria_controller.obtener_con_nombres()
-            self.registros_actuales = registros
-            self.llenar_tabla(registros)
-            self.actualizar_estadisticas(registros)
-            self.statusBar().showMessage(f"Se cargaron {len(registros)} registros.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar registros:\n{e}")
-            self.statusBar().showMessage("Error al cargar registros.")
+        """Carga la primera página de registros de auditoría (los más recientes);
+        el resto se trae a medida que se baja por la tabla. La consulta corre en segundo plano."""
+        self.cargar_registros()
+
+    def cargar_registros(self, **filtros):
+        """Recarga la tabla por páginas con los filtros de
+        Auditoria.obtener_pagina_con_nombres (cerradas, codigo_usuario, nombre)"""
+        self.statusBar().showMessage("Cargando registros...")
+        self.modelo_auditoria.reiniciar(
+            lambda despues_de: self.auditoria_controller.obtener_pagina_con_nombres(
+                self.TAMANO_PAGINA, despues_de=despues_de, **filtros
+            )
+        )
+
+    def _pagina_cargada(self, total):
+        """Actualiza las estadísticas cada vez que cambian los registros de la tabla"""
+        self.actualizar_estadisticas(self.registros_actuales)
+        self.statusBar().showMessage(f"Se cargaron {total} registros.")
+
+    def _error_cargando_registros(self, e):
+        """Informa un error al cargar los registros"""
+        QMessageBox.critical(self, "Error", f"Error al cargar registros:\n{e}")
+        self.statusBar().showMessage("Error al cargar registros.")
 
     def aplicar_filtro_rapido(self):
-        """Aplica el filtro rápido seleccionado en el ComboBox"""
+        """Aplica el filtro rápido seleccionado en el ComboBox (en la consulta)"""
         filtro = self.comboBox_filtro.currentText()
 
-        try:
-            if filtro == "Solo sesiones activas":
-                registros = self.auditoria_controller.obtener_sesiones_activas()
-                # Agregar None como fecha_salida para compatibilidad
-                registros = [(r[0], r[1], None, r[2], r[3]) for r in registros]
-            elif filtro == "Solo sesiones cerradas":
-                todos = self.auditoria_controller.obtener_con_nombres()
-                registros = [r for r in todos if r[2] is not None]
-            else:  # Todos los registros
-                registros = self.auditoria_controller.obtener_con_nombres()
-
-            self.registros_actuales = registros
-            self.llenar_tabla(registros)
-            self.actualizar_estadisticas(registros)
-            self.statusBar().showMessage(f"Filtro aplicado: {len(registros)} registros.")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al aplicar filtro:\n{e}")
+        if filtro == "Solo sesiones activas":
+            self.cargar_registros(cerradas=False)
+        elif filtro == "Solo sesiones cerradas":
+            self.cargar_registros(cerradas=True)
+        else:  # Todos los registros
+            self.cargar_todos_registros()
 
     def aplicar_filtros(self):
         """Aplica los filtros de fecha"""
@@ -135,18 +185,14 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
             fecha_inicio = self.dateEdit_inicio.date().toPyDate()
             fecha_fin = self.dateEdit_fin.date().toPyDate()
 
-            # Convertir a datetime para la consulta
-            fecha_inicio_dt = datetime.combine(fecha_inicio, datetime.min.time())
-            fecha_fin_dt = datetime.combine(fecha_fin, datetime.max.time())
-
+            # Se pasan fechas (no datetime con microsegundos) para que la
+            # consulta compare DATE con DATE y pueda usar el índice
             registros = self.auditoria_controller.obtener_por_rango_fechas(
-                fecha_inicio_dt,
-                fecha_fin_dt
+                fecha_inicio,
+                fecha_fin
             )
 
-            self.registros_actuales = registros
             self.llenar_tabla(registros)
-            self.actualizar_estadisticas(registros)
 
             self.statusBar().showMessage(
                 f"Filtro aplicado: {len(registros)} registros entre "
@@ -157,86 +203,24 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
             QMessageBox.critical(self, "Error", f"Error al aplicar filtro de fechas:\n{e}")
 
     def buscar_usuario(self):
-        """Busca registros por ID o nombre de usuario"""
+        """Busca registros por ID o nombre de usuario (en la consulta)"""
         texto_busqueda = self.lineEdit_buscar_usuario.text().strip()
 
         if not texto_busqueda:
             self.cargar_todos_registros()
-            return
-
-        try:
-            todos_registros = self.auditoria_controller.obtener_con_nombres()
-
-            # Filtrar por ID o nombre
-            if texto_busqueda.isdigit():
-                # Buscar por ID de usuario
-                registros = [r for r in todos_registros if str(r[3]) == texto_busqueda]
-            else:
-                # Buscar por nombre (case insensitive)
-                texto_upper = texto_busqueda.upper()
-                registros = [r for r in todos_registros if texto_upper in r[4].upper()]
-
-            self.registros_actuales = registros
-            self.llenar_tabla(registros)
-            self.actualizar_estadisticas(registros)
-            self.statusBar().showMessage(f"Búsqueda: {len(registros)} registros encontrados.")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al buscar:\n{e}")
+        elif texto_busqueda.isdigit():
+            self.cargar_registros(codigo_usuario=int(texto_busqueda))
+        else:
+            self.cargar_registros(nombre=texto_busqueda)
 
     def llenar_tabla(self, registros):
         """
-        Llena la tabla con los registros proporcionados.
+        Muestra en la tabla los registros proporcionados (sin más páginas).
 
         Formato de registros:
         (id_auditoria, fecha_ingreso, fecha_salida, codigo_usuario, nombre_usuario)
         """
-        self.tableWidget_auditoria.setRowCount(0)
-
-        for registro in registros:
-            id_audit = registro[0]
-            fecha_ingreso = registro[1]
-            fecha_salida = registro[2]
-            codigo_usuario = registro[3]
-            nombre_usuario = registro[4]
-
-            fila = self.tableWidget_auditoria.rowCount()
-            self.tableWidget_auditoria.insertRow(fila)
-
-            # Calcular duración
-            duracion = "En curso"
-            if fecha_salida:
-                delta = fecha_salida - fecha_ingreso
-                horas = int(delta.total_seconds() / 3600)
-                minutos = int((delta.total_seconds() % 3600) / 60)
-                duracion = f"{horas}h {minutos}m"
-
-            # Estado
-            estado = "🟢 Activa" if fecha_salida is None else "🔴 Cerrada"
-
-            # Formatear fechas
-            fecha_ingreso_str = fecha_ingreso.strftime('%d/%m/%Y %H:%M:%S')
-            fecha_salida_str = fecha_salida.strftime('%d/%m/%Y %H:%M:%S') if fecha_salida else "-"
-
-            # Agregar datos a las columnas
-            self.tableWidget_auditoria.setItem(fila, 0, QTableWidgetItem(str(id_audit)))
-            self.tableWidget_auditoria.setItem(fila, 1, QTableWidgetItem(fecha_ingreso_str))
-            self.tableWidget_auditoria.setItem(fila, 2, QTableWidgetItem(fecha_salida_str))
-            self.tableWidget_auditoria.setItem(fila, 3, QTableWidgetItem(duracion))
-            self.tableWidget_auditoria.setItem(fila, 4, QTableWidgetItem(str(codigo_usuario)))
-            self.tableWidget_auditoria.setItem(fila, 5, QTableWidgetItem(nombre_usuario))
-            self.tableWidget_auditoria.setItem(fila, 6, QTableWidgetItem(estado))
-
-            # Colorear filas según estado
-            if fecha_salida is None:
-                # Sesión activa - verde claro
-                for col in range(7):
-                    self.tableWidget_auditoria.item(fila, col).setBackground(
-                        QColor(200, 255, 200)
-                    )
-
-            # Guardar registro completo en la primera celda
-            self.tableWidget_auditoria.item(fila, 0).setData(Qt.UserRole, registro)
+        self.modelo_auditoria.establecer(registros)
 
     def actualizar_estadisticas(self, registros):
         """Actualiza las etiquetas de estadísticas"""
@@ -244,21 +228,20 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
         activas = sum(1 for r in registros if r[2] is None)
         cerradas = total - activas
 
-        self.label_total_registros.setText(f"📊 Total Registros: {total}")
+        mas = "+" if self.modelo_auditoria.hay_mas else ""
+        self.label_total_registros.setText(f"📊 Total Registros: {total}{mas}")
         self.label_sesiones_activas.setText(f"🟢 Sesiones Activas: {activas}")
         self.label_sesiones_cerradas.setText(f"🔴 Sesiones Cerradas: {cerradas}")
 
     def registro_seleccionado_cambio(self):
         """Se ejecuta cuando se selecciona un registro en la tabla"""
-        seleccion = self.tableWidget_auditoria.selectedItems()
+        seleccion = self.tableView_auditoria.selectionModel().selectedRows()
 
         if not seleccion:
             self.pushButton_ver_detalles.setEnabled(False)
             return
 
-        fila = self.tableWidget_auditoria.currentRow()
-        item = self.tableWidget_auditoria.item(fila, 0)
-        self.registro_seleccionado = item.data(Qt.UserRole)
+        self.registro_seleccionado = self.modelo_auditoria.fila(seleccion[0].row())
 
         # Habilitar botón de detalles
         self.pushButton_ver_detalles.setEnabled(True)
@@ -316,7 +299,9 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
             QMessageBox.critical(self, "Error", f"Error al obtener detalles:\n{e}")
 
     def exportar_csv(self):
-        """Exporta los registros actuales a un archivo CSV"""
+        """Exporta los registros actuales a un archivo CSV.
+        Si la tabla muestra todos los registros pero solo se han cargado algunas
+        páginas, se exportan todos leyéndolos de la BD por lotes."""
         if not self.registros_actuales:
             QMessageBox.warning(self, "Advertencia", "No hay registros para exportar.")
             return
@@ -348,7 +333,12 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
                 ])
 
                 # Escribir datos
-                for registro in self.registros_actuales:
+                if self.modelo_auditoria.hay_mas:
+                    registros = self.auditoria_controller.iterar_con_nombres()
+                else:
+                    registros = self.registros_actuales
+
+                for registro in registros:
                     id_audit = registro[0]
                     fecha_ingreso = registro[1]
                     fecha_salida = registro[2]
@@ -384,6 +374,11 @@ class AuditoriaWindow(QtWidgets.QMainWindow):
             QMessageBox.critical(self, "Error", f"Error al exportar:\n{e}")
 
 
+    def closeEvent(self, event):
+        """Al cerrar, la página de registros que esté cargando ya no se va a mostrar"""
+        self.modelo_auditoria.cancelar_carga()
+        super().closeEvent(event)
+
 # Para pruebas independientes
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
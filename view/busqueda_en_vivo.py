@@ -0,0 +1,204 @@
+"""
+Búsqueda mientras se escribe para las ventanas
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+"""
+BusquedaEnVivo conecta un QLineEdit con una función de búsqueda:
+
+- Espera a que el usuario deje de escribir (RETARDO_MS) antes de buscar;
+  Enter busca de una vez.
+- La búsqueda corre en segundo plano (util.tareas). Si se escribe otra cosa
+  antes de que termine, la anterior se cancela y su resultado se descarta.
+- Si el texto nuevo solo agrega letras al anterior ("cam" -> "cama") y el
+  resultado anterior estaba completo (menos de `limite` filas), se filtra ese
+  resultado en memoria sin volver a consultar.
+
+Los textos que son solo números se buscan como código exacto en todas las
+ventanas, así que esos no se refinan en memoria.
+
+    self.busqueda = BusquedaEnVivo(self.lineEdit_buscar, Catalogo.buscar_productos,
+                                   self.mostrar_productos, al_vaciar=self.cargar_todos,
+                                   coincide=lambda p, texto: coincide(p.nombre, texto))
+
+combo_con_busqueda() hace lo mismo sobre un QComboBox editable (clientes y
+productos en la ventana de ventas).
+"""
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QComboBox, QCompleter
+
+from util.busqueda import normalizar
+from util.tareas import ejecutar
+
+
+class BusquedaEnVivo(QObject):
+    """Búsqueda incremental sobre un campo de texto"""
+
+    RETARDO_MS = 250
+
+    def __init__(self, campo, buscar, mostrar, al_vaciar=None, al_fallar=None,
+                 coincide=None, limite=None, retardo_ms=RETARDO_MS):
+        """
+        Args:
+            campo: QLineEdit donde se escribe
+            buscar: buscar(texto) -> lista. Corre en segundo plano.
+            mostrar: Recibe la lista de resultados (en el hilo de la interfaz)
+            al_vaciar: Se llama cuando se borra el texto (p. ej. mostrar todo)
+            al_fallar: Recibe la excepción si la búsqueda falla
+            coincide: coincide(objeto, texto) -> bool, para refinar en memoria.
+                      Sin ella siempre se consulta.
+            limite: Filas máximas que retorna buscar. Un resultado con esa
+                    cantidad puede estar incompleto y no se refina.
+        """
+        super().__init__(campo)
+        self.campo = campo
+        self._buscar = buscar
+        self.mostrar = mostrar
+        self._al_vaciar = al_vaciar
+        self._al_fallar = al_fallar
+        self._coincide = coincide
+        self._limite = limite
+
+        self._tarea = None
+        self._pedido = None    # Texto de la última búsqueda pedida
+        self._anterior = None  # (texto, resultados, completo) de la última mostrada
+
+        self._temporizador = QTimer(self)
+        self._temporizador.setSingleShot(True)
+        self._temporizador.setInterval(retardo_ms)
+        self._temporizador.timeout.connect(self.buscar_ahora)
+
+        # textEdited (y no textChanged): solo lo que escribe el usuario
+        campo.textEdited.connect(lambda _texto: self._temporizador.start())
+        campo.returnPressed.connect(self.buscar_ahora)
+
+    def buscar_ahora(self):
+        """Busca el texto actual del campo sin esperar"""
+        self._temporizador.stop()
+        texto = self.campo.text().strip()
+        if texto == self._pedido:
+            return  # Ya se está buscando o ya se mostró
+
+        self._cancelar()
+        self._pedido = texto
+
+        if not texto:
+            self._anterior = None
+            if self._al_vaciar:
+                self._al_vaciar()
+            return
+
+        refinado = self._refinar(texto)
+        if refinado is not None:
+            self._recibir(texto, refinado)
+            return
+
+        self._tarea = ejecutar(self._buscar, texto,
+                               al_terminar=lambda resultados: self._recibir(texto, resultados),
+                               al_fallar=lambda e: self._fallo(texto, e))
+
+    def en_uso(self) -> bool:
+        """True si hay una búsqueda pedida o por pedir (el usuario está escribiendo)"""
+        return bool(self._pedido) or self._temporizador.isActive()
+
+    def reiniciar(self):
+        """Olvida el último resultado (p. ej. después de guardar o eliminar),
+        así la próxima búsqueda vuelve a consultar"""
+        self._temporizador.stop()
+        self._cancelar()
+        self._pedido = None
+        self._anterior = None
+
+    def _refinar(self, texto):
+        """Filtra en memoria el resultado anterior si el texto nuevo lo extiende;
+        None si hay que consultar"""
+        if self._coincide is None or self._anterior is None or texto.isdigit():
+            return None
+        anterior, resultados, completo = self._anterior
+        if not completo or anterior.isdigit() or not normalizar(texto).startswith(normalizar(anterior)):
+            return None
+        return [r for r in resultados if self._coincide(r, texto)]
+
+    def _recibir(self, texto, resultados):
+        if texto != self._pedido:
+            return  # Llegó tarde: ya se pidió otra búsqueda
+        self._tarea = None
+        completo = self._limite is None or len(resultados) < self._limite
+        self._anterior = (texto, resultados, completo)
+        self.mostrar(resultados)
+
+    def _fallo(self, texto, e):
+        if texto != self._pedido:
+            return
+        self._tarea = None
+        self._pedido = None  # Para poder reintentar con Enter
+        if self._al_fallar:
+            self._al_fallar(e)
+        else:
+            print(f"Error en la búsqueda: {e}")
+
+    def _cancelar(self):
+        if self._tarea is not None:
+            self._tarea.cancelar()
+            self._tarea = None
+
+
+def combo_con_busqueda(combo, buscar, texto_item, dato_item, al_mostrar=None,
+                       indicacion="", **opciones) -> BusquedaEnVivo:
+    """
+    Vuelve editable un QComboBox y le conecta una BusquedaEnVivo: lo que se
+    escribe reemplaza los ítems por las coincidencias y las muestra como
+    sugerencias. Elegir una sugerencia selecciona el ítem (currentIndexChanged).
+
+    El ítem 0 queda vacío con dato None ("ninguno seleccionado"); la
+    indicación se muestra en el campo mientras está vacío.
+
+    Args:
+        buscar: buscar(texto) -> lista de objetos (corre en segundo plano)
+        texto_item, dato_item: Texto y dato de cada ítem a partir del objeto
+        al_mostrar: Recibe los objetos antes de llenar el combo
+        opciones: al_fallar, coincide, limite, retardo_ms de BusquedaEnVivo
+
+    Returns:
+        La BusquedaEnVivo; su .mostrar(lista) llena el combo (sirve para la
+        carga inicial)
+    """
+    combo.setEditable(True)
+    combo.setInsertPolicy(QComboBox.NoInsert)
+    campo = combo.lineEdit()
+    campo.setPlaceholderText(indicacion)
+
+    sugerencias = QCompleter(combo.model(), combo)
+    sugerencias.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+    combo.setCompleter(sugerencias)
+    sugerencias.activated[str].connect(lambda texto: combo.setCurrentIndex(combo.findText(texto)))
+
+    def mostrar(objetos):
+        if al_mostrar:
+            al_mostrar(objetos)
+        elegido = combo.currentData()
+        escrito, cursor = campo.text(), campo.cursorPosition()
+        lo_escribio = escrito != combo.itemText(combo.currentIndex())
+
+        # Sin señales: cambiar los ítems no es elegir otro. Si el elegido sigue
+        # en la lista queda elegido; si no, se avisa que ya no hay elegido.
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem("", None)
+        for objeto in objetos:
+            combo.addItem(texto_item(objeto), dato_item(objeto))
+        indice = combo.findData(elegido) if elegido is not None else 0
+        combo.setCurrentIndex(max(indice, 0))
+        combo.blockSignals(False)
+        if indice < 0:
+            combo.currentIndexChanged.emit(0)
+
+        if lo_escribio:
+            campo.setText(escrito)
+            campo.setCursorPosition(cursor)
+            if objetos and campo.hasFocus():
+                sugerencias.complete()
+
+    return BusquedaEnVivo(campo, buscar, mostrar, **opciones)
@@ -7,17 +7,27 @@ Licencia: GPLv3
 
 import sys
 from PyQt5 import QtWidgets, uic
-from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QPushButton
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtWidgets import QMessageBox, QPushButton
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QColor
 
 from model.venta import Venta
 from view.detalle_venta import VentanaDetalleFactura
+from view.modelo_tabla import Columna, DelegadoBoton, ModeloTablaPaginado
+
+# Color del texto de la columna Estado
+COLORES_ESTADO = {
+    "Completada": QColor(0, 128, 0),     # Verde
+    "Cancelada": QColor(255, 0, 0),      # Rojo
+    "Pendiente": QColor(255, 165, 0),    # Naranja
+}
 
 
 class VentasWindow(QtWidgets.QMainWindow):
     """Ventana para consultar ventas recientes"""
 
+    TAMANO_PAGINA = 50
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -43,8 +53,6 @@ class VentasWindow(QtWidgets.QMainWindow):
         # Agregar botón de regreso
         self.crear_boton_regreso()
 
-        self.statusBar().showMessage(f"Cargadas {self.tableWidget_ventas.rowCount()} ventas recientes")
-
     def crear_interfaz_rapida(self):
         """Crea una interfaz rápida si no existe el archivo .ui"""
         self.setWindowTitle("Consultar Ventas - Sistema de Gestión")
@@ -79,37 +87,77 @@ class VentasWindow(QtWidgets.QMainWindow):
 
         layout_controles.addStretch()
 
+        # Filtros (los resuelve la BD)
+        self.combo_tipo = QtWidgets.QComboBox()
+        self.combo_tipo.addItem("Todos los tipos", None)
+        self.combo_tipo.addItem("Contado", "Contado")
+        self.combo_tipo.addItem("Crédito", "Credito")
+        layout_controles.addWidget(self.combo_tipo)
+
+        self.combo_estado = QtWidgets.QComboBox()
+        self.combo_estado.addItem("Todos los estados", None)
+        for estado in ("Completada", "Pendiente", "Cancelada"):
+            self.combo_estado.addItem(estado, estado)
+        layout_controles.addWidget(self.combo_estado)
+
+        self.input_cliente = QtWidgets.QLineEdit()
+        self.input_cliente.setPlaceholderText("Código cliente")
+        self.input_cliente.setMaximumWidth(120)
+        layout_controles.addWidget(self.input_cliente)
+
         layout.addWidget(frame_controles)
 
-        # Tabla de ventas
-        self.tableWidget_ventas = QtWidgets.QTableWidget()
-        layout.addWidget(self.tableWidget_ventas)
+        # Tabla de ventas (vista sobre un modelo: no crea un widget por celda)
+        self.tabla_ventas = QtWidgets.QTableView()
+        layout.addWidget(self.tabla_ventas)
 
         # Configurar tabla
         self.configurar_tabla()
 
     def configurar_tabla(self):
         """Configura la tabla de ventas"""
-        # Definir columnas
+        # Cada fila es una tupla (VentaData, nombre_cliente)
         columnas = [
-            "Código Venta", "Fecha", "Cliente", "Tipo",
-            "Total", "Estado", "Acciones"
+            Columna("Código Venta", lambda f: f[0].codigo_venta),
+            Columna("Fecha", lambda f: f[0].fecha,
+                    lambda fecha: fecha.strftime("%d/%m/%Y") if fecha else ""),
+            Columna("Cliente", lambda f: f"{f[0].codigo_cliente} - {f[1]}"),
+            Columna("Tipo", lambda f: f[0].tipo_venta),
+            Columna("Total", lambda f: f[0].total_neto,
+                    lambda total: f"${total:,.2f}" if total else "$0.00"),
+            Columna("Estado", lambda f: f[0].estado_venta,
+                    color=lambda f: COLORES_ESTADO.get(f[0].estado_venta)),
+            Columna("Acciones", lambda f: None, lambda _: ""),
         ]
-
-        self.tableWidget_ventas.setColumnCount(len(columnas))
-        self.tableWidget_ventas.setHorizontalHeaderLabels(columnas)
+        self.modelo_ventas = ModeloTablaPaginado(columnas, parent=self)
+        self.modelo_ventas.pagina_cargada.connect(
+            lambda total: self.statusBar().showMessage(f"✅ Se cargaron {total} ventas recientes")
+        )
+        self.modelo_ventas.error.connect(self._error_cargando_ventas)
+        self.tabla_ventas.setModel(self.modelo_ventas)
+
+        # Botón "Ver" dibujado por un delegado
+        self.delegado_ver = DelegadoBoton("👁️ Ver", self.tabla_ventas)
+        self.delegado_ver.presionado.connect(
+            lambda fila: self.ver_detalle_venta(self.modelo_ventas.fila(fila)[0].codigo_venta)
+        )
+        self.tabla_ventas.setItemDelegateForColumn(6, self.delegado_ver)
 
         # Ajustar anchos de columnas
-        self.tableWidget_ventas.setColumnWidth(0, 120)  # Código
-        self.tableWidget_ventas.setColumnWidth(1, 100)  # Fecha
-        self.tableWidget_ventas.setColumnWidth(2, 200)  # Cliente
-        self.tableWidget_ventas.setColumnWidth(3, 80)  # Tipo
-        self.tableWidget_ventas.setColumnWidth(4, 100)  # Total
-        self.tableWidget_ventas.setColumnWidth(5, 100)  # Estado
-        self.tableWidget_ventas.setColumnWidth(6, 100)  # Acciones
+        self.tabla_ventas.setColumnWidth(0, 120)  # Código
+        self.tabla_ventas.setColumnWidth(1, 100)  # Fecha
+        self.tabla_ventas.setColumnWidth(2, 200)  # Cliente
+        self.tabla_ventas.setColumnWidth(3, 80)  # Tipo
+        self.tabla_ventas.setColumnWidth(4, 100)  # Total
+        self.tabla_ventas.setColumnWidth(5, 100)  # Estado
+        self.tabla_ventas.setColumnWidth(6, 100)  # Acciones
+
+        self.tabla_ventas.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tabla_ventas.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
 
-        # Habilitar sorting
-        self.tableWidget_ventas.setSortingEnabled(True)
+        # Sin orden por encabezado: las ventas llegan por páginas ya ordenadas
+        # por fecha desde la BD y ordenar en la vista solo movería las cargadas
+        self.tabla_ventas.setSortingEnabled(False)
 
     def conectar_senales(self):
         """Conecta todas las señales de la interfaz"""
@@ -117,106 +165,53 @@ class VentasWindow(QtWidgets.QMainWindow):
             self.btn_cargar.clicked.connect(self.cargar_ventas_recientes)
         if hasattr(self, 'btn_limpiar'):
             self.btn_limpiar.clicked.connect(self.limpiar_tabla)
+        if hasattr(self, 'combo_tipo'):
+            self.combo_tipo.currentIndexChanged.connect(self.cargar_ventas_recientes)
+        if hasattr(self, 'combo_estado'):
+            self.combo_estado.currentIndexChanged.connect(self.cargar_ventas_recientes)
+        if hasattr(self, 'input_cliente'):
+            self.input_cliente.returnPressed.connect(self.cargar_ventas_recientes)
 
         # Si tienes otros botones en tu UI, conéctalos aquí
         # Por ejemplo:
         # self.pushButton_buscar.clicked.connect(self.buscar_ventas)
         # self.pushButton_exportar.clicked.connect(self.exportar_reporte)
 
-    def cargar_ventas_recientes(self):
-        """Carga las ventas más recientes en la tabla"""
-        try:
-            # Obtener todas las ventas
-            ventas = self.venta_controller.obtener_todos_como_objetos()
-
-            # Ordenar por fecha (más recientes primero) y tomar las últimas 50
-            ventas_ordenadas = sorted(
-                ventas,
-                key=lambda x: x.fecha if hasattr(x, 'fecha') and x.fecha else QDate.currentDate(),
-                reverse=True
-            )[:50]  # Últimas 50 ventas
-
-            self.mostrar_ventas_en_tabla(ventas_ordenadas)
+    def obtener_filtros(self) -> dict:
+        """Arma los filtros de la consulta con los controles de la ventana"""
+        filtros = {}
+        if hasattr(self, 'combo_tipo') and self.combo_tipo.currentData():
+            filtros['tipo_venta'] = self.combo_tipo.currentData()
+        if hasattr(self, 'combo_estado') and self.combo_estado.currentData():
+            filtros['estado_venta'] = self.combo_estado.currentData()
+        if hasattr(self, 'input_cliente') and self.input_cliente.text().strip().isdigit():
+            filtros['codigo_cliente'] = int(self.input_cliente.text().strip())
+        return filtros
+
+    def _traer_ventas(self, filtros, despues_de=None):
+        """Trae una página de ventas recientes. Retorna (ventas, clave de la siguiente)"""
+        ventas = self.venta_controller.obtener_recientes(
+            self.TAMANO_PAGINA, filtros, despues_de=despues_de
+        )
+        if len(ventas) < self.TAMANO_PAGINA:
+            return ventas, None
+        ultima = ventas[-1][0]
+        return ventas, (ultima.fecha, ultima.id_venta)
 
-            self.statusBar().showMessage(f"✅ Se cargaron {len(ventas_ordenadas)} ventas recientes")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar ventas:\n{e}")
-            self.statusBar().showMessage("❌ Error al cargar ventas")
-
-    def mostrar_ventas_en_tabla(self, ventas):
-        """Muestra las ventas en la tabla"""
-        self.tableWidget_ventas.setRowCount(0)
-
-        if not ventas:
-            self.tableWidget_ventas.setRowCount(1)
-            self.tableWidget_ventas.setItem(0, 0, QtWidgets.QTableWidgetItem("No hay ventas registradas"))
-            return
-
-        for i, venta in enumerate(ventas):
-            self.tableWidget_ventas.insertRow(i)
-
-            # Código de venta
-            self.tableWidget_ventas.setItem(i, 0, QtWidgets.QTableWidgetItem(
-                venta.codigo_venta if hasattr(venta, 'codigo_venta') else "N/A"
-            ))
-
-            # Fecha
-            fecha_str = ""
-            if hasattr(venta, 'fecha') and venta.fecha:
-                if isinstance(venta.fecha, str):
-                    fecha_str = venta.fecha
-                else:
-                    fecha_str = venta.fecha.strftime("%d/%m/%Y")
-            self.tableWidget_ventas.setItem(i, 1, QtWidgets.QTableWidgetItem(fecha_str))
-
-            # Cliente (solo ID por ahora)
-            cliente_str = str(venta.codigo_cliente) if hasattr(venta, 'codigo_cliente') else "N/A"
-            self.tableWidget_ventas.setItem(i, 2, QtWidgets.QTableWidgetItem(cliente_str))
-
-            # Tipo de venta
-            tipo_str = venta.tipo_venta if hasattr(venta, 'tipo_venta') else "N/A"
-            self.tableWidget_ventas.setItem(i, 3, QtWidgets.QTableWidgetItem(tipo_str))
-
-            # Total
-            total_str = f"${venta.total_neto:,.2f}" if hasattr(venta, 'total_neto') and venta.total_neto else "$0.00"
-            self.tableWidget_ventas.setItem(i, 4, QtWidgets.QTableWidgetItem(total_str))
-
-            # Estado
-            estado_str = venta.estado_venta if hasattr(venta, 'estado_venta') else "N/A"
-            estado_item = QtWidgets.QTableWidgetItem(estado_str)
-
-            # Color según estado
-            if estado_str == "Completada":
-                estado_item.setForeground(QColor(0, 128, 0))  # Verde
-            elif estado_str == "Cancelada":
-                estado_item.setForeground(QColor(255, 0, 0))  # Rojo
-            elif estado_str == "Pendiente":
-                estado_item.setForeground(QColor(255, 165, 0))  # Naranja
-
-            self.tableWidget_ventas.setItem(i, 5, estado_item)
-
-            # Botón de acciones
-            btn_ver = QPushButton("👁️ Ver")
-            btn_ver.setStyleSheet("""
-                QPushButton {
-                    background-color: #0078D7;
-                    color: white;
-                    border: none;
-                    border-radius: 3px;
-                    padding: 5px 10px;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #005A9E;
-                }
-            """)
-            btn_ver.clicked.connect(lambda checked, codigo=venta.codigo_venta: self.ver_detalle_venta(codigo))
-
-            self.tableWidget_ventas.setCellWidget(i, 6, btn_ver)
-
-            # Guardar objeto venta para referencia
-            self.tableWidget_ventas.item(i, 0).setData(Qt.UserRole, venta)
+    def cargar_ventas_recientes(self):
+        """Carga las ventas más recientes en la tabla; las más antiguas se
+        traen por páginas cuando se baja hasta el final"""
+        # Los filtros se leen aquí: la carga corre en otro hilo
+        filtros = self.obtener_filtros()
+        self.statusBar().showMessage("Cargando ventas...")
+        self.modelo_ventas.reiniciar(
+            lambda despues_de: self._traer_ventas(filtros, despues_de)
+        )
+
+    def _error_cargando_ventas(self, e):
+        """Informa un error al cargar las ventas"""
+        QMessageBox.critical(self, "Error", f"Error al cargar ventas:\n{e}")
+        self.statusBar().showMessage("❌ Error al cargar ventas")
 
     def ver_detalle_venta(self, codigo_venta):
         """Abre la ventana de detalle de la venta seleccionada"""
@@ -229,7 +224,7 @@ class VentasWindow(QtWidgets.QMainWindow):
 
     def limpiar_tabla(self):
         """Limpia la tabla de ventas"""
-        self.tableWidget_ventas.setRowCount(0)
+        self.modelo_ventas.establecer([])
         self.statusBar().showMessage("Tabla limpiada")
 
     def buscar_ventas(self):
@@ -277,6 +272,11 @@ class VentasWindow(QtWidgets.QMainWindow):
         self.statusBar().showMessage("Vista actualizada correctamente")
 
 
+    def closeEvent(self, event):
+        """Al cerrar, la página de ventas que esté cargando ya no se va a mostrar"""
+        self.modelo_ventas.cancelar_carga()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     # Para pruebas
     app = QtWidgets.QApplication(sys.argv)
@@ -10,6 +10,10 @@ from PyQt5 import QtWidgets, uic
 from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QPushButton
 from PyQt5.QtCore import Qt
 from model.cliente import Cliente, ClienteData
+from view.paginacion import conectar_carga_perezosa
+from view.busqueda_en_vivo import BusquedaEnVivo
+from util.busqueda import coincide
+from util.tareas import ejecutar
 
 
 class CrudClientesWindow(QtWidgets.QMainWindow):
@@ -17,6 +21,8 @@ class CrudClientesWindow(QtWidgets.QMainWindow):
     Ventana CRUD completa para gestionar clientes
     """
 
+    TAMANO_PAGINA = 200
+
     def __init__(self, parent=None):  # ← CAMBIO 1: Agregar parent
         super().__init__()
 
@@ -40,6 +46,8 @@ class CrudClientesWindow(QtWidgets.QMainWindow):
         # Variables de estado
         self.modo_actual = "visualizacion"
         self.cliente_seleccionado = None
+        self._clave_siguiente = None  # Clave de la siguiente página (None = no hay más)
+        self._tarea_pagina = None     # Página que se está trayendo en segundo plano
 
         # Conectar señales
         self.conectar_senales()
@@ -60,11 +68,18 @@ class CrudClientesWindow(QtWidgets.QMainWindow):
 
     def conectar_senales(self):
         """Conecta todos los eventos de la interfaz"""
+        # Búsqueda mientras se escribe (en segundo plano, ver view/busqueda_en_vivo.py)
+        self.busqueda = BusquedaEnVivo(
+            self.lineEdit_buscar, self.consultar_clientes, self._resultados_busqueda,
+            al_vaciar=self.cargar_todos_clientes, al_fallar=self._error_buscando,
+            coincide=lambda cliente, texto: coincide(cliente.nombre, texto),
+            limite=self.TAMANO_PAGINA
+        )
+
         # Botones de búsqueda y lista
         self.pushButton_buscar.clicked.connect(self.buscar_clientes)
         self.pushButton_refrescar.clicked.connect(self.actualizar_vista)  # ← CAMBIO 4
         self.pushButton_nuevo.clicked.connect(self.modo_nuevo_cliente)
-        self.lineEdit_buscar.returnPressed.connect(self.buscar_clientes)
 
         # Botones de acción
         self.pushButton_guardar.clicked.connect(self.guardar_cliente)
@@ -74,6 +89,7 @@ class CrudClientesWindow(QtWidgets.QMainWindow):
 
         # Tabla
         self.tableWidget_clientes.itemSelectionChanged.connect(self.cliente_seleccionado_cambio)
+        conectar_carga_perezosa(self.tableWidget_clientes, self.cargar_mas_clientes)
 
     def configurar_tabla(self):
         """Configura las propiedades de la tabla"""
@@ -85,42 +101,99 @@ class CrudClientesWindow(QtWidgets.QMainWindow):
         self.tableWidget_clientes.setSortingEnabled(True)
 
     def cargar_todos_clientes(self):
-        """Carga todos los clientes en la tabla"""
-        try:
-            clientes = self.cliente_controller.obtener_todos_como_objetos()
-            self.llenar_tabla(clientes)
-            self.statusBar().showMessage(f"Se cargaron {len(clientes)} clientes.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar clientes:\n{e}")
-            self.statusBar().showMessage("Error al cargar clientes.")
+        """Carga la primera página de clientes en la tabla;
+        el resto se trae a medida que se baja por la tabla.
+        Las consultas corren en segundo plano."""
+        self.busqueda.reiniciar()
+        self._cancelar_pagina()
+        self._clave_siguiente = None
+        self.statusBar().showMessage("Cargando clientes...")
+        self._tarea_pagina = ejecutar(self._traer_pagina, None,
+                                      al_terminar=self._primera_pagina,
+                                      al_fallar=self._error_cargando,
+                                      ventana=self)
+
+    def cargar_mas_clientes(self):
+        """Agrega la siguiente página de clientes al final de la tabla"""
+        if self._clave_siguiente is None or self._tarea_pagina is not None:
+            return  # No hay más, o la página ya se está trayendo
+
+        self._tarea_pagina = ejecutar(self._traer_pagina, self._clave_siguiente,
+                                      al_terminar=self._pagina_siguiente,
+                                      al_fallar=self._error_cargando_mas,
+                                      ventana=self)
+
+    def _traer_pagina(self, despues_de):
+        """Una página de clientes ordenada por nombre: (clientes, siguiente clave)"""
+        filas, siguiente = self.cliente_controller.obtener_pagina(
+            limite=self.TAMANO_PAGINA, ordenar_por='nombre', despues_de=despues_de
+        )
+        return [ClienteData(*f) for f in filas], siguiente
+
+    def _primera_pagina(self, pagina):
+        """Muestra la primera página que trajo cargar_todos_clientes"""
+        clientes, self._clave_siguiente = pagina
+        self._tarea_pagina = None
+        self.llenar_tabla(clientes)
+        self.statusBar().showMessage(f"Se cargaron {len(clientes)} clientes.")
+
+    def _pagina_siguiente(self, pagina):
+        """Agrega la página que trajo cargar_mas_clientes"""
+        clientes, self._clave_siguiente = pagina
+        self._tarea_pagina = None
+        self.llenar_tabla(clientes, agregar=True)
+
+    def _error_cargando(self, e):
+        """Informa un error al cargar la primera página"""
+        self._tarea_pagina = None
+        QMessageBox.critical(self, "Error", f"Error al cargar clientes:\n{e}")
+        self.statusBar().showMessage("Error al cargar clientes.")
+
+    def _error_cargando_mas(self, e):
+        """Informa un error al traer una página más (no se piden más)"""
+        self._tarea_pagina = None
+        self._clave_siguiente = None
+        self.statusBar().showMessage(f"Error al cargar más clientes: {e}")
+
+    def _cancelar_pagina(self):
+        """Descarta la página que se esté trayendo (la tabla va a cambiar)"""
+        if self._tarea_pagina is not None:
+            self._tarea_pagina.cancelar()
+            self._tarea_pagina = None
 
     def buscar_clientes(self):
-        """Busca clientes según el texto ingresado"""
-        texto_busqueda = self.lineEdit_buscar.text().strip()
-
-        if not texto_busqueda:
-            self.cargar_todos_clientes()
-            return
-
-        try:
-            if texto_busqueda.isdigit():
-                cliente = self.cliente_controller.obtener_por_id(int(texto_busqueda))
-                clientes = [cliente] if cliente else []
-                if clientes and not isinstance(clientes[0], ClienteData):
-                    clientes = [ClienteData(*clientes[0])]
-            else:
-                clientes = self.cliente_controller.buscar_por_nombre(texto_busqueda)
-
-            self.llenar_tabla(clientes)
-            self.statusBar().showMessage(f"Se encontraron {len(clientes)} clientes.")
-
-        except Exception as e:
-            QMessageBox.warning(self, "Error de Búsqueda", f"Error al buscar:\n{e}")
-            self.statusBar().showMessage("Error en la búsqueda.")
-
-    def llenar_tabla(self, clientes):
-        """Llena la tabla con los clientes proporcionados"""
-        self.tableWidget_clientes.setRowCount(0)
+        """Busca de nuevo el texto ingresado (botón Buscar), aunque no haya cambiado"""
+        self.busqueda.reiniciar()
+        self.busqueda.buscar_ahora()
+
+    def consultar_clientes(self, texto):
+        """Clientes con ese código, o la primera página de los que tienen ese
+        nombre. Corre en segundo plano."""
+        if texto.isdigit():
+            cliente = self.cliente_controller.obtener_objeto(int(texto))
+            return [cliente] if cliente else []
+        return self.cliente_controller.buscar_por_nombre(texto, self.TAMANO_PAGINA)
+
+    def _resultados_busqueda(self, clientes):
+        """Muestra lo que encontró la búsqueda"""
+        self._cancelar_pagina()
+        self._clave_siguiente = None
+        self.llenar_tabla(clientes)
+        self.statusBar().showMessage(f"Se encontraron {len(clientes)} clientes.")
+
+    def _error_buscando(self, e):
+        """Informa un error en la búsqueda"""
+        QMessageBox.warning(self, "Error de Búsqueda", f"Error al buscar:\n{e}")
+        self.statusBar().showMessage("Error en la búsqueda.")
+
+    def llenar_tabla(self, clientes, agregar=False):
+        """Llena la tabla con los clientes proporcionados.
+        Con agregar=True se añaden al final sin borrar los que ya están."""
+        if not agregar:
+            self.tableWidget_clientes.setRowCount(0)
+
+        # Ordenar mientras se insertan filas las revuelve y es lento
+        self.tableWidget_clientes.setSortingEnabled(False)
 
         for cliente in clientes:
             if isinstance(cliente, tuple):
@@ -137,7 +210,10 @@ class CrudClientesWindow(QtWidgets.QMainWindow):
 
             self.tableWidget_clientes.item(fila, 0).setData(Qt.UserRole, cliente)
 
-        self.label_total.setText(f"Total: {len(clientes)} clientes")
+        self.tableWidget_clientes.setSortingEnabled(True)
+        total = self.tableWidget_clientes.rowCount()
+        mas = "+" if self._clave_siguiente is not None else ""
+        self.label_total.setText(f"Total: {total}{mas} clientes")
 
     def cliente_seleccionado_cambio(self):
         """Se ejecuta cuando se selecciona un cliente en la tabla"""
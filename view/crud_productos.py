@@ -7,13 +7,17 @@ Licencia: GPLv3
 
 import sys
 from PyQt5 import QtWidgets, uic
-from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem
 from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QMessageBox
 from decimal import Decimal
 from model.producto import Producto, ProductoData
 from model.categoria import Categoria, CategoriaData
-from model.usuario import Usuario  # ← CAMBIADO: Cliente por Usuario
+from model.catalogo import Catalogo
 from util import sesion
+from view.modelo_tabla import Columna, ModeloTablaPaginado
+from util.tareas import ejecutar, cancelar_tareas
+from util.busqueda import coincide
+from view.busqueda_en_vivo import BusquedaEnVivo
 
 
 class CRUDProductosWindow(QtWidgets.QMainWindow):
@@ -21,6 +25,8 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
     Ventana CRUD completa para gestionar productos
     """
 
+    TAMANO_PAGINA = 200
+
     def __init__(self):
         super().__init__()
 
@@ -35,7 +41,6 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
         try:
             self.producto_controller = Producto()
             self.categoria_controller = Categoria()
-            self.usuario_controller = Usuario()
         except Exception as e:
             QMessageBox.critical(self, "Error de Base de Datos",
                                  f"No se pudo conectar a la base de datos.\nError: {e}")
@@ -45,14 +50,15 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
         self.modo_actual = "visualizacion"
         self.producto_seleccionado = None
         self.categorias = []  # Lista de categorías disponibles
+        self._categorias_tabla = {}  # codigo_categoria -> CategoriaData de las filas de la tabla
         self.es_solo_lectura = False  # ← AÑADIR: Control de permisos
 
+        # Configurar tabla (antes de las señales: la selección es del modelo)
+        self.configurar_tabla()
+
         # Conectar señales
         self.conectar_senales()
 
-        # Configurar tabla
-        self.configurar_tabla()
-
         # Verificar permisos del usuario
         self.verificar_permisos()
 
@@ -69,11 +75,17 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
 
     def conectar_senales(self):
         """Conecta todos los eventos de la interfaz"""
+        # Búsqueda mientras se escribe (en segundo plano, ver view/busqueda_en_vivo.py)
+        self.busqueda = BusquedaEnVivo(
+            self.lineEdit_buscar, self.consultar_productos, self._resultados_busqueda,
+            al_vaciar=self.cargar_todos_productos, al_fallar=self._error_buscando,
+            coincide=lambda producto, texto: coincide(producto.nombre, texto)
+        )
+
         # Botones de búsqueda y lista
         self.pushButton_buscar.clicked.connect(self.buscar_productos)
         self.pushButton_refrescar.clicked.connect(self.cargar_todos_productos)
         self.pushButton_nuevo.clicked.connect(self.modo_nuevo_producto)
-        self.lineEdit_buscar.returnPressed.connect(self.buscar_productos)
 
         # Filtros
         self.pushButton_aplicar_filtros.clicked.connect(self.aplicar_filtros)
@@ -93,19 +105,45 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
         self.comboBox_categoria.currentIndexChanged.connect(self.actualizar_resumen)
 
         # Tabla
-        self.tableWidget_productos.itemSelectionChanged.connect(self.producto_seleccionado_cambio)
+        self.tableView_productos.selectionModel().selectionChanged.connect(self.producto_seleccionado_cambio)
+        self.modelo_productos.pagina_cargada.connect(self.actualizar_total)
 
     def configurar_tabla(self):
         """Configura las propiedades de la tabla"""
-        self.tableWidget_productos.setColumnWidth(0, 80)   # Código
-        self.tableWidget_productos.setColumnWidth(1, 200)  # Nombre
-        self.tableWidget_productos.setColumnWidth(2, 130)  # Valor Adquisición
-        self.tableWidget_productos.setColumnWidth(3, 130)  # Valor Venta
-        self.tableWidget_productos.setColumnWidth(4, 100)  # Ganancia
-        self.tableWidget_productos.setColumnWidth(5, 80)   # Cantidad ← AÑADIDO
-        self.tableWidget_productos.setColumnWidth(6, 100)  # Categoría
-
-        self.tableWidget_productos.setSortingEnabled(True)
+        columnas = [
+            Columna("Código", lambda p: p.codigo),
+            Columna("Nombre", lambda p: p.nombre),
+            Columna("Valor Adquisición", lambda p: p.valor_adquisicion, lambda v: f"${v:,.2f}"),
+            Columna("Valor Venta", lambda p: p.valor_venta,
+                    lambda v: f"${v:,.2f}" if v else "N/A"),
+            # Se muestra la ganancia NETA (después de pagar IVA)
+            Columna("Ganancia Neta", self.calcular_ganancia_neta,
+                    lambda g: f"${g[0]:,.2f} ({g[1]:.1f}%)"),
+            Columna("Cantidad", lambda p: p.cantidad),
+            Columna("Categoría", self.nombre_categoria),
+        ]
+        # Los productos ya están en memoria (catálogo): los tramos se sacan sin hilo aparte
+        self.modelo_productos = ModeloTablaPaginado(columnas, en_segundo_plano=False, parent=self)
+        self.tableView_productos.setModel(self.modelo_productos)
+
+        self.tableView_productos.setColumnWidth(0, 80)   # Código
+        self.tableView_productos.setColumnWidth(1, 200)  # Nombre
+        self.tableView_productos.setColumnWidth(2, 130)  # Valor Adquisición
+        self.tableView_productos.setColumnWidth(3, 130)  # Valor Venta
+        self.tableView_productos.setColumnWidth(4, 100)  # Ganancia
+        self.tableView_productos.setColumnWidth(5, 80)   # Cantidad ← AÑADIDO
+        self.tableView_productos.setColumnWidth(6, 100)  # Categoría
+
+        # El orden del encabezado se aplica a toda la lista (está en memoria)
+        # antes de partirla en tramos; setSortingEnabled solo ordenaría los
+        # tramos ya mostrados
+        encabezado = self.tableView_productos.horizontalHeader()
+        encabezado.setSectionsClickable(True)
+        encabezado.setSortIndicatorShown(True)
+        encabezado.setSortIndicator(-1, Qt.AscendingOrder)
+        encabezado.sortIndicatorChanged.connect(
+            lambda _columna, _orden: self._mostrar_productos(self._productos_mostrados))
+        self._productos_mostrados = []
 
     def verificar_permisos(self):
         """
@@ -122,41 +160,20 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
             self.close()
             return
 
-        # Obtener ID del usuario
-        usuario_id = sesion.get_usuario_id()
-
-        try:
-            # Obtener datos del usuario ← CAMBIADO: Cliente por Usuario
-            usuario = self.usuario_controller.obtener_por_id(usuario_id)
-
-            if not usuario:
-                QMessageBox.warning(self, "Error", "Usuario no encontrado en el sistema.")
-                self.close()
-                return
-
-            # Convertir tupla a objeto si es necesario
-            if isinstance(usuario, tuple):
-                # Asumiendo el orden: id_usuario, nombre_usuario, email, contrasena, id_rol
-                id_rol = usuario[4] if len(usuario) > 4 else None
-            else:
-                id_rol = usuario.id_rol
-
-            # Verificar el rol
-            if id_rol == 3:
-                # Usuario Esporádico - SOLO LECTURA
-                self.es_solo_lectura = True
-                self.aplicar_modo_solo_lectura()
-                self.statusBar().showMessage(
-                    "⚠️ Modo Solo Lectura: Usuario Esporádico no puede editar productos"
-                )
-            else:
-                # Roles 1 (Admin) o 2 (Paramétrico) - PERMISOS COMPLETOS
-                self.es_solo_lectura = False
-                self.statusBar().showMessage("✅ Permisos completos habilitados")
+        # Permisos del contexto de la sesión (cargado al iniciar sesión)
+        contexto = sesion.get_contexto()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al verificar permisos:\n{e}")
-            print(f"Error en verificar_permisos: {e}")
+        if not contexto.puede('editar_productos'):
+            # Usuario Esporádico - SOLO LECTURA
+            self.es_solo_lectura = True
+            self.aplicar_modo_solo_lectura()
+            self.statusBar().showMessage(
+                "⚠️ Modo Solo Lectura: Usuario Esporádico no puede editar productos"
+            )
+        else:
+            # Roles 1 (Admin) o 2 (Paramétrico) - PERMISOS COMPLETOS
+            self.es_solo_lectura = False
+            self.statusBar().showMessage("✅ Permisos completos habilitados")
 
     def aplicar_modo_solo_lectura(self):
         """
@@ -180,7 +197,7 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
     def cargar_categorias(self):
         """Carga las categorías desde la base de datos"""
         try:
-            self.categorias = self.categoria_controller.obtener_todos_como_objetos()
+            self.categorias = Catalogo.categorias()
 
             # Limpiar ComboBoxes
             self.comboBox_categoria.clear()
@@ -210,49 +227,77 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
                               "Asegúrese de tener categorías creadas en la base de datos.")
 
     def cargar_todos_productos(self):
-        """Carga todos los productos en la tabla"""
-        try:
-            productos = self.producto_controller.obtener_todos_como_objetos()
-            self.llenar_tabla(productos)
-            self.statusBar().showMessage(f"Se cargaron {len(productos)} productos.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar productos:\n{e}")
-            self.statusBar().showMessage("Error al cargar productos.")
+        """Muestra los productos del catálogo; la tabla se llena por tramos
+        a medida que se baja por ella. Si el catálogo se tiene que (re)cargar,
+        la consulta corre en segundo plano."""
+        self.busqueda.reiniciar()
+        self.statusBar().showMessage("Cargando productos...")
+        ejecutar(Catalogo.productos,
+                 al_terminar=self._productos_cargados,
+                 al_fallar=self._error_cargando_productos,
+                 ventana=self)
+
+    def _productos_cargados(self, productos):
+        """Muestra los productos que trajo cargar_todos_productos"""
+        self._mostrar_productos(productos)
+        self.statusBar().showMessage(f"Se cargaron {len(productos)} productos.")
+
+    def _error_cargando_productos(self, e):
+        """Informa un error al cargar los productos"""
+        QMessageBox.critical(self, "Error", f"Error al cargar productos:\n{e}")
+        self.statusBar().showMessage("Error al cargar productos.")
+
+    def _mostrar_productos(self, productos):
+        """Reemplaza el contenido de la tabla por `productos`; la tabla
+        pide el siguiente tramo a medida que se baja por ella"""
+        self._tomar_categorias()
+        self._productos_mostrados = productos
+
+        encabezado = self.tableView_productos.horizontalHeader()
+        columna = encabezado.sortIndicatorSection()
+        if 0 <= columna < self.modelo_productos.columnCount():
+            productos = sorted(productos, key=self.modelo_productos.clave_orden(columna),
+                               reverse=encabezado.sortIndicatorOrder() == Qt.DescendingOrder)
+
+        def cargar_tramo(inicio):
+            inicio = inicio or 0
+            fin = inicio + self.TAMANO_PAGINA
+            return productos[inicio:fin], (fin if fin < len(productos) else None)
+
+        self.modelo_productos.reiniciar(cargar_tramo)
 
     def buscar_productos(self):
-        """Busca productos según el texto ingresado"""
-        texto_busqueda = self.lineEdit_buscar.text().strip()
-
-        if not texto_busqueda:
-            self.cargar_todos_productos()
-            return
-
-        try:
-            if texto_busqueda.isdigit():
-                # Buscar por código
-                producto = self.producto_controller.obtener_por_id(int(texto_busqueda))
-                productos = [producto] if producto else []
-                if productos and not isinstance(productos[0], ProductoData):
-                    productos = [ProductoData(*productos[0])]
-            else:
-                # Buscar por nombre
-                productos = self.producto_controller.buscar_por_nombre(texto_busqueda)
-
-            self.llenar_tabla(productos)
-            self.statusBar().showMessage(f"Se encontraron {len(productos)} productos.")
-
-        except Exception as e:
-            QMessageBox.warning(self, "Error de Búsqueda", f"Error al buscar:\n{e}")
+        """Busca de nuevo el texto ingresado (botón Buscar), aunque no haya cambiado"""
+        self.busqueda.reiniciar()
+        self.busqueda.buscar_ahora()
+
+    @staticmethod
+    def consultar_productos(texto):
+        """Producto con ese código o productos con ese nombre (índice de texto
+        del catálogo). Corre en segundo plano: puede tener que cargar el catálogo."""
+        if texto.isdigit():
+            producto = Catalogo.producto(int(texto))
+            return [producto] if producto else []
+        return Catalogo.buscar_productos(texto)
+
+    def _resultados_busqueda(self, productos):
+        """Muestra lo que encontró la búsqueda, por tramos como el listado"""
+        self._mostrar_productos(productos)
+        self.statusBar().showMessage(f"Se encontraron {len(productos)} productos.")
+
+    def _error_buscando(self, e):
+        """Informa un error en la búsqueda"""
+        QMessageBox.warning(self, "Error de Búsqueda", f"Error al buscar:\n{e}")
 
     def aplicar_filtros(self):
         """Aplica los filtros de categoría y precio"""
         try:
-            productos = self.producto_controller.obtener_todos_como_objetos()
-
-            # Filtro por categoría
+            # Filtro por categoría (índice del catálogo)
             categoria_id = self.comboBox_filtro_categoria.currentData()
             if categoria_id is not None:
-                productos = [p for p in productos if p.codigo_categoria == categoria_id]
+                productos = Catalogo.productos_por_categoria(categoria_id)
+            else:
+                productos = Catalogo.productos()
 
             # Filtro por rango de precio
             precio_min_text = self.lineEdit_precio_min.text().strip()
@@ -265,7 +310,7 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
                 productos = [p for p in productos
                            if p.valor_venta and precio_min <= float(p.valor_venta) <= precio_max]
 
-            self.llenar_tabla(productos)
+            self._mostrar_productos(productos)
             self.statusBar().showMessage(f"Filtros aplicados: {len(productos)} productos.")
 
         except ValueError:
@@ -281,89 +326,63 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
         self.comboBox_filtro_categoria.setCurrentIndex(0)
         self.cargar_todos_productos()
 
-    def llenar_tabla(self, productos):
-        """Llena la tabla con los productos proporcionados"""
-        self.tableWidget_productos.setRowCount(0)
-
-        for producto in productos:
-            if isinstance(producto, tuple):
-                producto = ProductoData(*producto)
+    def _tomar_categorias(self):
+        """Guarda las categorías al llenar la tabla. Las columnas de categoría y
+        ganancia se calculan en cada repintado: leen este dict y no el catálogo
+        (que toma su lock y puede ir a la BD en el hilo de la interfaz)."""
+        self._categorias_tabla = {c.codigo_categoria: c for c in Catalogo.categorias()}
 
-            fila = self.tableWidget_productos.rowCount()
-            self.tableWidget_productos.insertRow(fila)
-
-            # Obtener categoría para calcular IVA
-            categoria_producto = None
-            for cat in self.categorias:
-                if cat.codigo_categoria == producto.codigo_categoria:
-                    categoria_producto = cat
-                    break
-
-            iva_decimal = float(categoria_producto.iva) if categoria_producto else 0
-
-            # Calcular ganancia NETA (considerando IVA)
-            ganancia_bruta = 0
-            ganancia_neta = 0
-            porcentaje_ganancia_bruta = 0
-            porcentaje_ganancia_neta = 0
-
-            if producto.valor_venta and producto.valor_adquisicion:
-                # Ganancia bruta
-                ganancia_bruta = float(producto.valor_venta) - float(producto.valor_adquisicion)
+    def llenar_tabla(self, productos):
+        """Llena la tabla con los productos proporcionados (sin más páginas)"""
+        self._tomar_categorias()
+        self.modelo_productos.establecer(
+            ProductoData(*p) if isinstance(p, tuple) else p for p in productos)
+
+    def actualizar_total(self, total):
+        """Muestra cuántos productos hay en la tabla ("+" si quedan tramos)"""
+        mas = "+" if self.modelo_productos.hay_mas else ""
+        self.label_total.setText(f"Total: {total}{mas} productos")
+
+    def calcular_ganancia_neta(self, producto):
+        """Ganancia neta del producto (considerando IVA) y su porcentaje
+        sobre el valor de adquisición"""
+        # Categoría para calcular el IVA (la que se tomó al llenar la tabla)
+        categoria_producto = self._categorias_tabla.get(producto.codigo_categoria)
+        iva_decimal = float(categoria_producto.iva) if categoria_producto else 0
+
+        ganancia_neta = 0
+        porcentaje_ganancia_neta = 0
+
+        if producto.valor_venta and producto.valor_adquisicion:
+            # Ganancia bruta
+            ganancia_bruta = float(producto.valor_venta) - float(producto.valor_adquisicion)
+
+            # Calcular IVA a pagar
+            base_imponible = float(producto.valor_venta) / (1 + iva_decimal) if iva_decimal > 0 else float(
+                producto.valor_venta)
+            iva_a_pagar = base_imponible * iva_decimal
 
-                # Calcular IVA a pagar
-                base_imponible = float(producto.valor_venta) / (1 + iva_decimal) if iva_decimal > 0 else float(
-                    producto.valor_venta)
-                iva_a_pagar = base_imponible * iva_decimal
+            # Ganancia neta (después de pagar IVA)
+            ganancia_neta = ganancia_bruta - iva_a_pagar
 
-                # Ganancia neta (después de pagar IVA)
-                ganancia_neta = ganancia_bruta - iva_a_pagar
+            if producto.valor_adquisicion > 0:
+                porcentaje_ganancia_neta = (ganancia_neta / float(producto.valor_adquisicion)) * 100
 
-                # Porcentajes
-                if producto.valor_adquisicion > 0:
-                    porcentaje_ganancia_bruta = (ganancia_bruta / float(producto.valor_adquisicion)) * 100
-                    porcentaje_ganancia_neta = (ganancia_neta / float(producto.valor_adquisicion)) * 100
+        return ganancia_neta, porcentaje_ganancia_neta
 
-            # Obtener nombre de categoría
-            nombre_categoria = str(producto.codigo_categoria)
-            for cat in self.categorias:
-                if cat.codigo_categoria == producto.codigo_categoria:
-                    nombre_categoria = cat.nombre
-                    break
-
-            # Agregar datos - MOSTRAR GANANCIA NETA
-            self.tableWidget_productos.setItem(fila, 0, QTableWidgetItem(str(producto.codigo)))
-            self.tableWidget_productos.setItem(fila, 1, QTableWidgetItem(producto.nombre))
-            self.tableWidget_productos.setItem(fila, 2,
-                                               QTableWidgetItem(f"${producto.valor_adquisicion:,.2f}"))
-            self.tableWidget_productos.setItem(fila, 3,
-                                               QTableWidgetItem(
-                                                   f"${producto.valor_venta:,.2f}" if producto.valor_venta else "N/A"))
-            # MOSTRAR GANANCIA NETA EN LUGAR DE BRUTA
-            self.tableWidget_productos.setItem(fila, 4,
-                                               QTableWidgetItem(
-                                                   f"${ganancia_neta:,.2f} ({porcentaje_ganancia_neta:.1f}%)"))
-            # ← AÑADIR COLUMNA DE CANTIDAD
-            self.tableWidget_productos.setItem(fila, 5,
-                                               QTableWidgetItem(str(producto.cantidad)))
-            self.tableWidget_productos.setItem(fila, 6,
-                                               QTableWidgetItem(nombre_categoria))
-
-            # Guardar objeto completo
-            self.tableWidget_productos.item(fila, 0).setData(Qt.UserRole, producto)
-
-        self.label_total.setText(f"Total: {len(productos)} productos")
+    def nombre_categoria(self, producto):
+        """Nombre de la categoría del producto (o su código si no está en el catálogo)"""
+        categoria_producto = self._categorias_tabla.get(producto.codigo_categoria)
+        return categoria_producto.nombre if categoria_producto else str(producto.codigo_categoria)
 
     def producto_seleccionado_cambio(self):
         """Se ejecuta cuando se selecciona un producto en la tabla"""
-        seleccion = self.tableWidget_productos.selectedItems()
+        seleccion = self.tableView_productos.selectionModel().selectedRows()
 
         if not seleccion:
             return
 
-        fila = self.tableWidget_productos.currentRow()
-        item = self.tableWidget_productos.item(fila, 0)
-        self.producto_seleccionado = item.data(Qt.UserRole)
+        self.producto_seleccionado = self.modelo_productos.fila(seleccion[0].row())
 
         self.mostrar_detalles_producto(self.producto_seleccionado)
         self.cambiar_modo("visualizacion")
@@ -470,10 +489,7 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
         if categoria_id is None:
             return None
 
-        for cat in self.categorias:
-            if cat.codigo_categoria == categoria_id:
-                return cat
-        return None
+        return Catalogo.categoria(categoria_id)
 
     def calcular_precio_venta(self):
         """Calcula el precio de venta basado en el valor de adquisición, IVA y utilidad"""
@@ -697,6 +713,12 @@ class CRUDProductosWindow(QtWidgets.QMainWindow):
         self.statusBar().showMessage("Operación cancelada.")
 
 
+    def closeEvent(self, event):
+        """Al cerrar, lo que esté cargando o buscando ya no se va a mostrar"""
+        cancelar_tareas(self)
+        self.busqueda.reiniciar()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
     window = CRUDProductosWindow()
@@ -1,12 +1,10 @@
 from PyQt5 import uic
 from PyQt5.QtWidgets import QWidget, QMessageBox, QTableWidgetItem, QPushButton
-from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QFont, QColor
 
 from report.report import generar_factura_pdf
 from model.venta import Venta
-from model.cliente import Cliente
-from model.detalle_venta_producto import DetalleVentaProducto
+from util.tareas import ejecutar, cancelar_tareas
 import os
 
 
@@ -25,8 +23,6 @@ class VentanaDetalleFactura(QWidget):
 
         # Inicializar modelos
         self.modelo_venta = Venta()
-        self.modelo_cliente = Cliente()
-        self.modelo_detalle = DetalleVentaProducto()
 
         # Cache de datos
         self.datos_venta = None
@@ -49,30 +45,24 @@ class VentanaDetalleFactura(QWidget):
 
     def cargar_datos(self):
         """Inicia la carga de datos de la factura"""
+        self._mostrar_estado("Cargando datos de la factura...")
+        # Una sola consulta para toda la factura, fuera del hilo de la interfaz
+        ejecutar(self.modelo_venta.obtener_factura, self.codigo_venta,
+                 al_terminar=self._procesar_carga_datos,
+                 al_fallar=lambda e: self._mostrar_error(str(e)),
+                 ventana=self)
+
+    def _procesar_carga_datos(self, factura):
+        """Muestra la factura que trajo cargar_datos"""
         try:
-            self._mostrar_estado("Cargando datos de la factura...")
-            QTimer.singleShot(50, self._procesar_carga_datos)
-
-        except Exception as e:
-            self._mostrar_error(f"Error al iniciar carga: {str(e)}")
-
-    def _procesar_carga_datos(self):
-        """Procesa la carga de datos en secuencia"""
-        try:
-            # 1. Obtener datos de la venta por código
-            self.datos_venta = self._obtener_venta_por_codigo()
-            if not self.datos_venta:
+            if not factura:
                 raise Exception(f"No se encontró la venta con código: {self.codigo_venta}")
 
-            # 2. Obtener datos del cliente
-            self.datos_cliente = self._obtener_datos_cliente()
-            if not self.datos_cliente:
-                raise Exception("No se encontró el cliente asociado a esta venta")
-
-            # 3. Obtener detalles completos de la venta
-            self.detalles_completos = self._obtener_detalles_completos()
+            self.datos_venta = factura['venta']
+            self.datos_cliente = factura['cliente']
+            self.detalles_completos = factura['detalles']
 
-            # 4. Actualizar interfaz
+            # Actualizar interfaz
             self._actualizar_interfaz_completa()
 
             self._mostrar_estado("Factura cargada correctamente")
@@ -80,88 +70,6 @@ class VentanaDetalleFactura(QWidget):
         except Exception as e:
             self._mostrar_error(str(e))
 
-    def _obtener_venta_por_codigo(self):
-        """Obtiene los datos de la venta usando el código de venta.
-           Si no la encuentra, muestra todas las ventas disponibles."""
-        try:
-            ventas = self.modelo_venta.obtener_todos_como_objetos()
-
-            # Buscar venta por código
-            for venta in ventas:
-                if venta.codigo_venta == self.codigo_venta:
-                    return venta
-
-            # Si no se encontró → mostrar todas las ventas existentes
-            lista = "\n".join(
-                f"- Código: {v.codigo_venta} | Cliente: {v.codigo_cliente} | Fecha: {v.fecha.strftime('%d/%m/%Y')}"
-                for v in ventas
-            )
-
-            QMessageBox.warning(
-                self,
-                "Venta no encontrada",
-                (
-                    f"No se encontró la venta con código: {self.codigo_venta}\n\n"
-                    "Estas son las ventas disponibles:\n\n"
-                    f"{lista if lista else 'No hay ventas registradas.'}"
-                )
-            )
-
-            return None
-
-        except Exception as e:
-            print(f"Error obteniendo venta por código: {e}")
-            return None
-
-    def _obtener_datos_cliente(self):
-        """Obtiene los datos del cliente usando el modelo Cliente"""
-        try:
-            return self.modelo_cliente.obtener_por_codigo(self.datos_venta.codigo_cliente)
-        except Exception as e:
-            print(f"Error obteniendo datos del cliente: {e}")
-            return None
-
-    def _obtener_detalles_completos(self):
-        """Obtiene los detalles completos de la venta usando los modelos"""
-        try:
-            # Obtener detalles básicos del modelo DetalleVentaProducto
-            detalles_basicos = self.modelo_detalle.obtener_por_venta(self.datos_venta.id_venta)
-
-            # Obtener información completa de cada producto
-            detalles_completos = []
-            for detalle in detalles_basicos:
-                producto_info = self._obtener_info_producto(detalle.codigo_producto)
-                if producto_info:
-                    nombre_producto, precio_unitario = producto_info
-                    subtotal = precio_unitario * detalle.cantidad
-                    detalles_completos.append((detalle, nombre_producto, precio_unitario, subtotal))
-
-            return detalles_completos
-
-        except Exception as e:
-            print(f"Error obteniendo detalles completos: {e}")
-            return []
-
-    def _obtener_info_producto(self, codigo_producto):
-        """Obtiene información del producto (nombre y precio) usando consulta directa"""
-        try:
-            from database.connection import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            # CORREGIDO: Usar "PRODUCTO" en lugar de "producto" o "Producto"
-            sql = "SELECT nombre, valor_venta FROM PRODUCTO WHERE codigo = :codigo"
-            cursor.execute(sql, {"codigo": codigo_producto})
-            resultado = cursor.fetchone()
-
-            if resultado:
-                return resultado[0], float(resultado[1])
-            return None
-
-        except Exception as e:
-            print(f"Error obteniendo información del producto {codigo_producto}: {e}")
-            return None
-
     def _actualizar_interfaz_completa(self):
         """Actualiza toda la interfaz con los datos obtenidos"""
         self._actualizar_cabecera_factura()
@@ -294,31 +202,32 @@ class VentanaDetalleFactura(QWidget):
             self.btn_generar_pdf.setText("Generando PDF...")
 
             # Ejecutar en segundo plano
-            QTimer.singleShot(100, self._ejecutar_exportacion_pdf)
+            ejecutar(generar_factura_pdf, self.codigo_venta,
+                     al_terminar=self._pdf_generado,
+                     al_fallar=self._pdf_fallido,
+                     ventana=self)
 
         except Exception as e:
             self._restaurar_boton_pdf()
             QMessageBox.critical(self, "Error", f"Error al iniciar exportación: {str(e)}")
 
-    def _ejecutar_exportacion_pdf(self):
-        """Ejecuta la exportación a PDF en segundo plano"""
-        try:
-            archivo = generar_factura_pdf(self.codigo_venta)
-
-            QMessageBox.information(
-                self,
-                "PDF Generado Exitosamente",
-                f"La factura ha sido exportada correctamente:\n\n{archivo}"
-            )
-
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error al Generar PDF",
-                f"No se pudo generar el archivo PDF:\n\n{str(e)}"
-            )
-        finally:
-            self._restaurar_boton_pdf()
+    def _pdf_generado(self, archivo):
+        """Avisa que la factura se exportó"""
+        self._restaurar_boton_pdf()
+        QMessageBox.information(
+            self,
+            "PDF Generado Exitosamente",
+            f"La factura ha sido exportada correctamente:\n\n{archivo}"
+        )
+
+    def _pdf_fallido(self, e):
+        """Avisa que no se pudo exportar la factura"""
+        self._restaurar_boton_pdf()
+        QMessageBox.critical(
+            self,
+            "Error al Generar PDF",
+            f"No se pudo generar el archivo PDF:\n\n{str(e)}"
+        )
 
     def _restaurar_boton_pdf(self):
         """Restaura el botón de PDF a su estado normal"""
@@ -341,7 +250,8 @@ class VentanaDetalleFactura(QWidget):
 
     def closeEvent(self, event):
         """Maneja el evento de cierre de la ventana"""
-        # Limpiar recursos
+        # Limpiar recursos (lo que esté cargando ya no se va a mostrar)
+        cancelar_tareas(self)
         self.datos_venta = None
         self.datos_cliente = None
         self.detalles_completos = []
@@ -350,18 +260,13 @@ class VentanaDetalleFactura(QWidget):
     # ✅ 5. Agregar los 3 métodos del checklist
     def actualizar_vista(self):
         """Actualiza la vista recargando los datos de la factura"""
-        try:
-            self._mostrar_estado("Actualizando datos...")
-            # Limpiar cache
-            self.datos_venta = None
-            self.datos_cliente = None
-            self.detalles_completos = []
-
-            # Recargar datos
-            QTimer.singleShot(50, self._procesar_carga_datos)
+        # Limpiar cache
+        self.datos_venta = None
+        self.datos_cliente = None
+        self.detalles_completos = []
 
-        except Exception as e:
-            self._mostrar_error(f"Error al actualizar vista: {str(e)}")
+        # Recargar datos
+        self.cargar_datos()
 
     def crear_boton_regreso(self):
         """Crea el botón para regresar al menú principal"""
@@ -1,9 +1,11 @@
 from PyQt5 import uic
 from PyQt5.QtWidgets import QWidget, QTableWidgetItem, QMessageBox, QPushButton
 from PyQt5.QtCore import Qt
+from datetime import date
 
-from model.credito import Credito
+from model.cartera import Cartera
 from report.pdf_utils import crear_pdf  # <-- ESTE ES EL IMPORT CORRECTO
+from util.tareas import ejecutar, cancelar_tareas
 
 
 class VentanaMorosos(QWidget):
@@ -16,7 +18,8 @@ class VentanaMorosos(QWidget):
 
         uic.loadUi("deudores.ui", self)
 
-        self.modelo_credito = Credito()
+        self.modelo_cartera = Cartera()
+        self.morosos = []
 
         # ✅ 4. Conectar botón refrescar (si existe en tu UI)
         # Si tienes un botón refrescar en deudores.ui, conéctalo así:
@@ -34,31 +37,63 @@ class VentanaMorosos(QWidget):
     # CARGA DE DATOS
     # ------------------------------------------------------------
     def cargar_morosos(self):
-        """Carga la tabla usando los datos del modelo Credito"""
-        filas = self.modelo_credito.obtener_clientes_morosos()
-
-        self.tabla_morosos.setRowCount(len(filas))
-        self.tabla_morosos.setColumnCount(5)
-
-        for i, fila in enumerate(filas):
-            nombre, codigo_venta, id_pago, fecha_vencimiento, estado = fila
-
-            self.tabla_morosos.setItem(i, 0, QTableWidgetItem(str(nombre)))
-            self.tabla_morosos.setItem(i, 1, QTableWidgetItem(str(codigo_venta)))
-            self.tabla_morosos.setItem(i, 2, QTableWidgetItem(str(id_pago)))
-            self.tabla_morosos.setItem(i, 3, QTableWidgetItem(str(fecha_vencimiento)))
-            self.tabla_morosos.setItem(i, 4, QTableWidgetItem(str(estado)))
+        """
+        Carga la tabla desde la foto de la cartera morosa (una fila por cliente).
+        Si la foto es de un día anterior, la recalcula en segundo plano y
+        vuelve a cargar al terminar.
+        """
+        self.morosos = self.modelo_cartera.obtener()
+        self.llenar_tabla(self.morosos)
+
+        corte = self.morosos[0].fecha_corte if self.morosos else self.modelo_cartera.fecha_corte()
+        if hasattr(corte, 'date'):
+            corte = corte.date()
+        if corte is None or corte < date.today():
+            self.lbl_titulo.setText("Clientes Morosos (actualizando cartera...)")
+            ejecutar(self.modelo_cartera.actualizar,
+                     al_terminar=self._cartera_actualizada,
+                     al_fallar=self._error_actualizando,
+                     ventana=self)
+        else:
+            self.lbl_titulo.setText(f"Clientes Morosos (corte {corte})")
+
+    def llenar_tabla(self, morosos):
+        """Muestra los morosos con su deuda vencida por días de mora"""
+        self.tabla_morosos.setRowCount(len(morosos))
+        self.tabla_morosos.setColumnCount(len(Cartera.ENCABEZADOS))
+        self.tabla_morosos.setHorizontalHeaderLabels(Cartera.ENCABEZADOS)
+
+        for i, moroso in enumerate(morosos):
+            for j, valor in enumerate(moroso.a_fila()):
+                texto = str(valor) if j < 4 else f"${valor:,.2f}"
+                item = QTableWidgetItem(texto)
+                if j > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.tabla_morosos.setItem(i, j, item)
+
+    def _cartera_actualizada(self, resultado):
+        if resultado is None:
+            self._error_actualizando(Exception("No se pudo actualizar la cartera"))
+            return
+        self.morosos = self.modelo_cartera.obtener()
+        self.llenar_tabla(self.morosos)
+        self.lbl_titulo.setText(f"Clientes Morosos (corte {date.today()})")
+
+    def _error_actualizando(self, error):
+        self.lbl_titulo.setText("Clientes Morosos")
+        QMessageBox.warning(self, "Cartera", f"No se pudo actualizar la cartera morosa:\n{error}")
 
     # ------------------------------------------------------------
     # GENERAR PDF USANDO EL MODELO
     # ------------------------------------------------------------
     def generar_pdf_morosos(self):
         """
-        Genera un PDF usando el MODELO Credito (no SQL directo)
+        Genera el PDF con los mismos datos que muestra la tabla
+        (la foto de la cartera, sin volver a consultar)
         """
-        filas = self.modelo_credito.obtener_clientes_morosos()
+        filas = [moroso.a_fila() for moroso in self.morosos]
 
-        headers = ["Cliente", "Venta", "Cuota", "Vencimiento", "Estado"]
+        headers = Cartera.ENCABEZADOS
         pdf_name = "reporte_morosos.pdf"
 
         crear_pdf(pdf_name, "Clientes Morosos", headers, filas)
@@ -107,4 +142,10 @@ class VentanaMorosos(QWidget):
             self.lobby_window.show()
             self.lobby_window.raise_()
             self.lobby_window.activateWindow()
-        self.close()
\ No newline at end of file
+        self.close()
+
+    def closeEvent(self, event):
+        """Al cerrar, la actualización de la cartera sigue en la BD pero su
+        resultado ya no se muestra"""
+        cancelar_tareas(self)
+        super().closeEvent(event)
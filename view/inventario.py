@@ -1,11 +1,11 @@
 from PyQt5 import uic
 from PyQt5.QtWidgets import QWidget, QMessageBox, QTableWidgetItem, QPushButton
 
-from database.connection import get_connection
 from report.report import reporte_inventario_por_categoria
 
 # Importa tu modelo Producto
 from model.producto import Producto
+from model.catalogo import Catalogo
 
 
 class VentanaInventario(QWidget):
@@ -38,11 +38,7 @@ class VentanaInventario(QWidget):
     # Cargar categorías en combo
     # ============================
     def cargar_categorias(self):
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT codigo_categoria, nombre FROM categoria ORDER BY codigo_categoria")
-        categorias = [fila[0] for fila in cursor.fetchall()]
+        categorias = [c.codigo_categoria for c in Catalogo.categorias()]
 
         self.combo_categoria.addItem("TODAS")
         for c in categorias:
@@ -56,10 +52,10 @@ class VentanaInventario(QWidget):
 
         # Si es "TODAS" o None, mostrar todos
         if categoria is None or categoria == "TODAS":
-            productos = self.modelo_producto.obtener_todos_como_objetos()
+            productos = Catalogo.productos()
         else:
-            # Pasar la categoría como string, sin convertir a int
-            productos = self.modelo_producto.buscar_por_categoria(categoria)
+            # El combo guarda el código como texto
+            productos = Catalogo.productos_por_categoria(int(categoria))
 
         # Configurar tabla
         self.tabla_inv.setRowCount(len(productos))
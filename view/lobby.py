@@ -13,7 +13,6 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QFont
 from util import sesion
-from model.usuario import Usuario
 
 
 class LobbyWindow(QMainWindow):
@@ -33,9 +32,9 @@ class LobbyWindow(QMainWindow):
             )
             sys.exit(1)
 
-        # Obtener información del usuario
-        self.usuario_id = sesion.get_usuario_id()
-        self.usuario_controller = Usuario()
+        # Información del usuario (cargada una vez al iniciar sesión)
+        self.contexto = sesion.get_contexto()
+        self.usuario_id = self.contexto.id_usuario
         self.id_rol = None
         self.nombre_usuario = None
 
@@ -58,45 +57,14 @@ class LobbyWindow(QMainWindow):
         )
 
     def cargar_datos_usuario(self):
-        """Carga los datos del usuario logueado"""
-        try:
-            usuario = self.usuario_controller.obtener_por_id(self.usuario_id)
-
-            if not usuario:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    "No se pudo cargar la información del usuario."
-                )
-                sys.exit(1)
-
-            # Manejar tanto tuplas como objetos
-            if isinstance(usuario, tuple):
-                # Orden: id_usuario, nombre_usuario, email, contrasena, id_rol
-                self.nombre_usuario = usuario[1]
-                self.id_rol = usuario[4] if len(usuario) > 4 else None
-            else:
-                self.nombre_usuario = usuario.nombre_usuario
-                self.id_rol = usuario.id_rol
-
-            print(f"Usuario cargado: {self.nombre_usuario}, Rol: {self.id_rol}")
-
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Error al cargar datos del usuario:\n{e}"
-            )
-            sys.exit(1)
+        """Toma los datos del usuario logueado del contexto de la sesión"""
+        self.nombre_usuario = self.contexto.nombre_usuario
+        self.id_rol = self.contexto.id_rol
+        print(f"Usuario cargado: {self.nombre_usuario}, Rol: {self.id_rol}")
 
     def obtener_nombre_rol(self) -> str:
-        """Retorna el nombre del rol según el ID"""
-        roles = {
-            1: "Administrador",
-            2: "Usuario Paramétrico",
-            3: "Usuario Esporádico"
-        }
-        return roles.get(self.id_rol, "Desconocido")
+        """Retorna el nombre del rol del usuario"""
+        return self.contexto.nombre_rol
 
     def crear_interfaz(self):
         """Crea la interfaz principal"""
@@ -155,7 +123,7 @@ class LobbyWindow(QMainWindow):
     def crear_seccion_gestion(self, layout):
         """Crea la sección de gestión (CRUD)"""
         # Solo Admin y Paramétrico ven esta sección completa
-        if self.id_rol in [1, 2]:
+        if self.contexto.puede('gestionar_clientes'):
             grupo = self.crear_grupo("📋 Gestión")
             grid = QGridLayout()
 
@@ -178,7 +146,7 @@ class LobbyWindow(QMainWindow):
             grupo.setLayout(grid)
             layout.addWidget(grupo)
 
-        elif self.id_rol == 3:
+        elif self.contexto.solo_lectura:
             # Esporádicos solo ven Productos
             grupo = self.crear_grupo("📋 Gestión")
             grid = QGridLayout()
@@ -223,7 +191,7 @@ class LobbyWindow(QMainWindow):
         grid = QGridLayout()
 
         # Pago de Cuotas (Admin y Paramétrico)
-        if self.id_rol in [1, 2]:
+        if self.contexto.puede('gestionar_creditos'):
             btn_pagos = self.crear_boton_modulo(
                 "💵 Pago de Cuotas",
                 "Gestionar pagos de créditos",
@@ -288,7 +256,7 @@ class LobbyWindow(QMainWindow):
         grid.addWidget(btn_calc, 0, 0)
 
         # Auditoría (Solo Admin)
-        if self.id_rol == 1:
+        if self.contexto.puede('auditoria'):
             btn_auditoria = self.crear_boton_modulo(
                 "🔍 Auditoría",
                 "Bitácora del sistema",
@@ -71,13 +71,13 @@ class LoginWindow(QtWidgets.QMainWindow):
                 # Determinamos el nombre para el saludo
 
 
-                sesion.set_usuario_id(usuario_data.id_usuario)
+                # Usuario y rol se cargan una sola vez para toda la sesión
+                contexto = sesion.iniciar_sesion(usuario_data.id_usuario)
+                if contexto is None:
+                    self.login_failure()
+                    return
 
-                print("hasta aqui corre")
-                nombre_saludo = sesion.get_usuario_nombre(usuario_data.id_usuario)
-
-
-                self.login_success(nombre_saludo)
+                self.login_success(contexto.nombre_usuario)
 
             else:
                 # Falla de autenticación (usuario o contra incorrecta)
@@ -0,0 +1,203 @@
+"""
+Modelo de tabla paginado para las grillas grandes
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QEvent, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from util.tareas import ejecutar
+
+
+@dataclass
+class Columna:
+    """Cómo se muestra una columna a partir del objeto de la fila"""
+    titulo: str
+    valor: Callable[[Any], Any]                    # Valor crudo (también se usa para ordenar)
+    formato: Callable[[Any], str] = str            # Texto a mostrar a partir del valor
+    color: Optional[Callable[[Any], Any]] = None   # Color del texto a partir de la fila
+    fondo: Optional[Callable[[Any], Any]] = None   # Color de fondo a partir de la fila
+
+
+class ModeloTablaPaginado(QAbstractTableModel):
+    """
+    Modelo para QTableView sobre una lista de objetos (dataclasses o tuplas).
+
+    No crea un QTableWidgetItem por celda: el texto se arma solo para las celdas
+    visibles cuando la vista lo pide. Las filas se traen por páginas con
+    `cargar_pagina(despues_de) -> (filas, siguiente)`; la vista pide la siguiente
+    (canFetchMore/fetchMore) cuando el usuario llega al final.
+    """
+
+    pagina_cargada = pyqtSignal(int)   # Total de filas cargadas hasta ahora
+    error = pyqtSignal(object)
+
+    def __init__(self, columnas, cargar_pagina=None, en_segundo_plano=True, parent=None):
+        super().__init__(parent)
+        self.columnas = columnas
+        self.filas = []
+        self._cargar_pagina = cargar_pagina
+        self._siguiente = None
+        self._hay_mas = False
+        self._cargando = False
+        self._tarea = None
+        self._en_segundo_plano = en_segundo_plano
+
+    # ---------- Carga de datos ----------
+
+    def reiniciar(self, cargar_pagina=None):
+        """Vacía la tabla y empieza a cargar desde la primera página.
+        Se puede cambiar la función de carga (p. ej. con otros filtros)."""
+        if cargar_pagina is not None:
+            self._cargar_pagina = cargar_pagina
+        self.cancelar_carga()
+
+        self.beginResetModel()
+        self.filas = []
+        self._siguiente = None
+        self._hay_mas = self._cargar_pagina is not None
+        self._cargando = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def establecer(self, filas):
+        """Muestra una lista ya cargada (p. ej. resultados de búsqueda), sin más páginas"""
+        self.cancelar_carga()
+
+        self.beginResetModel()
+        self.filas = list(filas)
+        self._siguiente = None
+        self._hay_mas = False
+        self._cargando = False
+        self.endResetModel()
+        self.pagina_cargada.emit(len(self.filas))
+
+    def cancelar_carga(self):
+        """Descarta la página que se esté trayendo (p. ej. al cerrar la ventana).
+        Si quedan páginas, la vista la vuelve a pedir al bajar por la tabla."""
+        if self._tarea is not None:
+            self._tarea.cancelar()
+            self._tarea = None
+        self._cargando = False
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._hay_mas and not self._cargando
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        self._cargando = True
+        if self._en_segundo_plano:
+            self._tarea = ejecutar(self._cargar_pagina, self._siguiente,
+                                   al_terminar=self._agregar_pagina,
+                                   al_fallar=self._fallo_carga)
+        else:
+            try:
+                self._agregar_pagina(self._cargar_pagina(self._siguiente))
+            except Exception as e:
+                self._fallo_carga(e)
+
+    def _agregar_pagina(self, pagina):
+        """Agrega al final las filas de una página"""
+        filas, self._siguiente = pagina
+        self._tarea = None
+        self._cargando = False
+        self._hay_mas = self._siguiente is not None
+
+        if filas:
+            inicio = len(self.filas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(filas) - 1)
+            self.filas.extend(filas)
+            self.endInsertRows()
+        self.pagina_cargada.emit(len(self.filas))
+
+    def _fallo_carga(self, e):
+        self._tarea = None
+        self._cargando = False
+        self._hay_mas = False
+        self.error.emit(e)
+
+    @property
+    def hay_mas(self) -> bool:
+        """True si quedan páginas sin cargar"""
+        return self._hay_mas
+
+    def fila(self, numero):
+        """Objeto de la fila `numero`"""
+        return self.filas[numero]
+
+    # ---------- Interfaz de QAbstractTableModel ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columnas)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        objeto = self.filas[index.row()]
+        columna = self.columnas[index.column()]
+
+        if role == Qt.DisplayRole:
+            return columna.formato(columna.valor(objeto))
+        if role == Qt.UserRole:
+            return objeto
+        if role == Qt.ForegroundRole and columna.color:
+            return columna.color(objeto)
+        if role == Qt.BackgroundRole and columna.fondo:
+            return columna.fondo(objeto)
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacion == Qt.Horizontal:
+            return self.columnas[seccion].titulo
+        return super().headerData(seccion, orientacion, role)
+
+    def clave_orden(self, columna):
+        """Clave para ordenar objetos por el valor crudo de la columna (None al final)"""
+        valor = self.columnas[columna].valor
+
+        def clave(objeto):
+            v = valor(objeto)
+            return (v is None, v if v is not None else 0)
+        return clave
+
+    def sort(self, columna, orden=Qt.AscendingOrder):
+        """Ordena las filas ya cargadas por el valor crudo de la columna.
+        Las páginas que lleguen después no quedan en ese orden: en las grillas
+        que cargan por páginas el orden lo debe dar quien carga (la consulta)."""
+        self.layoutAboutToBeChanged.emit()
+        self.filas.sort(key=self.clave_orden(columna), reverse=(orden == Qt.DescendingOrder))
+        self.layoutChanged.emit()
+
+
+class DelegadoBoton(QStyledItemDelegate):
+    """Dibuja un botón en la celda sin crear un QPushButton por fila.
+    Emite `presionado(fila)` al hacer clic."""
+
+    presionado = pyqtSignal(int)
+
+    def __init__(self, texto, parent=None):
+        super().__init__(parent)
+        self.texto = texto
+
+    def paint(self, painter, option, index):
+        boton = QStyleOptionButton()
+        boton.rect = option.rect.adjusted(4, 2, -4, -2)
+        boton.text = self.texto
+        boton.state = QStyle.State_Enabled | QStyle.State_Raised
+        QApplication.style().drawControl(QStyle.CE_PushButton, boton, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.pos()):
+            self.presionado.emit(index.row())
+            return True
+        return False
@@ -0,0 +1,24 @@
+"""
+Carga por páginas para las tablas de las ventanas
+Por: Juan David Ramirez Carmona y Miguel Ángel Vargas Peláez
+Fecha: 2025-11
+Licencia: GPLv3
+"""
+
+
+def conectar_carga_perezosa(tabla, cargar_mas, margen=5):
+    """
+    Pide la siguiente página cuando el usuario baja hasta el final de la tabla.
+
+    Args:
+        tabla: QTableWidget/QTableView con barra de desplazamiento vertical
+        cargar_mas: Función sin argumentos que agrega la siguiente página
+        margen: Cuántos pasos antes del final se dispara la carga
+    """
+    barra = tabla.verticalScrollBar()
+
+    def al_desplazar(valor):
+        if valor >= barra.maximum() - margen:
+            cargar_mas()
+
+    barra.valueChanged.connect(al_desplazar)
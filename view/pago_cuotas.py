@@ -10,11 +10,9 @@ from PyQt5 import QtWidgets, uic
 from PyQt5.QtWidgets import QMessageBox, QPushButton
 from datetime import date, datetime
 from typing import Union
-from model.credito import Credito
-from model.cuota import Cuota
-from model.pago import Pago
-from model.venta import Venta
+from model.credito import Credito, LibroDesactualizado
 from util import sesion
+from util.tareas import ejecutar, cancelar_tareas
 
 
 def convertir_a_date(fecha_obj: Union[date, str, None]) -> date:
@@ -75,9 +73,6 @@ class PagoCuotasWindow(QtWidgets.QMainWindow):
         # Instanciar controladores
         try:
             self.credito_controller = Credito()
-            self.cuota_controller = Cuota()
-            self.pago_controller = Pago()
-            self.venta_controller = Venta()
         except Exception as e:
             QMessageBox.critical(self, "Error de Base de Datos",
                                  f"No se pudo conectar a la base de datos.\nError: {e}")
@@ -121,31 +116,51 @@ class PagoCuotasWindow(QtWidgets.QMainWindow):
             self.close()
             return
 
-    def cargar_creditos_activos(self):
-        """Carga los créditos activos en el ComboBox"""
-        try:
-            creditos_activos = self.credito_controller.obtener_creditos_activos()
+    def cargar_creditos_activos(self, limite: int = None, seleccionar: int = None):
+        """Carga los créditos activos en el ComboBox (una sola consulta, en segundo plano).
+        Con `limite` solo se cargan los más recientes; `seleccionar` es el id
+        de crédito que se deja seleccionado al terminar, si sigue activo."""
+        self.statusBar().showMessage("Cargando créditos activos...")
+        ejecutar(
+            self.credito_controller.obtener_resumen_creditos_activos, limite=limite,
+            al_terminar=lambda resumenes: self._mostrar_creditos_activos(resumenes, seleccionar),
+            al_fallar=self._error_cargando_creditos,
+            ventana=self
+        )
 
+    def _mostrar_creditos_activos(self, resumenes, seleccionar=None):
+        """Llena el ComboBox con los créditos que trajo cargar_creditos_activos"""
+        try:
             self.comboBox_creditos.clear()
             self.comboBox_creditos.addItem("-- Seleccione un crédito --", None)
 
-            if not creditos_activos:
+            if not resumenes:
                 self.statusBar().showMessage("⚠️ No hay créditos activos en el sistema.")
                 return
 
-            for credito in creditos_activos:
-                # Obtener info básica para mostrar en el combo
-                info = self.credito_controller.obtener_info_credito_completa(credito.id_credito)
-                if info:
-                    texto_combo = (f"Crédito #{credito.id_credito} - {info['nombre_cliente']} "
-                                   f"(Venta: {info['codigo_venta']}) - Saldo: ${info['saldo_pendiente']:,.2f}")
-                    self.comboBox_creditos.addItem(texto_combo, credito.id_credito)
+            for info in resumenes:
+                self.comboBox_creditos.addItem(self._texto_combo(info), info['id_credito'])
 
-            self.statusBar().showMessage(f"✅ Se cargaron {len(creditos_activos)} créditos activos.")
+            if seleccionar is not None:
+                indice = self.comboBox_creditos.findData(seleccionar)
+                if indice >= 0:
+                    self.comboBox_creditos.setCurrentIndex(indice)
+
+            self.statusBar().showMessage(f"✅ Se cargaron {len(resumenes)} créditos activos.")
 
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar créditos:\n{e}")
-            self.statusBar().showMessage("❌ Error al cargar créditos.")
+            self._error_cargando_creditos(e)
+
+    @staticmethod
+    def _texto_combo(info):
+        """Texto de un crédito en el ComboBox"""
+        return (f"Crédito #{info['id_credito']} - {info['nombre_cliente']} "
+                f"(Venta: {info['codigo_venta']}) - Saldo: ${info['saldo_pendiente']:,.2f}")
+
+    def _error_cargando_creditos(self, e):
+        """Informa un error al cargar los créditos activos"""
+        QMessageBox.critical(self, "Error", f"Error al cargar créditos:\n{e}")
+        self.statusBar().showMessage("❌ Error al cargar créditos.")
 
     def credito_seleccionado_cambio(self):
         """Se ejecuta cuando se selecciona un crédito del ComboBox"""
@@ -350,109 +365,77 @@ class PagoCuotasWindow(QtWidgets.QMainWindow):
         if respuesta != QMessageBox.Yes:
             return
 
-        try:
-            # 1. Generar código de pago único
-            codigo_pago = self.generar_codigo_pago()
-
-            # 2. Crear el registro de Pago
-            exito_pago = self.pago_controller.crear(
-                codigo_pago=codigo_pago,
-                fecha_pago=date.today(),
-                estado="Completado",
-                valor=float(self.cuota_actual.valor_cuota),
-                id_pago=self.cuota_actual.id_pago
+        # Se paga la siguiente cuota pendiente del crédito en una sola transacción
+        self.pushButton_realizar_pago.setEnabled(False)
+        self.statusBar().showMessage("Registrando pago...")
+        ejecutar(self.credito_controller.registrar_pago_cuota,
+                 self.info_credito['id_credito'], date.today(),
+                 al_terminar=self._pago_registrado,
+                 al_fallar=self._pago_fallido,
+                 ventana=self)
+
+    def _pago_registrado(self, resumen):
+        """Informa el pago y actualiza solo la entrada del crédito pagado"""
+        if resumen['credito_finalizado']:
+            QMessageBox.information(
+                self,
+                "🎉 ¡Crédito Completado!",
+                f"El pago se realizó exitosamente.\n\n"
+                f"✅ ¡Este crédito ha sido pagado en su totalidad!\n"
+                f"Cliente: {resumen['nombre_cliente']}\n"
+                f"Total pagado: ${resumen['total_pagado']:,.2f}"
             )
-
-            if not exito_pago:
-                raise Exception("No se pudo crear el registro de pago.")
-
-            # 3. Actualizar el estado de la Cuota a "Pagada"
-            exito_cuota = self.cuota_controller.actualizar(
-                id_pago=self.cuota_actual.id_pago,
-                estado="Pagada"
+        else:
+            QMessageBox.information(
+                self,
+                "✅ Pago Exitoso",
+                f"El pago de la cuota #{resumen['n_cuota']} se realizó correctamente.\n\n"
+                f"Valor pagado: ${resumen['valor_pagado']:,.2f}\n"
+                f"Cuotas restantes: {resumen['total_cuotas'] - resumen['cuotas_pagadas']}"
             )
 
-            if not exito_cuota:
-                raise Exception("No se pudo actualizar el estado de la cuota.")
-
-            # 4. Verificar si era la última cuota
-            cuotas_pendientes = self.info_credito['total_cuotas'] - self.info_credito['cuotas_pagadas'] - 1
-
-            if cuotas_pendientes == 0:
-                # Actualizar el estado del crédito en la Venta a "Finalizado"
-                exito_venta = self.venta_controller.actualizar_estado_credito(
-                    id_venta=self.info_credito['id_venta'],
-                    estado_credito="Finalizado"
-                )
-
-                if not exito_venta:
-                    print("⚠️ Advertencia: No se pudo actualizar el estado del crédito en la venta.")
-
-                QMessageBox.information(
-                    self,
-                    "🎉 ¡Crédito Completado!",
-                    f"El pago se realizó exitosamente.\n\n"
-                    f"✅ ¡Este crédito ha sido pagado en su totalidad!\n"
-                    f"Cliente: {self.info_credito['nombre_cliente']}\n"
-                    f"Total pagado: ${self.info_credito['saldo_financiado']:,.2f}"
-                )
-            else:
-                QMessageBox.information(
-                    self,
-                    "✅ Pago Exitoso",
-                    f"El pago de la cuota #{self.cuota_actual.n_cuota} se realizó correctamente.\n\n"
-                    f"Valor pagado: ${self.cuota_actual.valor_cuota:,.2f}\n"
-                    f"Cuotas restantes: {cuotas_pendientes}"
-                )
-
-            # 5. Guardar el id_credito antes de recargar
-            id_credito_actual = self.info_credito['id_credito']
-
-            # Recargar la información
-            self.cargar_creditos_activos()
-
-            # Volver a seleccionar el mismo crédito si aún está activo
-            if cuotas_pendientes > 0:
-                for i in range(self.comboBox_creditos.count()):
-                    if self.comboBox_creditos.itemData(i) == id_credito_actual:
-                        self.comboBox_creditos.setCurrentIndex(i)
-                        break
-            else:
-                self.limpiar_interfaz()
+        indice = self.comboBox_creditos.findData(resumen['id_credito'])
+        if resumen['credito_finalizado']:
+            # El crédito deja de estar activo: se quita del combo
+            if indice >= 0:
+                self.comboBox_creditos.removeItem(indice)
+            self.comboBox_creditos.setCurrentIndex(0)
+            self.limpiar_interfaz()
+        elif indice >= 0:
+            self.comboBox_creditos.setItemText(indice, self._texto_combo(resumen))
+            # Recarga el detalle del crédito seleccionado (lecturas por clave)
+            self.credito_seleccionado_cambio()
 
-            self.statusBar().showMessage("✅ Pago procesado exitosamente.")
+        self.statusBar().showMessage(f"✅ Pago #{resumen['codigo_pago']} registrado.")
 
-        except Exception as e:
-            QMessageBox.critical(
+    def _pago_fallido(self, e):
+        """Informa un error al registrar el pago"""
+        if isinstance(e, LibroDesactualizado):
+            # No se registró nada: se corrige el libro y se recarga la cuota
+            QMessageBox.warning(
                 self,
-                "❌ Error al Procesar Pago",
-                f"Ocurrió un error al procesar el pago:\n\n{e}\n\n"
-                "El pago no se completó. Intente nuevamente."
+                "⚠️ Crédito Desactualizado",
+                "La cuota a pagar de este crédito no coincide con sus cuotas "
+                "registradas. Se recalculará el crédito; revise la cuota y "
+                "vuelva a intentar el pago."
             )
-            print(f"Error en realizar_pago: {e}")
-            import traceback
-            traceback.print_exc()
-            self.statusBar().showMessage("❌ Error al procesar el pago.")
-
-    def generar_codigo_pago(self) -> int:
-        """Genera un código único para el pago"""
-        try:
-            # Obtener todos los pagos y generar el siguiente código
-            todos_pagos = self.pago_controller.obtener_todos()
-
-            if not todos_pagos:
-                return 1
-
-            # Obtener el código máximo y sumar 1
-            codigos = [p[0] for p in todos_pagos]  # codigo_pago es la primera columna
-            return max(codigos) + 1
+            self.statusBar().showMessage("Recalculando el crédito...")
+            ejecutar(self.credito_controller.recalcular_libro,
+                     self.info_credito['id_credito'],
+                     al_terminar=lambda _: self.credito_seleccionado_cambio(),
+                     ventana=self)
+            return
 
-        except Exception as e:
-            print(f"Error al generar código de pago: {e}")
-            # En caso de error, usar timestamp como fallback
-            return int(datetime.now().timestamp())
+        QMessageBox.critical(
+            self,
+            "❌ Error al Procesar Pago",
+            f"Ocurrió un error al procesar el pago:\n\n{e}\n\n"
+            "El pago no se completó. Intente nuevamente."
+        )
+        print(f"Error en realizar_pago: {e}")
+        self.pushButton_realizar_pago.setEnabled(self.cuota_actual is not None)
+        self.statusBar().showMessage("❌ Error al procesar el pago.")
 
-    # ✅ 5. Agregar los 3 métodos del checklist
     def actualizar_vista(self):
         """Actualiza la vista recargando los créditos activos"""
         self.cargar_creditos_activos()
@@ -479,6 +462,11 @@ class PagoCuotasWindow(QtWidgets.QMainWindow):
         self.close()
 
 
+    def closeEvent(self, event):
+        """Al cerrar, lo que esté cargando ya no se va a mostrar"""
+        cancelar_tareas(self)
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     # Para pruebas
     sesion.set_usuario_id(1001)
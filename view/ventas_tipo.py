@@ -3,8 +3,8 @@ from PyQt5.QtWidgets import QWidget, QMessageBox, QTableWidgetItem, QPushButton
 from PyQt5.QtCore import QDate
 
 from report.report import reporte_ventas_por_tipo
-from model.venta import Venta
-from database.connection import get_connection
+from model.resumen_ventas import ResumenVentas
+from util.fechas import rango_texto
 
 
 class VentanaVentasTipo(QWidget):
@@ -17,8 +17,8 @@ class VentanaVentasTipo(QWidget):
 
         uic.loadUi("ventas_tipo.ui", self)
 
-        # Inicializar el modelo de ventas
-        self.modelo_venta = Venta()
+        # Inicializar el modelo del resumen diario de ventas
+        self.modelo_resumen = ResumenVentas()
 
         # Conectar señales
         self.btn_buscar.clicked.connect(self.buscar)
@@ -81,11 +81,8 @@ class VentanaVentasTipo(QWidget):
             return
 
         try:
-            # Usar el modelo para buscar ventas por fecha
-            ventas = self.modelo_venta.buscar_por_fecha_(inicio, fin)
-
-            # Agrupar por tipo de venta
-            resumen = self._agrupar_por_tipo(ventas)
+            # El resumen diario ya viene agrupado por tipo
+            resumen = self._resumen_por_tipo(inicio, fin)
 
             # Mostrar en la tabla
             self._mostrar_resumen(resumen)
@@ -93,16 +90,11 @@ class VentanaVentasTipo(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al buscar ventas: {str(e)}")
 
-    def _agrupar_por_tipo(self, ventas):
-        """Agrupa las ventas por tipo y cuenta la cantidad"""
-        resumen = {}
-        for venta in ventas:
-            tipo = venta.tipo_venta or "Sin tipo"  # Manejar casos None
-            if tipo in resumen:
-                resumen[tipo] += 1
-            else:
-                resumen[tipo] = 1
-        return resumen
+    def _resumen_por_tipo(self, inicio, fin):
+        """Cantidad de ventas por tipo entre dos fechas 'YYYY-MM-DD' (inclusive)"""
+        desde, hasta = rango_texto(inicio, fin)
+        return {tipo or "Sin tipo": cantidad
+                for tipo, cantidad in self.modelo_resumen.por_tipo(desde, hasta).items()}
 
     def _mostrar_resumen(self, resumen):
         """Muestra el resumen en la tabla"""
@@ -137,8 +129,7 @@ class VentanaVentasTipo(QWidget):
 
         try:
             # Verificar que hay datos para generar el reporte
-            ventas = self.modelo_venta.buscar_por_fecha_(inicio, fin)
-            if not ventas:
+            if not self._resumen_por_tipo(inicio, fin):
                 QMessageBox.warning(self, "Sin datos",
                                     "No hay ventas en el rango de fechas seleccionado.")
                 return
@@ -6,7 +6,6 @@ Licencia: GPLv3
 """
 
 import sys
-from datetime import date, datetime
 from PyQt5 import QtWidgets, uic
 from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QInputDialog
 from PyQt5.QtCore import Qt
@@ -14,14 +13,21 @@ from decimal import Decimal
 
 from model.cliente import Cliente, ClienteData
 from model.producto import Producto, ProductoData
+from model.catalogo import Catalogo
+from util.tareas import ejecutar
+from util.busqueda import coincide
+from view.busqueda_en_vivo import combo_con_busqueda
 from model.venta import Venta
 from model.credito import Credito
+from model import amortizacion
 from model.detalle_venta_producto import DetalleVentaProducto
 
 
 class VentasWindow(QtWidgets.QMainWindow):
     """Sistema completo de ventas con soporte para créditos"""
 
+    LIMITE_COMBO = 200  # Ítems que muestran los combos; los demás se encuentran escribiendo
+
     def __init__(self, parent=None):  # ✅ 1. Cambiar firma del __init__
         super().__init__()
 
@@ -65,10 +71,30 @@ class VentasWindow(QtWidgets.QMainWindow):
 
     def conectar_senales(self):
         """Conecta todas las señales de la interfaz"""
-        # Cliente
+        # Cliente (se busca escribiendo en el combo, ver view/busqueda_en_vivo.py)
+        self.busqueda_clientes = combo_con_busqueda(
+            self.comboBox_cliente, self.buscar_clientes,
+            texto_item=lambda c: f"{c.codigo_cliente} - {c.nombre}",
+            dato_item=lambda c: c.codigo_cliente,
+            al_mostrar=self._clientes_mostrados,
+            indicacion="-- Escriba el nombre o código del cliente --",
+            al_vaciar=self.cargar_clientes, al_fallar=self._error_buscando,
+            coincide=lambda c, texto: coincide(c.nombre, texto),
+            limite=self.LIMITE_COMBO
+        )
         self.comboBox_cliente.currentIndexChanged.connect(self.cliente_cambiado)
 
         # Producto
+        self.busqueda_productos = combo_con_busqueda(
+            self.comboBox_producto, self.buscar_productos,
+            texto_item=lambda p: f"{p.codigo} - {p.nombre}",
+            dato_item=lambda p: p.codigo,
+            al_mostrar=self._productos_mostrados,
+            indicacion="-- Escriba el nombre o código del producto --",
+            al_vaciar=self.cargar_productos, al_fallar=self._error_buscando,
+            coincide=lambda p, texto: coincide(p.nombre, texto),
+            limite=self.LIMITE_COMBO
+        )
         self.comboBox_producto.currentIndexChanged.connect(self.producto_cambiado)
         self.pushButton_agregar_producto.clicked.connect(self.agregar_producto_carrito)
 
@@ -95,38 +121,53 @@ class VentasWindow(QtWidgets.QMainWindow):
         self.tableWidget_carrito.setColumnWidth(4, 120)  # Subtotal
 
     def cargar_clientes(self):
-        """Carga todos los clientes en el ComboBox"""
-        try:
-            self.clientes = self.cliente_controller.obtener_todos_como_objetos()
-
-            self.comboBox_cliente.clear()
-            self.comboBox_cliente.addItem("-- Seleccione un cliente --", None)
-
-            for cliente in self.clientes:
-                self.comboBox_cliente.addItem(
-                    f"{cliente.codigo_cliente} - {cliente.nombre}",
-                    cliente.codigo_cliente
-                )
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar clientes:\n{e}")
+        """Carga en segundo plano la primera página de clientes (por nombre)
+        en el ComboBox; los demás se encuentran escribiendo en él"""
+        self.busqueda_clientes.reiniciar()
+        ejecutar(self.cliente_controller.seleccionar, orden="nombre", limite=self.LIMITE_COMBO,
+                 al_terminar=lambda clientes: self._lista_inicial(self.busqueda_clientes, clientes),
+                 al_fallar=lambda e: QMessageBox.critical(
+                     self, "Error", f"Error al cargar clientes:\n{e}"))
 
     def cargar_productos(self):
-        """Carga todos los productos en el ComboBox"""
-        try:
-            self.productos = self.producto_controller.obtener_todos_como_objetos()
-
-            self.comboBox_producto.clear()
-            self.comboBox_producto.addItem("-- Seleccione un producto --", None)
-
-            for producto in self.productos:
-                self.comboBox_producto.addItem(
-                    f"{producto.codigo} - {producto.nombre}",
-                    producto.codigo
-                )
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar productos:\n{e}")
+        """Carga en segundo plano los primeros productos del catálogo en el
+        ComboBox; los demás se encuentran escribiendo en él"""
+        self.busqueda_productos.reiniciar()
+        ejecutar(lambda: Catalogo.productos()[:self.LIMITE_COMBO],
+                 al_terminar=lambda productos: self._lista_inicial(self.busqueda_productos, productos),
+                 al_fallar=lambda e: QMessageBox.critical(
+                     self, "Error", f"Error al cargar productos:\n{e}"))
+
+    @staticmethod
+    def _lista_inicial(busqueda, objetos):
+        """Muestra la lista inicial en el combo, salvo que el usuario ya esté buscando"""
+        if not busqueda.en_uso():
+            busqueda.mostrar(objetos)
+
+    def buscar_clientes(self, texto):
+        """Cliente con ese código o clientes con ese nombre (corre en segundo plano)"""
+        if texto.isdigit():
+            cliente = self.cliente_controller.obtener_objeto(int(texto))
+            return [cliente] if cliente else []
+        return self.cliente_controller.buscar_por_nombre(texto, self.LIMITE_COMBO)
+
+    def buscar_productos(self, texto):
+        """Producto con ese código o productos con ese nombre (corre en segundo plano)"""
+        if texto.isdigit():
+            producto = Catalogo.producto(int(texto))
+            return [producto] if producto else []
+        return Catalogo.buscar_productos(texto, self.LIMITE_COMBO)
+
+    def _clientes_mostrados(self, clientes):
+        """Los clientes del combo (cliente_cambiado busca el elegido entre ellos)"""
+        self.clientes = clientes
+
+    def _productos_mostrados(self, productos):
+        self.productos = productos
+
+    def _error_buscando(self, e):
+        """Informa un error en la búsqueda de los combos"""
+        self.statusBar().showMessage(f"Error al buscar: {e}")
 
     def cliente_cambiado(self):
         """Se ejecuta cuando cambia la selección del cliente"""
@@ -165,10 +206,7 @@ class VentasWindow(QtWidgets.QMainWindow):
             return
 
         # Buscar producto
-        self.producto_seleccionado = next(
-            (p for p in self.productos if p.codigo == codigo_producto),
-            None
-        )
+        self.producto_seleccionado = Catalogo.producto(codigo_producto)
 
         if self.producto_seleccionado:
             # Mostrar cantidad disponible
@@ -423,8 +461,10 @@ class VentasWindow(QtWidgets.QMainWindow):
         plazo_text = self.comboBox_plazo.currentText()
         plazo_meses = int(plazo_text.split()[0])
 
-        # Cuota mensual
-        cuota_mensual = total_financiado / plazo_meses
+        # Cuota mensual: la misma que se va a guardar (ver calcular_opciones_credito)
+        opciones = self.calcular_opciones_credito(total)
+        cuota_mensual = amortizacion.valor_cuota(
+            opciones['saldo_financiado'], opciones['interes'], plazo_meses)
 
         # Actualizar labels
         self.label_cuota_inicial.setText(f"💰 Cuota Inicial (30%): ${cuota_inicial:,.2f}")
@@ -506,50 +546,45 @@ class VentasWindow(QtWidgets.QMainWindow):
             self.procesar_venta(es_credito, subtotal, iva, total)
 
     def procesar_venta(self, es_credito: bool, subtotal: float, iva: float, total: float):
-        """Procesa la venta en la base de datos"""
+        """Procesa la venta en la base de datos (en segundo plano, sin congelar la ventana)"""
         try:
-            # Generar ID de venta (puedes mejorarlo con secuencias)
-            id_venta = int(datetime.now().timestamp())
-            codigo_venta = f"VTA-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-            # Crear venta
-            tipo_venta = "Credito" if es_credito else "Contado"
-            estado_credito = "Activo" if es_credito else None
-
-            exito_venta = self.venta_controller.crear(
-                id_venta=id_venta,
-                codigo_venta=codigo_venta,
-                estado_venta="Completada",
-                fecha=date.today(),
-                tipo_venta=tipo_venta,
-                codigo_cliente=self.cliente_seleccionado.codigo_cliente,
-                total_bruto=subtotal,
-                iva_total=iva,
-                total_neto=total,
-                estado_credito=estado_credito
-            )
+            # Toda la venta (cabecera, detalles, stock, crédito y cuotas) va en una transacción
+            carrito = [(item['producto'].codigo, item['cantidad']) for item in self.carrito]
+            credito_opts = self.calcular_opciones_credito(total) if es_credito else None
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al procesar venta:\n{e}")
+            return
 
-            if not exito_venta:
-                raise Exception("No se pudo crear la venta")
+        # Evitar que la venta se envíe dos veces mientras se guarda
+        self.pushButton_finalizar.setEnabled(False)
+        self.statusBar().showMessage("Registrando venta...")
+
+        ejecutar(
+            self.venta_controller.registrar_venta_completa,
+            carrito,
+            self.cliente_seleccionado.codigo_cliente,
+            credito_opts=credito_opts,
+            total_bruto=subtotal,
+            iva_total=iva,
+            total_neto=total,
+            al_terminar=lambda resultado: self._venta_registrada(resultado, total),
+            al_fallar=self._venta_fallida,
+            ventana=self
+        )
 
-            # Agregar detalles de venta
-            for item in self.carrito:
-                self.detalle_controller.crear(
-                    id_venta=id_venta,
-                    codigo_producto=item['producto'].codigo,
-                    cantidad=item['cantidad']
-                )
+    def _venta_fallida(self, e):
+        """Informa que la venta no se pudo registrar"""
+        self.pushButton_finalizar.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Error al procesar venta:\n{e}")
 
-                # Actualizar stock del producto
-                nuevo_stock = item['producto'].cantidad - item['cantidad']
-                self.producto_controller.actualizar(
-                    codigo=item['producto'].codigo,
-                    cantidad=nuevo_stock
-                )
+    def _venta_registrada(self, resultado, total: float):
+        """Termina la venta en la interfaz cuando la BD respondió"""
+        self.pushButton_finalizar.setEnabled(True)
+        try:
+            if not resultado:
+                raise Exception("No se pudo registrar la venta. No se guardó ningún cambio.")
 
-            # Si es crédito, crear el crédito
-            if es_credito:
-                self.crear_credito(id_venta, total)
+            codigo_venta = resultado['codigo_venta']
 
             # ✅ GUARDAR EL CÓDIGO DE VENTA CREADA
             self.ultima_venta_creada = codigo_venta
@@ -617,8 +652,8 @@ class VentasWindow(QtWidgets.QMainWindow):
         self.comboBox_producto.setCurrentIndex(0)
         self.radioButton_contado.setChecked(True)
 
-    def crear_credito(self, id_venta: int, total: float):
-        """Crea el registro de crédito"""
+    def calcular_opciones_credito(self, total: float) -> dict:
+        """Calcula los valores del crédito para registrarlo junto con la venta"""
         # Calcular valores
         cuota_inicial = total * 0.30
         saldo_financiar = total * 0.70
@@ -628,18 +663,12 @@ class VentasWindow(QtWidgets.QMainWindow):
         plazo_text = self.comboBox_plazo.currentText()
         plazo_meses = int(plazo_text.split()[0])
 
-        # Generar ID de crédito
-        id_credito = int(datetime.now().timestamp()) + 1000
-
-        # Crear crédito
-        self.credito_controller.crear(
-            id_credito=id_credito,
-            cuota_inicial=cuota_inicial,
-            saldo_financiado=saldo_financiado,
-            interes=interes_porcentaje,
-            plazo_meses=plazo_meses,
-            id_venta=id_venta
-        )
+        return {
+            'cuota_inicial': cuota_inicial,
+            'saldo_financiado': saldo_financiado,
+            'interes': interes_porcentaje,
+            'plazo_meses': plazo_meses
+        }
 
     # ✅ 5. Agregar los 3 métodos al final de la clase
     def actualizar_vista(self):